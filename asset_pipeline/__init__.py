@@ -0,0 +1,7 @@
+"""
+Asset pipeline for COSMIC_PARASITE.
+
+Build stages that prepare the files under assets/ for the game, reading
+render settings straight from the JS sources in src/ instead of keeping
+hand-copied numbers in every script.
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from asset_pipeline.cli import main
+
+sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Animated-image output (APNG / animated WebP) for frame sequences.
+
+explosion-enemy01 and coin always play their frames in order, so they can
+ship as one animated image instead of one PNG per frame. Both formats
+store each frame cropped to the region that differs from the previous one,
+which is where the temporal redundancy goes.
+
+Each frame lasts as many game ticks (60 per second) as the entity's update()
+holds it: frameTimer is compared against the JS interval with > or >=, read
+from the source. When asset_pipeline.frame_resample has written key poses
+for the sequence, those frames and their durations are used instead.
+
+Writes build/animated/<sequence>.png (APNG) and .webp (lossless and lossy)
+plus a spritesheet for comparison, and animated-report.json with the sizes.
+The "separate" baseline is what the game ships today: each frame run through
+the build (resize, quantize, recompress) into build/animated/<sequence>/,
+measured there:
+
+    {"coin": {"frames": 23, "durationMs": 767, "sizes": {"separate": 71234,
+              "spritesheet": 60321, "apng": 40210, "webp": 35120, ...}}}
+
+Canvas drawImage() has no control over an animated image's timeline, so the
+game keeps drawing separate frames; this measures what switching would save.
+
+    python -m asset_pipeline.animated [sequence ...] [--no-recompress]
+"""
+import argparse
+import io
+import json
+import math
+import shutil
+
+from PIL import Image
+
+from asset_pipeline import build, js_sources, pixel_cache, profiling
+from asset_pipeline.frame_resample import IMAGES_FOLDER, OUTPUT_FOLDER as KEYFRAMES_FOLDER
+
+# Configuration
+OUTPUT_FOLDER = build.BUILD_FOLDER / "animated"
+REPORT_FILE = OUTPUT_FOLDER / "animated-report.json"
+TICK_MS = 1000 / 60
+WEBP_QUALITY = 90  # Lossy variant (alpha stays lossless)
+
+# Sequences played start to finish and the entity that advances them
+SEQUENCES = {
+    "explosion-enemy01": {
+        "folder": "explosion-enemy01",
+        "timer": js_sources.SRC_FOLDER / "entities/Explosion.js",
+        "loop": False,
+    },
+    "coin": {
+        "folder": "coin",
+        "timer": js_sources.SRC_FOLDER / "entities/Coin.js",
+        "loop": True,
+    },
+}
+
+def load_frames(name, config):
+    """
+    ([paths], [durations in ticks], [source frames]) of a sequence, key
+    poses first (they are unchanged copies of their source frames)
+    """
+    table = KEYFRAMES_FOLDER / name / "frames.json"
+    ticks = js_sources.ticks_per_frame(*js_sources.frame_timer(config["timer"]))
+    if table.exists():
+        frames = json.loads(table.read_text(encoding="utf-8"))["frames"]
+        return ([KEYFRAMES_FOLDER / name / frame["file"] for frame in frames],
+                [frame["duration"] * ticks for frame in frames],
+                [IMAGES_FOLDER / config["folder"] / frame["source"] for frame in frames])
+    paths = sorted((IMAGES_FOLDER / config["folder"]).glob("*.png"))
+    return paths, [ticks] * len(paths), paths
+
+
+def spritesheet(frames):
+    """Frames in a near-square grid, like a packed atlas would hold them"""
+    columns = math.ceil(math.sqrt(len(frames)))
+    rows = math.ceil(len(frames) / columns)
+    width, height = frames[0].size
+    sheet = Image.new("RGBA", (columns * width, rows * height))
+    for index, frame in enumerate(frames):
+        sheet.paste(frame, ((index % columns) * width, (index // columns) * height))
+    return sheet
+
+
+def encode(frames, durations, loop):
+    """{variant: bytes} of every output option"""
+    durations_ms = [round(ticks * TICK_MS) for ticks in durations]
+    loop_count = 0 if loop else 1
+    outputs = {}
+
+    buffer = io.BytesIO()
+    frames[0].save(buffer, "PNG", save_all=True, append_images=frames[1:], duration=durations_ms,
+                   loop=loop_count, optimize=True)
+    outputs["apng"] = buffer.getvalue()
+
+    for variant, options in (("webp", {"lossless": True, "method": 6}),
+                             ("webp-lossy", {"quality": WEBP_QUALITY, "alpha_quality": 100,
+                                             "method": 6})):
+        buffer = io.BytesIO()
+        frames[0].save(buffer, "WEBP", save_all=True, append_images=frames[1:],
+                       duration=durations_ms, loop=loop_count, **options)
+        outputs[variant] = buffer.getvalue()
+
+    buffer = io.BytesIO()
+    spritesheet(frames).save(buffer, "PNG", optimize=True)
+    outputs["spritesheet"] = buffer.getvalue()
+    return outputs
+
+
+def separate_size(name, sources, recompress=build.RECOMPRESS):
+    """Bytes of the frames built one file each, like the build does, into OUTPUT_FOLDER/<name>/"""
+    folder = OUTPUT_FOLDER / name
+    shutil.rmtree(folder, ignore_errors=True)
+    targets = build.draw_targets()
+    total = 0
+    for source in sources:
+        output = folder / source.name
+        target = targets.get(source)
+        build.process_image(source, output, target, build.quantizes(source, target), recompress)
+        total += output.stat().st_size
+    return total
+
+
+def encode_sequence(name, config, recompress=build.RECOMPRESS):
+    """Write the outputs of one sequence; returns its report entry"""
+    paths, durations, sources = load_frames(name, config)
+    frames = []
+    for path in paths:
+        frames.append(pixel_cache.image(pixel_cache.load(path)[1]))
+
+    outputs = encode(frames, durations, config["loop"])
+    OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
+    suffixes = {"apng": ".png", "webp": ".webp", "webp-lossy": ".lossy.webp",
+                "spritesheet": ".sheet.png"}
+    for variant, data in outputs.items():
+        (OUTPUT_FOLDER / f"{name}{suffixes[variant]}").write_bytes(data)
+
+    sizes = {"separate": separate_size(name, sources, recompress)}
+    sizes.update({variant: len(data) for variant, data in outputs.items()})
+    return {
+        "frames": len(paths),
+        "keyPoses": paths[0].parent.parent == KEYFRAMES_FOLDER,
+        "durationsMs": [round(ticks * TICK_MS) for ticks in durations],
+        "durationMs": round(sum(durations) * TICK_MS),
+        "loop": config["loop"],
+        "sizes": sizes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sequences", nargs="*", default=list(SEQUENCES),
+                        help="sequences to encode (default: all)")
+    parser.add_argument("--no-recompress", dest="recompress", action="store_false",
+                        help="build the separate frames without the PNG recompression search")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("ANIMATED IMAGE OUTPUT")
+    print(f"{'='*70}\n")
+
+    report = {}
+    with profiling.session(args.profile, "animated"):
+        for name in args.sequences:
+            if name not in SEQUENCES:
+                print(f"WARNING: unknown sequence {name}, skipping...")
+                continue
+            report[name] = entry = encode_sequence(name, SEQUENCES[name], args.recompress)
+            print(f"{name}: {entry['frames']} frames, {entry['durationMs']} ms"
+                  f"{' (key poses)' if entry['keyPoses'] else ''}")
+            separate = entry["sizes"]["separate"]
+            for variant, size in entry["sizes"].items():
+                print(f"    {variant:<12} {size / 1024:>8.1f} KB  {size / separate:>6.1%}")
+
+    if report:
+        REPORT_FILE.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nOutput location: {OUTPUT_FOLDER.absolute()}")
+
+
+if __name__ == "__main__":
+    main()
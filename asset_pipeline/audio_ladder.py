@@ -0,0 +1,295 @@
+"""
+Audio encoding ladder: the smallest encode of each track within an error budget.
+
+The .ogg tracks ship at whatever settings they were exported with. This
+decodes each track and encodes candidates along a ladder:
+
+- channels: mono for sound effects (the tracks passed to playSFX in the JS),
+  stereo or mono for music
+- sample rate: 22.05/32/44.1 kHz for effects, 32/44.1 kHz for music, never
+  above the source rate (Vorbis only; Opus always runs at 48 kHz)
+- Vorbis quality and Opus bitrate steps
+
+Every candidate is decoded again and scored against the source with a
+log-spectral distance: per STFT frame (2048 samples, hop 512, Hann), the RMS
+over frequency bins up to MAX_FREQUENCY of the dB difference between the
+magnitudes, floored FLOOR_DB below the track's peak so silence doesn't
+count, averaged over frames and channels. A mono candidate is compared
+against every source channel, so a lost stereo image counts as error. The
+smallest candidate within the budget of its track type wins; the source
+itself is always a candidate.
+
+Encoding and decoding use a local ffmpeg (with libvorbis/libopus); nothing
+leaves the machine. Results are cached by content hash in
+build/.audio-cache/, and the build encodes .ogg files through the same cache
+when ffmpeg is available. The manifest goes to
+build/assets/audio/audio-manifest.json:
+
+    {"shoot.ogg": {"type": "sfx", "sourceBytes": 10897, "bytes": 6120,
+                   "codec": "vorbis", "quality": 1, "channels": 1,
+                   "sampleRate": 22050, "error": 2.41, "candidates": [...]}}
+
+    python -m asset_pipeline.audio_ladder [--workers N]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+from pathlib import Path
+
+from asset_pipeline import build, js_sources, profiling
+
+# Configuration
+AUDIO_FOLDER = Path("assets/audio")
+CACHE_FOLDER = build.BUILD_FOLDER / ".audio-cache"
+MANIFEST_FILE = build.BUILD_FOLDER / "assets/audio/audio-manifest.json"
+SEARCH_VERSION = 1  # Bump when the search changes, to invalidate the cache
+WORKERS = os.cpu_count() or 1
+FFMPEG = "ffmpeg"
+
+FRAME = 2048
+HOP = 512
+MAX_FREQUENCY = 16000  # Hz scored; above this the difference is not counted
+FLOOR_DB = 80  # Magnitudes below peak - FLOOR_DB count as the floor
+
+# Ladder per track type; "budget" is the log-spectral distance allowed (dB)
+LADDERS = {
+    "sfx": {
+        "channels": [1],
+        "sample_rates": [22050, 32000, 44100],
+        "vorbis": [-1, 0, 1, 2, 3, 4],
+        "opus": [24, 32, 48, 64],
+        "budget": 4.0,
+    },
+    "music": {
+        "channels": [2, 1],
+        "sample_rates": [32000, 44100],
+        "vorbis": [0, 1, 2, 3, 4, 5],
+        "opus": [48, 64, 80, 96, 128],
+        "budget": 2.5,
+    },
+}
+
+PLAY_SFX = re.compile(r"playSFX\('assets/audio/([^']+)'\)")
+
+
+def available():
+    """Whether a local ffmpeg is on the PATH"""
+    return shutil.which(FFMPEG) is not None
+
+
+def sfx_tracks():
+    """File names the JS plays through AudioManager.playSFX"""
+    names = set()
+    for js_path in js_sources.SRC_FOLDER.rglob("*.js"):
+        names.update(PLAY_SFX.findall(js_path.read_text(encoding="utf-8")))
+    return names
+
+
+def track_type(path, sfx=None):
+    return "sfx" if path.name in (sfx_tracks() if sfx is None else sfx) else "music"
+
+
+def _ffmpeg(*args):
+    import subprocess
+
+    if not available():
+        raise SystemExit(f"ERROR: {FFMPEG} not found. Install ffmpeg (with libvorbis and "
+                         "libopus) to encode audio.")
+    return subprocess.run([FFMPEG, "-v", "error", "-nostdin", *args], check=True,
+                          stdout=subprocess.PIPE).stdout
+
+
+def decode(path, channels, sample_rate):
+    """float32 (channels, samples) PCM of an audio file"""
+    import numpy as np
+
+    data = _ffmpeg("-i", str(path), "-f", "f32le", "-acodec", "pcm_f32le",
+                   "-ac", str(channels), "-ar", str(sample_rate), "-")
+    return np.frombuffer(data, np.float32).reshape(-1, channels).T
+
+
+def _spectra(signal, window):
+    """Magnitude STFT frames of one channel, in blocks to bound memory"""
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    if len(signal) < FRAME:
+        signal = np.pad(signal, (0, FRAME - len(signal)))
+    frames = sliding_window_view(signal, FRAME)[::HOP]
+    for start in range(0, len(frames), 1024):
+        yield np.abs(np.fft.rfft(frames[start:start + 1024] * window, axis=1))
+
+
+def spectral_error(reference, candidate, sample_rate):
+    """Log-spectral distance (dB) between two (channels, samples) signals"""
+    import numpy as np
+
+    length = min(reference.shape[1], candidate.shape[1])
+    window = np.hanning(FRAME).astype(np.float32)
+    bins = int(MAX_FREQUENCY / (sample_rate / FRAME)) + 1
+    peak = max(float(np.abs(reference).max()), 1e-9) * FRAME / 2
+    floor = peak * 10 ** (-FLOOR_DB / 20)
+    total = count = 0.0
+    for channel in range(reference.shape[0]):
+        other = candidate[min(channel, candidate.shape[0] - 1)]
+        for ref, cand in zip(_spectra(reference[channel, :length], window),
+                             _spectra(other[:length], window)):
+            db = 20 * np.log10(np.maximum(ref[:, :bins], floor) / np.maximum(cand[:, :bins], floor))
+            total += float(np.sqrt((db ** 2).mean(axis=1)).sum())
+            count += len(db)
+    return total / max(count, 1)
+
+
+def ladder(kind, channels, sample_rate):
+    """[settings] of every candidate encode for a track (never upmixed or upsampled)"""
+    config = LADDERS[kind]
+    rates = [rate for rate in config["sample_rates"] if rate <= sample_rate] or [sample_rate]
+    candidates = []
+    for count in config["channels"]:
+        if count > channels:
+            continue
+        for rate in rates:
+            for quality in config["vorbis"]:
+                candidates.append({"codec": "vorbis", "quality": quality, "channels": count,
+                                   "sampleRate": rate})
+        for bitrate in config["opus"]:
+            candidates.append({"codec": "opus", "bitrate": bitrate, "channels": count,
+                               "sampleRate": 48000})
+    return candidates
+
+
+def encode(source, settings, output):
+    """Encode one candidate with ffmpeg (metadata stripped)"""
+    args = ["-y", "-i", str(source), "-map_metadata", "-1", "-vn",
+            "-ac", str(settings["channels"]), "-ar", str(settings["sampleRate"])]
+    if settings["codec"] == "vorbis":
+        args += ["-c:a", "libvorbis", "-q:a", str(settings["quality"])]
+    else:
+        args += ["-c:a", "libopus", "-b:a", f"{settings['bitrate']}k", "-vbr", "on",
+                 "-compression_level", "10", "-application", "audio"]
+    _ffmpeg(*args, "-f", "ogg", str(output))
+
+
+def source_format(path):
+    """(channels, sample_rate) from the Vorbis/Opus identification header"""
+    data = Path(path).read_bytes()[:4096]
+    vorbis = data.find(b"\x01vorbis")
+    if vorbis >= 0:
+        return data[vorbis + 11], struct.unpack_from("<I", data, vorbis + 12)[0]
+    opus = data.find(b"OpusHead")
+    if opus >= 0:
+        return data[opus + 9], struct.unpack_from("<I", data, opus + 12)[0] or 48000
+    raise ValueError(f"Not an Ogg Vorbis/Opus file: {path}")
+
+
+def search(source, kind, workers=WORKERS):
+    """(best encoded bytes, manifest entry) for one track"""
+    # Imported here: every build imports this module just to plan its jobs
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    channels, sample_rate = source_format(source)
+    reference = decode(source, channels, sample_rate)
+    source_bytes = Path(source).stat().st_size
+
+    with tempfile.TemporaryDirectory() as folder:
+        def trial(item):
+            index, settings = item
+            output = Path(folder) / f"{index}.ogg"
+            encode(source, settings, output)
+            error = spectral_error(reference, decode(output, settings["channels"], sample_rate),
+                                   sample_rate)
+            return dict(settings, bytes=output.stat().st_size, error=round(error, 3)), output
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = list(pool.map(trial, enumerate(ladder(kind, channels, sample_rate))))
+
+        budget = LADDERS[kind]["budget"]
+        fitting = [(entry, output) for entry, output in results
+                   if entry["error"] <= budget and entry["bytes"] < source_bytes]
+        candidates = [entry for entry, _ in results]
+        if fitting:
+            best, output = min(fitting, key=lambda item: item[0]["bytes"])
+            data = output.read_bytes()
+        else:
+            best = {"codec": "source", "channels": channels, "sampleRate": sample_rate,
+                    "bytes": source_bytes, "error": 0.0}
+            data = Path(source).read_bytes()
+
+    entry = dict(best, type=kind, sourceBytes=source_bytes, budget=budget,
+                 candidates=sorted(candidates, key=lambda c: c["bytes"]))
+    return data, entry
+
+
+def best_encode(source, kind, workers=WORKERS):
+    """(bytes, manifest entry) through the content-hash cache"""
+    data = Path(source).read_bytes()
+    key = hashlib.sha1(json.dumps([SEARCH_VERSION, kind, LADDERS[kind]]).encode("utf-8")
+                       + data).hexdigest()
+    folder = CACHE_FOLDER / key
+    if (folder / "entry.json").exists():
+        return (folder / "audio.ogg").read_bytes(), json.loads(
+            (folder / "entry.json").read_text(encoding="utf-8"))
+    encoded, entry = search(source, kind, workers)
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "audio.ogg").write_bytes(encoded)
+    (folder / "entry.json").write_text(json.dumps(entry, indent=2), encoding="utf-8")
+    return encoded, entry
+
+
+def process_audio(source, output, kind):
+    """Build job: write the best encode of a track"""
+    from asset_pipeline import report
+
+    timer = report.StageTimer()
+    with timer.stage("audio") as stats:
+        # One thread: the build already runs a file per worker
+        data, _ = best_encode(source, kind, workers=1)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(data)
+        stats["bytes_in"] = source.stat().st_size
+        stats["bytes_out"] = len(data)
+    return {"bytes_in": stats["bytes_in"], "bytes_out": stats["bytes_out"],
+            "stages": timer.as_dict(), "profile": timer.profiles}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("tracks", nargs="*", help="tracks in assets/audio (default: all)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="parallel encodes")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("AUDIO ENCODING LADDER")
+    print(f"{'='*70}\n")
+
+    sfx = sfx_tracks()
+    paths = [AUDIO_FOLDER / name for name in args.tracks] or sorted(AUDIO_FOLDER.glob("*.ogg"))
+    manifest = {}
+    with profiling.session(args.profile, "audio_ladder"):
+        for path in paths:
+            kind = track_type(path, sfx)
+            _, entry = best_encode(path, kind, args.workers)
+            manifest[path.name] = entry
+            chosen = entry["codec"]
+            if chosen == "vorbis":
+                chosen += f" q{entry['quality']}"
+            elif chosen == "opus":
+                chosen += f" {entry['bitrate']} kb/s"
+            print(f"{path.name} ({kind}): {entry['sourceBytes'] / 1024:.1f} KB → "
+                  f"{entry['bytes'] / 1024:.1f} KB, {chosen}, {entry['channels']} ch "
+                  f"{entry['sampleRate']} Hz, error {entry['error']:.2f} dB "
+                  f"(budget {entry['budget']})")
+
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST_FILE.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    print(f"\nManifest: {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
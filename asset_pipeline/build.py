@@ -0,0 +1,411 @@
+"""
+Build the game's assets into build/ using the memory-aware scheduler.
+
+Every file under assets/ (backup and unused folders excluded) becomes one
+job. PNGs are decoded (RGBA sources and resized images through the
+memory-mapped pixel cache, pixel_cache.py), resized to their draw size where
+the JS draws them at an explicit size (see draw_size.py), quantized to 256
+colours where that stays within QUANTIZE_TOLERANCE (quantize_image),
+re-encoded and run through the lossless recompression
+search (png_recompress.py, cached by content hash; --no-recompress skips
+it). With a local ffmpeg, .ogg tracks get the smallest encode within their
+error budget (audio_ladder.py); everything else is copied. Outputs whose
+source and settings did not change since the last build are skipped: when
+neither the JS sources nor a file's size and mtime changed, the cached entry
+is trusted without hashing or opening the image; a file that was only
+touched (same hash) keeps its entry without being opened either. Pillow,
+NumPy and the audio tooling are only imported by the jobs that need them,
+so a build with nothing to do stays well under 200 ms.
+
+Every stage is timed (see report.py) and a JSON report is written to
+build/build-report.json, with one line per build appended to
+build/build-history.jsonl. --profile adds cProfile (and, with
+`--profile memory`, tracemalloc) data per stage, merged across workers, in
+build/profile/. --verify runs the golden-image check (golden.py) on the
+result and exits with status 1 when an image is out of tolerance.
+
+    python -m asset_pipeline.build [--workers N] [--memory-budget MB] [--force] [--summary]
+                                   [--no-recompress] [--verify] [--profile [cpu|memory]]
+"""
+import argparse
+import hashlib
+import io
+import json
+import shutil
+import time
+from pathlib import Path
+
+from asset_pipeline import engine, js_sources, profiling, report
+
+# Configuration
+ASSETS_FOLDER = Path("assets")
+BUILD_FOLDER = Path("build")
+CACHE_FILE = BUILD_FOLDER / ".build-cache.json"
+SKIP_FOLDERS = ("BACKUP", "backup", "UNUSED", "KEYFRAMES", "Copia")
+QUANTIZE_EXCLUDED = ("explosion-enemy01",)  # Same exclusion as compress_assets.py
+# Worst palette error accepted against the unquantized image (golden.compare
+# metrics); images that can't meet it stay truecolour
+QUANTIZE_TOLERANCE = {"mean": 4.0, "max": 48, "bad": 0.01, "ssim": 0.97}
+RECOMPRESS = True  # Lossless PNG recompression search (png_recompress.py)
+REPORT_FILE = BUILD_FOLDER / "build-report.json"
+HISTORY_FILE = BUILD_FOLDER / "build-history.jsonl"
+
+
+def list_sources():
+    """All asset files that belong in the build"""
+    return sorted(
+        path for path in ASSETS_FOLDER.rglob("*")
+        if path.is_file() and not any(skip in part for part in path.parts for skip in SKIP_FOLDERS)
+    )
+
+
+def file_hash(path):
+    """SHA-1 of a file's contents"""
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def file_signature(path):
+    """[size, mtime_ns], the cheap change check done before hashing"""
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def js_fingerprint():
+    """Changes whenever a JS source that draw sizes are read from changes"""
+    signatures = [[str(path)] + file_signature(path)
+                  for path in sorted(js_sources.SRC_FOLDER.rglob("*.js"))]
+    return hashlib.sha1(json.dumps(signatures).encode("utf-8")).hexdigest()
+
+
+def draw_targets():
+    """
+    {path: (w, h)} for images the JS draws at an explicit size.
+
+    Groups whose resampling needs a JS patch are left to draw_size --apply.
+    """
+    from asset_pipeline import draw_size
+
+    targets = {}
+    for files in draw_size.plan_draw_sizes().values():
+        for entry in files:
+            if entry["target"] != entry["source"] and not entry["patches"]:
+                targets[entry["path"]] = entry["target"]
+    return targets
+
+
+def quantizes(source, target=None):
+    """Whether the build quantizes a PNG (grayscale only when it is also resized)"""
+    _, _, channels = engine.image_header(source)
+    return (not any(exc in source.parts for exc in QUANTIZE_EXCLUDED)
+            and (channels != 1 or target is not None))
+
+
+def exact_palette(img):
+    """P image holding exactly the colours of an RGB/RGBA image, or None past 256"""
+    import numpy as np
+    from PIL import Image
+
+    if img.getcolors(256) is None:
+        return None
+    pixels = np.ascontiguousarray(img.convert("RGBA"))
+    # One uint32 per pixel: a 1-D unique instead of the much slower row-wise axis=0
+    colors, indexes = np.unique(pixels.view(np.uint32).ravel(), return_inverse=True)
+    result = Image.fromarray(indexes.reshape(pixels.shape[:2]).astype(np.uint8), "P")
+    palette = colors.view(np.uint8).reshape(-1, 4)[:, :len(img.mode)]
+    result.putpalette(palette.tobytes(), img.mode)
+    return result
+
+
+def quantize_image(img):
+    """
+    256-colour version of an image, or the image itself (as RGB/RGBA) when
+    the palette would be off by more than QUANTIZE_TOLERANCE.
+
+    Images with at most 256 colours get their exact palette (the octree
+    quantizer merges colours even then); RGB images use median cut with a
+    k-means pass, RGBA the octree (the only built-in method that keeps alpha).
+    golden.py checks the build against the same tolerance.
+    """
+    from PIL import Image
+
+    from asset_pipeline import golden
+
+    if img.mode not in ("RGB", "RGBA"):
+        # The quantizers only take RGB/RGBA (LA, L, I;16 ... raise)
+        has_alpha = "A" in img.mode or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+    result = exact_palette(img)
+    if result is not None:
+        return result
+    if img.mode == "RGB":
+        result = img.quantize(colors=256, method=Image.Quantize.MEDIANCUT, kmeans=3)
+    else:
+        result = img.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+    metrics, _ = golden.compare(golden.premultiplied(img.convert("RGBA")),
+                                golden.premultiplied(result.convert("RGBA")))
+    return result if golden.within(metrics, QUANTIZE_TOLERANCE) else img
+
+
+def process_image(source, output, target_size=None, quantize=False, recompress=False, threads=1):
+    """
+    decode → resize → quantize → encode → recompress → write for one PNG.
+    `threads` is the recompression search's thread pool size.
+    """
+    from PIL import Image
+
+    timer = report.StageTimer()
+    bytes_in = source.stat().st_size
+
+    with timer.stage("decode") as stats:
+        img = Image.open(source)
+        resize = bool(target_size) and tuple(target_size) != img.size
+        if resize or img.mode == "RGBA":
+            # RGBA work goes through the decoded-pixel cache (no inflate on rebuilds)
+            from asset_pipeline import pixel_cache
+
+            img.close()
+            key, pixels = pixel_cache.load(source)
+            img = pixel_cache.image(pixels)
+        else:
+            img.load()
+        stats["bytes_in"] = bytes_in
+        stats["pixels"] = img.width * img.height
+
+    result = img
+    if resize:
+        with timer.stage("resize") as stats:
+            _, resized = pixel_cache.derive(
+                key, pixels, "resize-lanczos", list(target_size),
+                lambda p: pixel_cache.image(p).resize(tuple(target_size), Image.Resampling.LANCZOS))
+            result = pixel_cache.image(resized)
+            stats["pixels"] = result.width * result.height
+
+    if quantize:
+        with timer.stage("quantize") as stats:
+            result = quantize_image(result)
+            stats["pixels"] = result.width * result.height
+
+    with timer.stage("encode") as stats:
+        buffer = io.BytesIO()
+        result.save(buffer, "PNG", optimize=True)
+        data = buffer.getvalue()
+        stats["pixels"] = result.width * result.height
+        stats["bytes_out"] = len(data)
+
+    if recompress:
+        from asset_pipeline import png_recompress
+
+        with timer.stage("recompress") as stats:
+            data = png_recompress.recompress(data, workers=threads)
+            stats["pixels"] = result.width * result.height
+            stats["bytes_out"] = len(data)
+
+    with timer.stage("write") as stats:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(data)
+        stats["bytes_out"] = len(data)
+
+    img.close()
+    return {"bytes_in": bytes_in, "bytes_out": len(data), "stages": timer.as_dict(),
+            "profile": timer.profiles}
+
+
+def copy_file(source, output):
+    """Copy a non-image asset unchanged"""
+    timer = report.StageTimer()
+    with timer.stage("copy") as stats:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, output)
+        stats["bytes_in"] = stats["bytes_out"] = output.stat().st_size
+    return {"bytes_in": stats["bytes_in"], "bytes_out": stats["bytes_out"],
+            "stages": timer.as_dict(), "profile": timer.profiles}
+
+
+def load_cache():
+    """
+    {"js": js_fingerprint, "recompress": bool, "audio": bool, "quantize": tolerance,
+     "outputs": {output: {"key", "stat"}}}
+    """
+    if CACHE_FILE.exists():
+        cache = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        if "outputs" in cache:
+            return cache
+    return {}
+
+
+def plan_jobs(force=False, only=None, recompress=RECOMPRESS):
+    """
+    Jobs for every out-of-date output.
+
+    With `only` (a set of source paths), other sources keep their cached
+    entry without being checked. Returns (jobs, cache, hits) where cache is
+    the cache to write once the jobs succeed and hits counts the outputs
+    that were already up to date.
+    """
+    from asset_pipeline import audio_ladder
+
+    cache = {} if force else load_cache()
+    outputs = cache.get("outputs", {})
+    fingerprint = js_fingerprint()
+    audio = audio_ladder.available()
+    # Recompression is lossless, so recompressed outputs also do for a build without it
+    trust_stats = (cache.get("js") == fingerprint and (cache.get("recompress") or not recompress)
+                   and cache.get("audio") == audio and cache.get("quantize") == QUANTIZE_TOLERANCE)
+    targets = None
+    sfx = None
+    jobs = []
+    new_outputs = {}
+    hits = 0
+    for source in list_sources():
+        output = BUILD_FOLDER / source
+        signature = file_signature(source)
+        cached = outputs.get(str(output))
+        if only is not None and source not in only and cached:
+            new_outputs[str(output)] = cached
+            hits += 1
+            continue
+        if trust_stats and cached and cached["stat"] == signature and output.exists():
+            new_outputs[str(output)] = cached
+            hits += 1
+            continue
+        digest = file_hash(source)
+        if trust_stats and cached and cached["key"].startswith(digest + ":") and output.exists():
+            # Touched but unchanged (checkout, copy): same settings, no need to open the image
+            new_outputs[str(output)] = {"key": cached["key"], "stat": signature}
+            hits += 1
+            continue
+
+        if source.suffix.lower() == ".png":
+            if targets is None:
+                targets = draw_targets()
+            target = targets.get(source)
+            quantize = quantizes(source, target)
+            settings = {"target": target, "quantize": quantize and QUANTIZE_TOLERANCE,
+                        "recompress": recompress}
+            job = engine.Job(str(source), process_image,
+                             (source, output, target, quantize, recompress),
+                             engine.estimate_image_memory(source, target, quantize, recompress))
+        elif source.suffix.lower() == ".ogg" and audio:
+            if sfx is None:
+                sfx = audio_ladder.sfx_tracks()
+            kind = audio_ladder.track_type(source, sfx)
+            settings = {"audio": kind, "ladder": audio_ladder.LADDERS[kind]}
+            job = engine.Job(str(source), audio_ladder.process_audio, (source, output, kind),
+                             source.stat().st_size * 40)  # Decoded PCM of source + candidate
+        else:
+            settings = {}
+            job = engine.Job(str(source), copy_file, (source, output), source.stat().st_size)
+
+        key = f"{digest}:{json.dumps(settings, sort_keys=True)}"
+        accepted = {key}
+        if settings.get("recompress") is False:
+            accepted.add(f"{digest}:{json.dumps(dict(settings, recompress=True), sort_keys=True)}")
+        if cached and cached["key"] in accepted and output.exists():
+            new_outputs[str(output)] = {"key": cached["key"], "stat": signature}
+            hits += 1
+            continue
+        new_outputs[str(output)] = {"key": key, "stat": signature}
+        jobs.append(job)
+    return jobs, {"js": fingerprint, "recompress": recompress, "audio": audio,
+                  "quantize": QUANTIZE_TOLERANCE, "outputs": new_outputs}, hits
+
+
+def build(workers=engine.WORKERS, memory_budget_mb=engine.MEMORY_BUDGET_MB, force=False,
+          summary=False, profile=None, only=None, recompress=RECOMPRESS):
+    """
+    Run the asset build; returns the build report.
+
+    `profile` is a profiling.Session; `only` limits the check to a set of
+    sources (see plan_jobs).
+    """
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    timer = report.StageTimer()
+    previous = load_cache()
+
+    with timer.stage("plan") as stats:
+        jobs, cache, hits = plan_jobs(force, only, recompress)
+        stats["bytes_in"] = sum(entry["stat"][0] for entry in cache["outputs"].values())
+    stages = timer.as_dict()
+    if profile:
+        profile.add(timer.profiles)
+
+    if jobs:
+        workers = max(1, min(workers, len(jobs)))  # No pool start-up for a single file
+        threads = max(1, engine.WORKERS // workers)
+        if recompress and threads > 1:
+            # Cores the worker processes leave idle (all of them for a single
+            # image) go to each image's recompression search
+            jobs = [job._replace(args=job.args + (threads,)) if job.func is process_image else job
+                    for job in jobs]
+        peak = max(job.memory for job in jobs)
+        print(f"{len(jobs)} job(s), largest needs ~{peak / 1024 / 1024:.1f} MB "
+              f"(budget {memory_budget_mb} MB, {workers} worker(s))")
+        results = engine.run_jobs(jobs, workers, memory_budget_mb * 1024 * 1024)
+        for result in results.values():
+            report.merge_stages(stages, result["stages"])
+            if profile:
+                profile.add(result["profile"])
+
+        total_in = sum(r["bytes_in"] for r in results.values())
+        total_out = sum(r["bytes_out"] for r in results.values())
+        print(f"Built {len(results)} file(s): {total_in/1024:.1f} KB → {total_out/1024:.1f} KB")
+    else:
+        print("Build is up to date.")
+
+    # Outputs whose source was deleted
+    for name in previous.get("outputs", {}):
+        if name not in cache["outputs"] and Path(name).exists():
+            Path(name).unlink()
+            print(f"Removed {name}")
+
+    if force or cache != previous:
+        BUILD_FOLDER.mkdir(parents=True, exist_ok=True)
+        CACHE_FILE.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+
+    # Worker CPU time is only visible through the stage timers
+    worker_cpu = sum(totals["cpu"] for name, totals in stages.items() if name != "plan")
+    cpu = time.process_time() - cpu + (worker_cpu if workers > 1 else 0)
+    build_report = report.build_report(stages, hits, len(jobs),
+                                       time.perf_counter() - wall, cpu, len(jobs))
+    report.write_report(build_report, REPORT_FILE, HISTORY_FILE)
+    if jobs:
+        from asset_pipeline import pixel_cache
+
+        pixel_cache.prune()
+    if summary:
+        print()
+        print(report.format_summary(build_report))
+    return build_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=engine.WORKERS)
+    parser.add_argument("--memory-budget", type=int, default=engine.MEMORY_BUDGET_MB,
+                        help=f"MB of image memory in flight (default {engine.MEMORY_BUDGET_MB})")
+    parser.add_argument("--force", action="store_true", help="rebuild everything")
+    parser.add_argument("--summary", action="store_true", help="print a per-stage table")
+    parser.add_argument("--no-recompress", dest="recompress", action="store_false",
+                        help="skip the lossless PNG recompression search")
+    parser.add_argument("--verify", action="store_true",
+                        help="check the built images against their sources")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("COSMIC PARASITE - ASSET BUILD")
+    print(f"{'='*70}\n")
+    with profiling.session(args.profile) as profile:
+        build(args.workers, args.memory_budget, args.force, args.summary, profile,
+              recompress=args.recompress)
+    if args.verify:
+        from asset_pipeline import golden
+
+        print()
+        if not golden.verify():
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
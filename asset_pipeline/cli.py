@@ -0,0 +1,74 @@
+"""
+Single entry point for the pipeline and score service commands.
+
+    cosmic-parasite build [--workers N] [--force] ...
+    cosmic-parasite draw-size [--apply]
+    python -m asset_pipeline <command> ...
+
+Only the module of the chosen command is imported, and the modules
+themselves import Pillow, NumPy and friends inside the stages that use
+them, so a no-op build never loads them. A missing dependency is reported
+with the package to install; nothing is installed at run time.
+"""
+import importlib
+import sys
+
+COMMANDS = {
+    "build": ("asset_pipeline.build", "build assets/ into build/ (incremental)"),
+    "golden": ("asset_pipeline.golden", "check built images against their sources (SSIM, diffs)"),
+    "audio-ladder": ("asset_pipeline.audio_ladder", "smallest audio encodes within an error budget"),
+    "png-recompress": ("asset_pipeline.png_recompress", "lossless PNG recompression search (cached)"),
+    "watch": ("asset_pipeline.watch", "rebuild affected outputs whenever assets or JS change"),
+    "serve": ("asset_pipeline.serve", "serve the built game like production (gzip, ETag, Range)"),
+    "preload-manifest": ("asset_pipeline.preload_manifest",
+                         "critical/stage/deferred bundles with sizes for the loader"),
+    "animated": ("asset_pipeline.animated", "APNG/animated WebP of frame sequences, with sizes"),
+    "effects": ("asset_pipeline.effects", "bake canvas glow/opacity into asset variants"),
+    "starfield": ("asset_pipeline.starfield", "pre-render tileable Starfield layer textures"),
+    "transform-dedupe": ("asset_pipeline.transform_dedupe",
+                         "find sprites that are flipped/rotated copies of others"),
+    "font-atlas": ("asset_pipeline.font_atlas", "bitmap font atlas for the fillText styles"),
+    "draw-size": ("asset_pipeline.draw_size", "resample images to their JS draw size"),
+    "texture-period": ("asset_pipeline.texture_period", "crop tiled textures to one period"),
+    "frame-resample": ("asset_pipeline.frame_resample", "pick animation key poses"),
+    "score-server": ("score_service.server", "run the Python score service"),
+    "score-maintenance": ("score_service.maintenance", "migrate and trim scores_cosmic.db"),
+    "score-loadtest": ("score_service.loadtest", "load-test the score API on localhost"),
+}
+
+# Import name → pip package, for dependency errors
+PACKAGES = {"PIL": "pillow", "numpy": "numpy", "pygame": "pygame"}
+
+
+def usage():
+    lines = ["usage: cosmic-parasite <command> [options]", "", "commands:"]
+    lines += [f"  {name:<18} {description}" for name, (_, description) in COMMANDS.items()]
+    lines.append("\nRun 'cosmic-parasite <command> --help' for the options of a command.")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    module_name, _ = COMMANDS[command]
+    try:
+        importlib.import_module(module_name).main(args)
+    except ModuleNotFoundError as e:
+        root = (e.name or "").split(".")[0]
+        if root not in PACKAGES:
+            raise
+        print(f"ERROR: '{command}' needs {PACKAGES[root]}, which is not installed.\n"
+              f"Install it with: pip install {PACKAGES[root]}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
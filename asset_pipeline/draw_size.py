@@ -0,0 +1,311 @@
+"""
+Resample assets to exactly the pixel size the game draws them at.
+
+The render sizes are read from the JS sources (logoScale in Game.js,
+groundScale in Environment.js, sprite sizes in Player.js/Projectile.js/
+Enemy.js, CANVAS_WIDTH/HEIGHT in Constants.js) instead of being copied by
+hand. Assets are only ever made smaller: anything the game draws larger than
+its source is left alone.
+
+After resampling, the JS scale/sprite constants are rewritten so the game
+draws the new files 1:1 and the browser no longer rescales them every frame.
+
+    python -m asset_pipeline.draw_size            # show the plan
+    python -m asset_pipeline.draw_size --apply    # resample + patch JS
+"""
+import argparse
+import shutil
+from pathlib import Path
+
+from PIL import Image
+
+from asset_pipeline import js_sources, pixel_cache, profiling
+
+# Configuration
+IMAGES_FOLDER = Path("assets/images")
+ASPECT_TOLERANCE = 0.02  # Branches drawing one sprite may differ this much in aspect
+BACKUP_FOLDER = Path("assets/images_BACKUP_DRAW_SIZE")
+CONSTANTS_JS = js_sources.SRC_FOLDER / "utils/Constants.js"
+PLAYER_JS = js_sources.SRC_FOLDER / "entities/Player.js"
+PROJECTILE_JS = js_sources.SRC_FOLDER / "entities/Projectile.js"
+
+# Where the on-screen size of each asset group comes from:
+#   "scale":      JS scale literal multiplied with the image size (patched)
+#   "frame":      JS width/height of one spritesheet cell (patched)
+#   "draw":       JS width/height the image (or one cell) is drawn at
+#   "occurrence": which assignments of the "draw" names (the constructor branches
+#                 that draw this sprite) to use; None = all of them
+#   "fit_height": drawn height as a fraction of CANVAS_HEIGHT (runtime scale)
+# The mist layer is left out: its scale is a constructor argument, and it is
+# drawn larger than its source anyway.
+DRAW_SIZES = {
+    "logo": {
+        "files": ["logo_v5.png"],
+        "scale": (js_sources.SRC_FOLDER / "core/Game.js", "logoScale"),
+    },
+    "player": {
+        "files": ["helicoptero_alpha.png", "helicoptero_left_alpha.png"],
+        "frame": (PLAYER_JS, "this.spriteWidth", "this.spriteHeight"),
+        "scale": (PLAYER_JS, "scale"),
+    },
+    "turn": {
+        "files": "turn/*.png",
+        "scale": (PLAYER_JS, "scale"),
+    },
+    "enemy01": {
+        "files": "enemy01/*.png",
+        "scale": (js_sources.SRC_FOLDER / "entities/Enemy.js", "this.scale"),
+    },
+    "explosion": {
+        "files": "explosion-enemy01/*.png",
+        "scale": (js_sources.SRC_FOLDER / "entities/Explosion.js", "scale"),
+    },
+    "coin": {
+        "files": "coin/*.png",
+        "draw": (js_sources.SRC_FOLDER / "entities/Coin.js", "this.width", "this.height"),
+    },
+    "missile": {
+        "files": ["missile_fixed.png"],
+        "frame": (PROJECTILE_JS, "this.spriteWidth", "this.spriteHeight"),
+        "draw": (PROJECTILE_JS, "this.width", "this.height"),
+        "occurrence": (1, 2),  # giant_missile and missile branches
+    },
+    "alien_spit": {
+        "files": ["alien-spit.png"],
+        "draw": (PROJECTILE_JS, "this.width", "this.height"),
+        "occurrence": (0,),  # alien_spit branch
+    },
+    "ground": {
+        "files": ["ground_v4.png", "ground_intro.png"],
+        "scale": (js_sources.SRC_FOLDER / "environment/Environment.js", "this.groundScale"),
+    },
+    "backgrounds": {
+        "files": ["cave_bg_v2.png", "cave_bg_huge.png"],
+        "fit_height": 1.0,
+    },
+    "easter_egg": {
+        "files": ["ground_easter.png"],
+        "fit_height": 0.85,  # Environment.spawnEasterEgg
+    },
+}
+
+
+def canvas_size():
+    """CANVAS_WIDTH/CANVAS_HEIGHT from Constants.js"""
+    return (js_sources.read_value(CONSTANTS_JS, "CANVAS_WIDTH"),
+            js_sources.read_value(CONSTANTS_JS, "CANVAS_HEIGHT"))
+
+
+def list_files(config):
+    """Resolve the "files" entry of a group to existing paths"""
+    if isinstance(config["files"], str):
+        return sorted(IMAGES_FOLDER.glob(config["files"]))
+    return [IMAGES_FOLDER / f for f in config["files"] if (IMAGES_FOLDER / f).exists()]
+
+
+def _shrink(size, drawn, canvas=None):
+    """
+    Target size: the drawn size, never larger than the source.
+
+    Without a canvas the aspect ratio is kept (the JS applies one scale to
+    both axes). With one, the image becomes exactly the drawn size (capped
+    to the canvas) when that fits inside the source; if it is drawn larger on
+    either axis, the source is kept, since shrinking only the other axis
+    would give an aspect ratio that matches neither.
+    """
+    if canvas is None:
+        factor = min(1.0, drawn[0] / size[0], drawn[1] / size[1])
+        return tuple(max(1, round(s * factor)) for s in size)
+    drawn = tuple(max(1, min(round(d), c)) for d, c in zip(drawn, canvas))
+    if any(d > s for d, s in zip(drawn, size)):
+        return size
+    return drawn
+
+
+def draw_branches(config):
+    """[(w, h)] the sprite is drawn at, one per JS branch that draws it"""
+    js_path, width_name, height_name = config["draw"]
+    widths = js_sources.read_values(js_path, width_name)
+    heights = js_sources.read_values(js_path, height_name)
+    if not widths or len(widths) != len(heights):
+        raise KeyError(f"Unpaired '{width_name}'/'{height_name}' assignments in {js_path}")
+    occurrence = config.get("occurrence")
+    indexes = range(len(widths)) if occurrence is None else occurrence
+    return [(widths[i], heights[i]) for i in indexes]
+
+
+def plan_file(path, config, canvas):
+    """
+    Work out the target size of one file and the JS values that must change.
+
+    Returns a dict with "path", "source", "target", "cell" (source, target
+    size of one spritesheet cell), "patches" [(js_path, name, value)] and
+    "warning" (why a file is kept at its size, or None).
+    """
+    with Image.open(path) as img:
+        size = img.size
+
+    cell = size
+    if "frame" in config:
+        js_path, width_name, height_name = config["frame"]
+        cell = (js_sources.read_value(js_path, width_name),
+                js_sources.read_value(js_path, height_name))
+
+    scale = None
+    warning = None
+    if "scale" in config:
+        scale = js_sources.read_value(*config["scale"])
+        drawn = (cell[0] * scale, cell[1] * scale)
+    elif "draw" in config:
+        branches = draw_branches(config)
+        aspects = [w / h for w, h in branches]
+        if max(aspects) > min(aspects) * (1 + ASPECT_TOLERANCE):
+            # One cell can't be drawn 1:1 at sizes of different shapes
+            warning = "drawn at " + ", ".join(f"{w:g}x{h:g}" for w, h in branches)
+            drawn = cell
+        else:
+            drawn = max(branches)
+    else:
+        fit = canvas[1] * config["fit_height"] / size[1]
+        drawn = (size[0] * fit, size[1] * fit)
+
+    new_cell = _shrink(cell, drawn, canvas if "draw" in config else None)
+    cols, rows = size[0] // cell[0], size[1] // cell[1]
+    target = (new_cell[0] * cols, new_cell[1] * rows)
+
+    patches = []
+    if target != size:
+        if "frame" in config:
+            js_path, width_name, height_name = config["frame"]
+            patches.append((js_path, width_name, new_cell[0]))
+            patches.append((js_path, height_name, new_cell[1]))
+        if scale is not None:
+            # Keep the drawn width identical: old_scale * old_w == new_scale * new_w
+            patches.append((*config["scale"], round(scale * cell[0] / new_cell[0], 3)))
+
+    return {
+        "path": path,
+        "source": size,
+        "target": target,
+        "cell": (cell, new_cell),
+        "patches": patches,
+        "warning": warning,
+    }
+
+
+def plan_draw_sizes(groups=DRAW_SIZES):
+    """Plan every asset group; returns {group_name: [file plans]}"""
+    canvas = canvas_size()
+    return {name: [plan_file(path, config, canvas) for path in list_files(config)]
+            for name, config in groups.items()}
+
+
+def resample(path, cell, new_cell, target):
+    """Resample an image (cell by cell for spritesheets) with Lanczos"""
+    with Image.open(path) as img:
+        mode = img.mode
+    # Decoded RGBA from the pixel cache (LANCZOS is not applied to palette images)
+    img = pixel_cache.image(pixel_cache.load(path)[1])
+    if cell == img.size:
+        result = img.resize(target, Image.Resampling.LANCZOS)
+    else:
+        # Resize each cell on its own so neighbouring frames don't bleed in
+        result = Image.new("RGBA", target, (0, 0, 0, 0))
+        for row in range(target[1] // new_cell[1]):
+            for col in range(target[0] // new_cell[0]):
+                frame = img.crop((col * cell[0], row * cell[1],
+                                  (col + 1) * cell[0], (row + 1) * cell[1]))
+                result.paste(frame.resize(new_cell, Image.Resampling.LANCZOS),
+                             (col * new_cell[0], row * new_cell[1]))
+    if mode == "P":
+        # Keep already-compressed assets compressed (same as compress_assets.py)
+        result = result.quantize(colors=256, method=2, dither=1)
+    result.save(path, "PNG", optimize=True)
+
+
+def collect_patches(plan):
+    """Merge JS patches of all files; conflicting values are reported and dropped"""
+    patches = {}
+    conflicts = set()
+    for files in plan.values():
+        for entry in files:
+            for js_path, name, value in entry["patches"]:
+                key = (Path(js_path), name)
+                if key in patches and abs(patches[key] - value) > 0.001:
+                    conflicts.add(key)
+                patches.setdefault(key, value)
+    for key in conflicts:
+        print(f"WARNING: conflicting values for {key[1]} in {key[0]}, not patched")
+        del patches[key]
+    return patches
+
+
+def apply_plan(plan):
+    """Back up, resample and patch the JS sources"""
+    if not BACKUP_FOLDER.exists():
+        print(f"Creating backup folder: {BACKUP_FOLDER}")
+        BACKUP_FOLDER.mkdir(parents=True)
+
+    for files in plan.values():
+        for entry in files:
+            if entry["target"] == entry["source"]:
+                continue
+            path = entry["path"]
+            backup_path = BACKUP_FOLDER / path.relative_to(IMAGES_FOLDER)
+            if not backup_path.exists():
+                backup_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, backup_path)
+            resample(path, *entry["cell"], entry["target"])
+
+    for (js_path, name), value in collect_patches(plan).items():
+        if js_sources.patch_value(js_path, name, value, occurrence=None):
+            print(f"Patched {js_path}: {name} = {js_sources.format_number(value)}")
+
+
+def print_plan(plan):
+    """Print source vs. target size for every group"""
+    total_source = 0
+    total_target = 0
+    for name, files in plan.items():
+        if not files:
+            continue
+        first = files[0]
+        pixels = sum(e["source"][0] * e["source"][1] for e in files)
+        new_pixels = sum(e["target"][0] * e["target"][1] for e in files)
+        total_source += pixels
+        total_target += new_pixels
+        state = "keep" if pixels == new_pixels else "resample"
+        print(f"{name:<12} {len(files):>3} file(s) "
+              f"{first['source'][0]}x{first['source'][1]} → "
+              f"{first['target'][0]}x{first['target'][1]} ({state})")
+        if first["warning"]:
+            print(f"{'':<12} kept: {first['warning']} (aspect ratios differ)")
+    if total_source:
+        print(f"\nPixels: {total_source:,} → {total_target:,} "
+              f"({100 - total_target / total_source * 100:.1f}% fewer)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true",
+                        help="resample the files and patch the JS constants")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("RESAMPLE ASSETS TO DRAW SIZE")
+    print(f"{'='*70}\n")
+
+    with profiling.session(args.profile, "draw_size"):
+        plan = plan_draw_sizes()
+        print_plan(plan)
+
+        if args.apply:
+            apply_plan(plan)
+            print(f"\nBackup location: {BACKUP_FOLDER.absolute()}")
+        else:
+            print("\nDry run. Use --apply to resample and patch the JS sources.")
+
+
+if __name__ == "__main__":
+    main()
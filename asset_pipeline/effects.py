@@ -0,0 +1,148 @@
+"""
+Bake canvas glow/shadow and constant opacity into asset variants.
+
+Game.drawStartScreen used to draw logo_v5.png with shadowBlur 6 in
+#00ff00 and Environment.draw the mist layer at globalAlpha 0.3, making the
+canvas blur the logo (and composite the mist with an extra alpha pass) on
+every frame. The effects are rendered here once instead:
+
+- glow: the canvas shadow model (Gaussian of the alpha channel with
+  sigma = shadowBlur / 2 canvas pixels, tinted, drawn under the image),
+  converted to image pixels through the JS draw scale. The output is padded
+  so the glow fits; the padding is written to the JS constant that offsets
+  the draw call.
+- opacity: the alpha channel multiplied by a constant.
+
+Outputs sit next to their sources (run again after draw_size --apply
+resamples a source) and are described in effects.json:
+
+    {"logo_v5_glow.png": {"source": "logo_v5.png", "pad": 7,
+                          "offset": [-7, -7], "size": [477, 280], ...}}
+
+    python -m asset_pipeline.effects            # show the plan
+    python -m asset_pipeline.effects --apply    # render + patch JS
+"""
+import argparse
+import json
+import math
+from pathlib import Path
+
+from asset_pipeline import js_sources, pixel_cache, profiling
+
+# Configuration
+IMAGES_FOLDER = Path("assets/images")
+METADATA_FILE = IMAGES_FOLDER / "effects.json"
+GAME_JS = js_sources.SRC_FOLDER / "core/Game.js"
+SIGMAS = 3  # Glow padding, in standard deviations
+
+# Effects baked into each variant. "scale" is the JS draw scale the glow
+# radius is divided by; "pad" is the JS constant holding the padding.
+EFFECTS = {
+    "logo_v5_glow.png": {
+        "source": "logo_v5.png",
+        "glow": {"blur": 6, "color": "#00ff00"},
+        "scale": (GAME_JS, "logoScale"),
+        "pad": (GAME_JS, "logoGlowPad"),
+    },
+    "mist_texture_a30.png": {
+        "source": "mist_texture.png",
+        "opacity": 0.3,
+    },
+}
+
+
+def parse_color(value):
+    """'#rgb' or '#rrggbb' → (r, g, b, 255)"""
+    value = value.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4)) + (255,)
+
+
+def glow_sigma(config):
+    """Glow standard deviation in image pixels"""
+    scale = js_sources.read_value(*config["scale"]) if "scale" in config else 1.0
+    return config["glow"]["blur"] / 2 / scale
+
+
+def render(name, config):
+    """Render one variant; returns (image, metadata)"""
+    from PIL import Image, ImageFilter
+
+    source = pixel_cache.image(pixel_cache.load(IMAGES_FOLDER / config["source"])[1])
+    metadata = {"source": config["source"], "pad": 0, "offset": [0, 0]}
+
+    if "glow" in config:
+        sigma = glow_sigma(config)
+        pad = math.ceil(SIGMAS * sigma)
+        padded = Image.new("RGBA", (source.width + 2 * pad, source.height + 2 * pad))
+        padded.paste(source, (pad, pad))
+        alpha = padded.getchannel("A").filter(ImageFilter.GaussianBlur(sigma))
+        color = parse_color(config["glow"]["color"])
+        glow = Image.new("RGBA", padded.size, color[:3] + (0,))
+        glow.putalpha(alpha.point(lambda a: a * color[3] // 255))
+        source = Image.alpha_composite(glow, padded)
+        metadata.update(pad=pad, offset=[-pad, -pad], glow=dict(config["glow"], sigma=round(sigma, 3)))
+
+    if "opacity" in config:
+        opacity = config["opacity"]
+        source.putalpha(source.getchannel("A").point(lambda a: round(a * opacity)))
+        metadata["opacity"] = opacity
+
+    metadata["size"] = list(source.size)
+    return source, metadata
+
+
+def plan_effects():
+    """[(name, config, pad)] with the padding each variant will get"""
+    plan = []
+    for name, config in EFFECTS.items():
+        pad = math.ceil(SIGMAS * glow_sigma(config)) if "glow" in config else 0
+        plan.append((name, config, pad))
+    return plan
+
+
+def apply_effects():
+    """Render every variant, write effects.json and patch the padding constants"""
+    metadata = {}
+    for name, config in EFFECTS.items():
+        image, metadata[name] = render(name, config)
+        # Same palette compression as the other assets
+        image.quantize(colors=256, method=2, dither=1).save(IMAGES_FOLDER / name, "PNG",
+                                                             optimize=True)
+        print(f"Wrote {IMAGES_FOLDER / name} ({image.width}x{image.height})")
+        if "pad" in config and js_sources.patch_value(*config["pad"], metadata[name]["pad"]):
+            print(f"Patched {config['pad'][0]}: {config['pad'][1]} = {metadata[name]['pad']}")
+    METADATA_FILE.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    print(f"Metadata: {METADATA_FILE}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true",
+                        help="render the variants and patch the JS padding constants")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("BAKE CANVAS EFFECTS")
+    print(f"{'='*70}\n")
+
+    with profiling.session(args.profile, "effects"):
+        for name, config, pad in plan_effects():
+            baked = []
+            if "glow" in config:
+                baked.append(f"glow {config['glow']['color']} blur {config['glow']['blur']}")
+            if "opacity" in config:
+                baked.append(f"opacity {config['opacity']}")
+            print(f"{config['source']} → {name}: {', '.join(baked)}, pad {pad}px")
+
+        if args.apply:
+            print()
+            apply_effects()
+        else:
+            print("\nDry run. Use --apply to render the variants and patch the JS sources.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Memory-aware job scheduler for the asset build.
+
+Decoding cave_bg_huge-class images plus their LANCZOS intermediates in
+parallel can use a lot of RAM, while small frames barely use any. Each job
+carries a peak-memory estimate taken from the image header (no decoding),
+and jobs are only admitted to the worker pool while the sum of the running
+estimates fits in a global budget:
+
+- jobs are started largest first, and the remaining budget is filled with
+  whatever smaller jobs still fit (small frames get packed densely);
+- a job larger than the whole budget only starts when nothing else runs.
+"""
+import os
+from collections import namedtuple
+
+# Configuration
+MEMORY_BUDGET_MB = 1024
+WORKERS = os.cpu_count() or 1
+
+# Bytes per pixel of the modes we decode (everything is converted to RGBA)
+MODE_CHANNELS = {"1": 1, "L": 1, "P": 1, "LA": 2, "RGB": 3, "RGBA": 4}
+
+Job = namedtuple("Job", "name func args memory")
+
+
+def image_header(path):
+    """(width, height, channels) from the image header, without decoding"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return img.width, img.height, MODE_CHANNELS.get(img.mode, 4)
+
+
+def estimate_image_memory(path, target_size=None, quantize=False, recompress=False):
+    """
+    Peak bytes needed to decode, resize, quantize, encode and recompress one
+    image.
+
+    decoded source + RGBA copy + LANCZOS horizontal pass (target width x
+    source height) + resized output + quantized/encode buffers.
+    """
+    width, height, channels = image_header(path)
+    target_w, target_h = target_size or (width, height)
+    peak = width * height * channels + width * height * 4
+    if (target_w, target_h) != (width, height):
+        peak += target_w * height * 4 + target_w * target_h * 4
+    if quantize:
+        peak += target_w * target_h * 5  # Palette image + octree/dither work
+    peak += target_w * target_h * 4  # Filtered scanlines kept for optimize=True
+    if recompress:
+        peak += target_w * target_h * 4 * 16  # Filter trials and int16 predictors
+    return peak
+
+
+def run_jobs(jobs, workers=WORKERS, memory_budget=MEMORY_BUDGET_MB * 1024 * 1024,
+             on_result=None):
+    """
+    Run jobs in a process pool without exceeding the memory budget.
+
+    Returns {job.name: result}. on_result(job, result) is called as each
+    job finishes. Exceptions from jobs are re-raised here.
+    """
+    pending = sorted(jobs, key=lambda job: job.memory, reverse=True)
+    results = {}
+    if not pending:
+        return results
+
+    if workers <= 1:
+        for job in pending:
+            results[job.name] = job.func(*job.args)
+            if on_result:
+                on_result(job, results[job.name])
+        return results
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    running = {}
+    in_use = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for job in list(pending):
+                if len(running) >= workers:
+                    break
+                cost = min(job.memory, memory_budget)
+                if in_use + cost <= memory_budget or not running:
+                    running[pool.submit(job.func, *job.args)] = (job, cost)
+                    in_use += cost
+                    pending.remove(job)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, cost = running.pop(future)
+                in_use -= cost
+                results[job.name] = future.result()
+                if on_result:
+                    on_result(job, results[job.name])
+    return results
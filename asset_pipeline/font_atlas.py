@@ -0,0 +1,307 @@
+"""
+Bitmap font atlas for the text the game draws with ctx.fillText.
+
+Every method in the JS sources is walked in order, tracking ctx.font,
+fillStyle, shadowBlur/shadowColor and save()/restore(), so each fillText
+call is tied to the exact style it is drawn with. Its string literals give
+the glyphs actually used; dynamic parts (${...}, concatenated values) add
+digits, A-Z and a little punctuation. Each style's glyphs are rasterized
+with the canvas shadow baked in (Gaussian, sigma = shadowBlur / 2) and
+shelf-packed into one atlas, described by a JSON file with per-glyph
+metrics (atlas rect, offsets from the pen position on the baseline,
+advance) and the non-zero kerning pairs.
+
+"Courier New" is looked up in the usual font folders, falling back to the
+metric-compatible Liberation Mono; use --font/--bold-font to point at
+specific files.
+
+    python -m asset_pipeline.font_atlas            # show the styles and glyphs
+    python -m asset_pipeline.font_atlas --apply    # write the atlas + JSON
+"""
+import argparse
+import json
+import math
+import os
+import re
+from pathlib import Path
+
+from asset_pipeline import js_sources, profiling
+
+# Configuration
+OUTPUT_FOLDER = Path("assets/fonts")
+ATLAS_NAME = "hud-atlas"
+ATLAS_WIDTH = 512
+GLYPH_SPACING = 1  # Empty pixels between glyphs (no bleeding with filtering)
+SIGMAS = 3  # Shadow padding, in standard deviations
+DYNAMIC_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ .,-"  # ${...} and concatenated values
+
+FONT_DIRS = ["/usr/share/fonts", "/usr/local/share/fonts", "~/.fonts", "~/.local/share/fonts",
+             "/Library/Fonts", "/System/Library/Fonts", "C:/Windows/Fonts"]
+FONT_FILES = {
+    "normal": ["cour.ttf", "Courier New.ttf", "LiberationMono-Regular.ttf",
+               "NimbusMonoPS-Regular.otf", "DejaVuSansMono.ttf"],
+    "bold": ["courbd.ttf", "Courier New Bold.ttf", "LiberationMono-Bold.ttf",
+             "NimbusMonoPS-Bold.otf", "DejaVuSansMono-Bold.ttf"],
+}
+
+METHOD = re.compile(r"^    (?:async\s+)?(\w+)\s*\([^)]*\)\s*\{", re.MULTILINE)
+CLASS = re.compile(r"\bclass\s+(\w+)")
+STATEMENT = re.compile(
+    r"\.(font|fillStyle|shadowColor)\s*=\s*(['\"`])(.*?)\2"
+    r"|\.shadowBlur\s*=\s*([\d.]+)"
+    r"|\.(save|restore)\(\)"
+    r"|\.fillText\(")
+FONT = re.compile(r"(?:(bold|normal)\s+)?(\d+)px\s+(.+)")
+
+
+def _first_argument(text, start):
+    """Source of the first call argument starting at `start`"""
+    depth = 0
+    quote = None
+    index = start
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == "\\":
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            if depth == 0:
+                break
+            depth -= 1
+        elif char == "," and depth == 0:
+            break
+        index += 1
+    return text[start:index]
+
+
+def literal_chars(expression):
+    """(chars in the string literals, whether any part is dynamic)"""
+    chars = set()
+    dynamic = False
+    rest = expression
+    for match in re.finditer(r"(['\"])((?:\\.|(?!\1).)*)\1|`([^`]*)`", expression):
+        if match.group(3) is not None:
+            template = match.group(3)
+            dynamic |= "${" in template
+            chars.update(re.sub(r"\$\{[^}]*\}", "", template))
+        else:
+            chars.update(match.group(2))
+        rest = rest.replace(match.group(0), "")
+    if re.search(r"[\w)\]]", rest):
+        dynamic = True  # Concatenated variables or calls
+    return chars, dynamic
+
+
+def scan_styles(src_folder=js_sources.SRC_FOLDER):
+    """
+    {style key: {"font", "color", "shadow", "chars", "texts"}} for every
+    fillText call in the JS sources.
+    """
+    styles = {}
+    for js_path in sorted(Path(src_folder).rglob("*.js")):
+        text = js_path.read_text(encoding="utf-8")
+        for class_match in CLASS.finditer(text):
+            class_text = js_sources.method_body(js_path, class_match.group(1), None)
+            for method in METHOD.finditer(class_text):
+                if method.group(1) in ("if", "for", "while", "switch", "catch"):
+                    continue
+                body = class_text[method.start():js_sources._block_end(class_text, method.end() - 1)]
+                _scan_method(js_path, body, styles)
+    return styles
+
+
+def _scan_method(js_path, body, styles):
+    state = {"font": "10px sans-serif", "fillStyle": "#000000", "shadowColor": "rgba(0, 0, 0, 0)",
+             "shadowBlur": 0.0}
+    stack = []
+    for match in STATEMENT.finditer(body):
+        if match.group(1):
+            value = match.group(3)
+            for name in re.findall(r"\$\{(\w+)\}", value):
+                values = js_sources.read_values(js_path, name)
+                if values:
+                    value = value.replace("${" + name + "}", js_sources.format_number(values[0]))
+            state[match.group(1)] = value
+        elif match.group(4):
+            state["shadowBlur"] = float(match.group(4))
+        elif match.group(5) == "save":
+            stack.append(dict(state))
+        elif match.group(5) == "restore":
+            if stack:
+                state = stack.pop()
+        else:
+            chars, dynamic = literal_chars(_first_argument(body, match.end()))
+            if dynamic:
+                chars |= set(DYNAMIC_CHARS)
+            shadow = None
+            if state["shadowBlur"] > 0:
+                shadow = {"blur": state["shadowBlur"], "color": state["shadowColor"]}
+            key = f"{state['font']} | {state['fillStyle']}" + (
+                f" | shadow {shadow['blur']:g} {shadow['color']}" if shadow else "")
+            style = styles.setdefault(key, {"font": state["font"], "color": state["fillStyle"],
+                                            "shadow": shadow, "chars": set(), "texts": []})
+            style["chars"] |= chars
+            style["texts"].append(_first_argument(body, match.end()).strip())
+
+
+def parse_font(font):
+    """CSS font shorthand → (weight, px size)"""
+    match = FONT.search(font)
+    if not match:
+        raise ValueError(f"Unsupported font: {font!r}")
+    return match.group(1) or "normal", int(match.group(2))
+
+
+def find_font_file(weight, override=None):
+    """Path of the monospace font used for `weight`"""
+    if override:
+        return Path(override)
+    for name in FONT_FILES[weight]:
+        for folder in FONT_DIRS:
+            folder = Path(os.path.expanduser(folder))
+            if not folder.exists():
+                continue
+            for path in folder.rglob(name):
+                return path
+    raise SystemExit(f"ERROR: no {weight} Courier New compatible font found "
+                     f"(looked for {', '.join(FONT_FILES[weight])}). Use --font/--bold-font.")
+
+
+def parse_color(value):
+    """CSS color (#rgb, #rrggbb, rgb()/rgba() or a name) → RGBA tuple"""
+    from PIL import ImageColor
+
+    match = re.fullmatch(r"rgba?\(([^)]*)\)", value.strip())
+    if match:
+        parts = [p.strip() for p in match.group(1).split(",")]
+        alpha = round(float(parts[3]) * 255) if len(parts) > 3 else 255
+        return tuple(int(float(p)) for p in parts[:3]) + (alpha,)
+    return ImageColor.getcolor(value, "RGBA")
+
+
+def render_glyph(font, char, color, shadow):
+    """(image or None, xoffset, yoffset, advance) of one glyph"""
+    from PIL import Image, ImageDraw, ImageFilter
+
+    advance = font.getlength(char)
+    left, top, right, bottom = font.getbbox(char, anchor="ls")
+    if right <= left or bottom <= top:
+        return None, 0, 0, advance
+
+    sigma = shadow["blur"] / 2 if shadow else 0
+    pad = math.ceil(SIGMAS * sigma)
+    size = (right - left + 2 * pad, bottom - top + 2 * pad)
+    glyph = Image.new("RGBA", size)
+    ImageDraw.Draw(glyph).text((pad - left, pad - top), char, font=font,
+                               fill=parse_color(color), anchor="ls")
+    if shadow:
+        shadow_color = parse_color(shadow["color"])
+        alpha = glyph.getchannel("A").filter(ImageFilter.GaussianBlur(sigma))
+        layer = Image.new("RGBA", size, shadow_color[:3] + (0,))
+        layer.putalpha(alpha.point(lambda a: a * shadow_color[3] // 255))
+        glyph = Image.alpha_composite(layer, glyph)
+    return glyph, left - pad, top - pad, advance
+
+
+def kerning(font, chars):
+    """Non-zero kerning of every pair, in pixels"""
+    pairs = {}
+    for a in chars:
+        width_a = font.getlength(a)
+        for b in chars:
+            kern = font.getlength(a + b) - width_a - font.getlength(b)
+            if abs(kern) >= 0.01:
+                pairs[a + b] = round(kern, 2)
+    return pairs
+
+
+def pack(sizes, width=ATLAS_WIDTH, spacing=GLYPH_SPACING):
+    """Shelf packing, tallest first: {key: (x, y)} and the atlas height"""
+    positions = {}
+    x = y = shelf = 0
+    for key, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], -item[1][0])):
+        if x + w > width:
+            x, y, shelf = 0, y + shelf + spacing, 0
+        positions[key] = (x, y)
+        x += w + spacing
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def build_atlas(styles, font_override=None, bold_override=None):
+    """Render every style; returns (atlas image, metadata)"""
+    from PIL import Image, ImageFont
+
+    fonts = {}
+    glyphs = {}
+    metadata = {"atlas": f"{ATLAS_NAME}.png", "styles": {}}
+    for key, style in styles.items():
+        weight, size = parse_font(style["font"])
+        path = find_font_file(weight, bold_override if weight == "bold" else font_override)
+        font = fonts.setdefault((path, size), ImageFont.truetype(str(path), size))
+        ascent, descent = font.getmetrics()
+        chars = "".join(sorted(style["chars"]))
+        entry = {"font": style["font"], "size": size, "weight": weight,
+                 "fontFile": path.name, "color": style["color"], "shadow": style["shadow"],
+                 "ascent": ascent, "descent": descent, "lineHeight": ascent + descent,
+                 "glyphs": {}, "kerning": kerning(font, chars)}
+        for char in chars:
+            image, xoffset, yoffset, advance = render_glyph(font, char, style["color"],
+                                                            style["shadow"])
+            entry["glyphs"][char] = {"xoffset": xoffset, "yoffset": yoffset,
+                                     "advance": round(advance, 2)}
+            if image is not None:
+                glyphs[(key, char)] = image
+        metadata["styles"][key] = entry
+
+    positions, height = pack({k: image.size for k, image in glyphs.items()})
+    atlas = Image.new("RGBA", (ATLAS_WIDTH, 1 << max(height - 1, 0).bit_length()))
+    for (key, char), image in glyphs.items():
+        x, y = positions[(key, char)]
+        atlas.paste(image, (x, y))
+        metadata["styles"][key]["glyphs"][char].update(x=x, y=y, w=image.width, h=image.height)
+    metadata["size"] = list(atlas.size)
+    return atlas, metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="write the atlas PNG and JSON")
+    parser.add_argument("--font", help="regular weight font file (default: Courier New)")
+    parser.add_argument("--bold-font", help="bold weight font file (default: Courier New Bold)")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("BITMAP FONT ATLAS")
+    print(f"{'='*70}\n")
+
+    with profiling.session(args.profile, "font_atlas"):
+        styles = scan_styles()
+        for key, style in styles.items():
+            print(f"{key}: {len(style['chars'])} glyph(s)")
+            for text in style["texts"]:
+                print(f"    {text}")
+
+        if not args.apply:
+            print("\nDry run. Use --apply to write the atlas.")
+            return
+
+        atlas, metadata = build_atlas(styles, args.font, args.bold_font)
+        OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
+        atlas.save(OUTPUT_FOLDER / f"{ATLAS_NAME}.png", "PNG", optimize=True)
+        (OUTPUT_FOLDER / f"{ATLAS_NAME}.json").write_text(
+            json.dumps(metadata, indent=2, ensure_ascii=False), encoding="utf-8")
+        glyph_count = sum(len(style["glyphs"]) for style in metadata["styles"].values())
+        print(f"\nAtlas: {OUTPUT_FOLDER / ATLAS_NAME}.png {atlas.width}x{atlas.height}, "
+              f"{glyph_count} glyph(s) in {len(metadata['styles'])} style(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Motion-aware temporal resampling of animation frame sequences.
+
+enemy01 ships 45 frames and explosion-enemy01 28, even where consecutive
+frames barely change. This measures how much each frame differs from the
+others (vectorized pixel diffs on premultiplied RGBA) and keeps only the key
+poses, either down to a target frame count or within an error budget.
+
+Dropped frames are replaced by holding the previous key pose, so every kept
+frame gets a duration (in source frames) and the animation keeps its timing.
+The kept frames are copied unchanged to OUTPUT_FOLDER/<sequence>/ together
+with a frames.json duration table:
+
+    {"sequence": "enemy01", "frameInterval": 2, "ticksPerFrame": 3, "frames": [
+        {"file": "000000.png", "source": "000000.png", "duration": 3, "ticks": 9},
+        ...]}
+
+    python -m asset_pipeline.frame_resample                  # error budget
+    python -m asset_pipeline.frame_resample --count 20       # fixed count
+"""
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from asset_pipeline import js_sources, pixel_cache, profiling
+
+# Configuration
+IMAGES_FOLDER = Path("assets/images")
+OUTPUT_FOLDER = Path("assets/images_KEYFRAMES")
+MAX_ERROR = 2.0  # Mean abs. difference (0-255) allowed while holding a pose
+
+# Frame sequences and the entity whose frameTimer check advances them
+SEQUENCES = {
+    "enemy01": {
+        "folder": "enemy01",
+        "timer": js_sources.SRC_FOLDER / "entities/Enemy.js",
+    },
+    "explosion-enemy01": {
+        "folder": "explosion-enemy01",
+        "timer": js_sources.SRC_FOLDER / "entities/Explosion.js",
+    },
+    "coin": {
+        "folder": "coin",
+        "timer": js_sources.SRC_FOLDER / "entities/Coin.js",
+    },
+}
+
+
+def load_sequence(folder):
+    """Load sorted frames as a premultiplied float32 (N, H, W, 4) array"""
+    paths = sorted(folder.glob("*.png"))
+    frames = []
+    for path in paths:
+        frames.append(np.asarray(pixel_cache.load(path)[1], dtype=np.float32))
+    frames = np.stack(frames)
+    # Premultiply so changes in fully transparent pixels don't count
+    frames[..., :3] *= frames[..., 3:] / 255.0
+    return paths, frames
+
+
+def difference_matrix(frames):
+    """D[a, b] = mean absolute difference between frame a and frame b"""
+    count = len(frames)
+    matrix = np.zeros((count, count), dtype=np.float64)
+    for a in range(count):
+        matrix[a] = np.abs(frames - frames[a]).mean(axis=(1, 2, 3))
+    return matrix
+
+
+def motion_energy(matrix):
+    """Difference of each frame to the next one"""
+    return np.diagonal(matrix, offset=1).copy()
+
+
+def keyframes_by_error(matrix, max_error=MAX_ERROR):
+    """Hold each key pose until a frame differs from it by more than max_error"""
+    count = len(matrix)
+    keys = [0]
+    for index in range(1, count):
+        if matrix[keys[-1], index] > max_error:
+            keys.append(index)
+    if keys[-1] != count - 1:
+        keys.append(count - 1)  # Always end on the final pose
+    return keys
+
+
+def _segment_error(matrix, key, start, end):
+    """Worst error of holding `key` over frames [start, end)"""
+    return matrix[key, start:end].max() if end > start else 0.0
+
+
+def keyframes_by_count(matrix, count):
+    """
+    Keep `count` key poses, greedily dropping the key whose removal adds the
+    least hold error. First and last frames are always kept.
+    """
+    total = len(matrix)
+    keys = list(range(total))
+    count = max(2, min(count, total))
+    while len(keys) > count:
+        best_index = None
+        best_cost = None
+        for i in range(1, len(keys) - 1):
+            end = keys[i + 1]
+            cost = _segment_error(matrix, keys[i - 1], keys[i - 1], end)
+            if best_cost is None or cost < best_cost:
+                best_index, best_cost = i, cost
+        del keys[best_index]
+    return keys
+
+
+def duration_table(paths, keys, ticks):
+    """Frame duration table for the kept keys (durations in source frames, `ticks` each)"""
+    bounds = keys[1:] + [len(paths)]
+    return [
+        {
+            "file": f"{n:06d}{paths[key].suffix}",
+            "source": paths[key].name,
+            "duration": end - key,
+            "ticks": (end - key) * ticks,
+        }
+        for n, (key, end) in enumerate(zip(keys, bounds))
+    ]
+
+
+def resample_sequence(name, config, count=None, max_error=MAX_ERROR):
+    """Select key poses of one sequence and write them with frames.json"""
+    paths, frames = load_sequence(IMAGES_FOLDER / config["folder"])
+    matrix = difference_matrix(frames)
+    if count:
+        keys = keyframes_by_count(matrix, count)
+    else:
+        keys = keyframes_by_error(matrix, max_error)
+    interval, comparison = js_sources.frame_timer(config["timer"])
+    ticks = js_sources.ticks_per_frame(interval, comparison)
+    table = duration_table(paths, keys, ticks)
+
+    output = OUTPUT_FOLDER / name
+    if output.exists():
+        shutil.rmtree(output)
+    output.mkdir(parents=True)
+    for entry in table:
+        shutil.copy2(IMAGES_FOLDER / config["folder"] / entry["source"], output / entry["file"])
+
+    bounds = keys[1:] + [len(paths)]
+    worst = max(_segment_error(matrix, k, k, end) for k, end in zip(keys, bounds))
+    with open(output / "frames.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "sequence": name,
+            "sourceFrames": len(paths),
+            "frameInterval": interval,
+            "ticksPerFrame": ticks,
+            "maxError": round(float(worst), 3),
+            "motion": [round(float(e), 3) for e in motion_energy(matrix)],
+            "frames": table,
+        }, f, indent=2)
+
+    return len(paths), len(keys), worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sequences", nargs="*", default=list(SEQUENCES),
+                        help="sequences to resample (default: all)")
+    parser.add_argument("--count", type=int,
+                        help="target frame count per sequence")
+    parser.add_argument("--max-error", type=float, default=MAX_ERROR,
+                        help=f"error budget when no --count is given (default {MAX_ERROR})")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("MOTION-AWARE FRAME RESAMPLING")
+    print(f"{'='*70}\n")
+
+    with profiling.session(args.profile, "frame_resample"):
+        for name in args.sequences:
+            if name not in SEQUENCES:
+                print(f"WARNING: unknown sequence {name}, skipping...")
+                continue
+            source, kept, worst = resample_sequence(name, SEQUENCES[name],
+                                                    args.count, args.max_error)
+            print(f"{name}: {source} → {kept} frames (max hold error {worst:.2f})")
+
+        print(f"\nOutput location: {OUTPUT_FOLDER.absolute()}")
+
+
+if __name__ == "__main__":
+    main()
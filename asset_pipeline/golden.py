@@ -0,0 +1,208 @@
+"""
+Golden-image regression check of the built PNGs against their sources.
+
+The build resizes, quantizes and recompresses on its own, so every built
+image is compared with what it should look like:
+
+- the reference is the source image in the output's geometry: the source
+  size, or the draw size (build.draw_targets) with the same Lanczos resize
+  the build does, since a deliberate downscale is not a regression. An
+  output of any other size fails outright
+- per-pixel metrics on premultiplied RGBA (so fully transparent pixels
+  don't count): mean absolute difference over the visible pixels, the
+  largest channel difference and the share of pixels off by more than
+  BAD_PIXEL
+- SSIM (7x7 box windows via integral images) of luma and of alpha; the
+  lower of the two is reported
+
+Each asset is checked against the first TOLERANCES pattern it matches.
+Failing assets get a diff heatmap (per-pixel difference, black → red →
+yellow → white) in build/golden/, next to golden-report.json; --heatmaps
+writes one for every asset. Sources and resized references come from the
+pixel cache, so a run over the full asset set takes about two seconds and
+`build --verify` runs it after every build. Exits with status 1 when any
+asset fails.
+
+    python -m asset_pipeline.golden [--heatmaps]
+"""
+import argparse
+import fnmatch
+import json
+import shutil
+
+from asset_pipeline import build, pixel_cache, profiling
+
+# Configuration
+OUTPUT_FOLDER = build.BUILD_FOLDER / "golden"
+REPORT_FILE = OUTPUT_FOLDER / "golden-report.json"
+SSIM_WINDOW = 7
+BAD_PIXEL = 32  # Channel difference (0-255) counted as a visibly wrong pixel
+
+# First matching pattern wins (paths relative to assets/)
+TOLERANCES = [
+    # Not quantized by the build: recompression is lossless, so exact
+    ("images/explosion-enemy01/*", {"mean": 0.0, "max": 0, "bad": 0.0, "ssim": 1.0}),
+    # At most 256 colours (28-60): the build writes their exact palette, so no
+    # quantization cost at all
+    ("images/starfield_layer*.png", {"mean": 0.0, "max": 0, "bad": 0.0, "ssim": 1.0}),
+]
+# What the build guarantees: it only keeps a palette within this tolerance
+DEFAULT_TOLERANCE = build.QUANTIZE_TOLERANCE
+
+
+def tolerance_for(relative):
+    for pattern, tolerance in TOLERANCES:
+        if fnmatch.fnmatch(relative, pattern):
+            return tolerance
+    return DEFAULT_TOLERANCE
+
+
+def within(metrics, tolerance):
+    """Whether compare() metrics are inside a tolerance"""
+    return (metrics["mean"] <= tolerance["mean"] and metrics["max"] <= tolerance["max"]
+            and metrics["bad"] <= tolerance["bad"] and metrics["ssim"] >= tolerance["ssim"])
+
+
+def premultiplied(pixels):
+    """float32 (H, W, 4) with RGB multiplied by alpha"""
+    import numpy as np
+
+    pixels = np.asarray(pixels, dtype=np.float32).copy()
+    pixels[..., :3] *= pixels[..., 3:] / 255.0
+    return pixels
+
+
+def box_mean(x, size):
+    """Mean over every size x size window (valid region), via an integral image"""
+    import numpy as np
+
+    s = np.pad(x, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    return (s[size:, size:] - s[:-size, size:] - s[size:, :-size] + s[:-size, :-size]) / size ** 2
+
+
+def ssim(a, b, size=SSIM_WINDOW):
+    """Mean SSIM of two 2-D float arrays (0-255)"""
+    import numpy as np
+
+    size = max(1, min(size, *a.shape))
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    a, b = a.astype(np.float64), b.astype(np.float64)
+    mu_a, mu_b = box_mean(a, size), box_mean(b, size)
+    var_a = box_mean(a * a, size) - mu_a ** 2
+    var_b = box_mean(b * b, size) - mu_b ** 2
+    cov = box_mean(a * b, size) - mu_a * mu_b
+    index = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(index.mean())
+
+
+def compare(reference, output):
+    """Metrics of a built image against its reference (premultiplied float arrays)"""
+    import numpy as np
+
+    difference = np.abs(reference - output)
+    per_pixel = difference.max(axis=2)
+    if not per_pixel.any():
+        return {"mean": 0.0, "max": 0, "bad": 0.0, "ssim": 1.0}, per_pixel
+    visible = (reference[..., 3] > 0) | (output[..., 3] > 0)
+    luma = np.array([0.299, 0.587, 0.114], np.float32)
+    return {
+        "mean": float(difference.sum() / max(visible.sum() * 4, 1)),
+        "max": int(per_pixel.max()),
+        "bad": float((per_pixel > BAD_PIXEL).sum() / max(visible.sum(), 1)),
+        "ssim": min(ssim(reference[..., :3] @ luma, output[..., :3] @ luma),
+                    ssim(reference[..., 3], output[..., 3])),
+    }, per_pixel
+
+
+def heatmap(per_pixel):
+    """Difference magnitude as black → red → yellow → white"""
+    import numpy as np
+    from PIL import Image
+
+    t = np.clip(per_pixel / 255.0 * 4, 0, 3)  # Differences saturate at 64
+    rgb = np.stack([np.clip(t, 0, 1), np.clip(t - 1, 0, 1), np.clip(t - 2, 0, 1)], axis=-1)
+    return Image.fromarray((rgb * 255).astype(np.uint8), "RGB")
+
+
+def reference_for(source, size=None):
+    """The source's pixels at the output size (cached Lanczos resize)"""
+    from PIL import Image
+
+    key, pixels = pixel_cache.load(source)
+    if size and pixels.shape[1::-1] != tuple(size):
+        _, pixels = pixel_cache.derive(
+            key, pixels, "resize-lanczos", list(size),
+            lambda p: pixel_cache.image(p).resize(tuple(size), Image.Resampling.LANCZOS))
+    return premultiplied(pixels)
+
+
+def check(heatmaps=False):
+    """{asset: entry} for every built PNG; entries have "metrics", "tolerance", "ok" """
+    from PIL import Image
+
+    targets = build.draw_targets()
+    results = {}
+    for source in build.list_sources():
+        output = build.BUILD_FOLDER / source
+        if source.suffix.lower() != ".png" or not output.exists():
+            continue
+        relative = source.relative_to(build.ASSETS_FOLDER).as_posix()
+        with Image.open(output) as img:
+            built = premultiplied(img.convert("RGBA"))
+        reference = reference_for(source, targets.get(source))
+        if reference.shape != built.shape:
+            results[relative] = {"ok": False, "error": f"size {built.shape[1::-1]} "
+                                                       f"!= reference {reference.shape[1::-1]}"}
+            continue
+
+        metrics, per_pixel = compare(reference, built)
+        tolerance = tolerance_for(relative)
+        ok = within(metrics, tolerance)
+        results[relative] = {"ok": ok, "metrics": {k: round(v, 4) for k, v in metrics.items()},
+                             "tolerance": tolerance}
+        if heatmaps or not ok:
+            path = OUTPUT_FOLDER / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            heatmap(per_pixel).save(path, "PNG", compress_level=1)
+            results[relative]["heatmap"] = str(path)
+    return results
+
+
+def verify(heatmaps=False):
+    """Run the check, print failures and write the report; returns True when all pass"""
+    shutil.rmtree(OUTPUT_FOLDER, ignore_errors=True)  # No stale heatmaps
+    results = check(heatmaps)
+    failed = {name: entry for name, entry in results.items() if not entry["ok"]}
+    for name, entry in failed.items():
+        detail = entry.get("error") or ", ".join(
+            f"{key} {entry['metrics'][key]}" for key in ("mean", "max", "bad", "ssim"))
+        print(f"FAIL {name}: {detail}")
+    OUTPUT_FOLDER.mkdir(parents=True, exist_ok=True)
+    REPORT_FILE.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    worst = min((entry["metrics"]["ssim"] for entry in results.values() if "metrics" in entry),
+                default=1.0)
+    print(f"Golden check: {len(results) - len(failed)}/{len(results)} asset(s) within tolerance "
+          f"(lowest SSIM {worst:.4f}), report {REPORT_FILE}")
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--heatmaps", action="store_true", help="write a heatmap for every asset")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("GOLDEN-IMAGE CHECK")
+    print(f"{'='*70}\n")
+
+    if not build.BUILD_FOLDER.exists():
+        raise SystemExit("ERROR: build/ not found. Run `python -m asset_pipeline build` first.")
+    with profiling.session(args.profile, "golden"):
+        ok = verify(args.heatmaps)
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Read and patch numeric settings in the game's JS sources.
+
+Only simple assignments are understood, e.g.:
+
+    const logoScale = 1.32;
+    this.width = 45 * 4; // 225
+    export const CANVAS_WIDTH = 960;
+
+The right-hand side must be a number or plain arithmetic on numbers.
+frame_timer() and ticks_per_frame() turn an entity's frame-advance check
+into game ticks per frame. method_body() extracts the source of one class method, so stages can look
+at what a specific piece of code references.
+"""
+import ast
+import math
+import operator
+import re
+from pathlib import Path
+
+SRC_FOLDER = Path("src")
+_FRAME_TIMER = re.compile(r"frameTimer\s*(>=?)\s*(this\.\w+)")
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+def _assignment_pattern(name):
+    """Regex matching `<name> = <arithmetic>;` (not `==`, not `obj.name`) and a trailing comment."""
+    return re.compile(
+        r"(?<![\w.$])(" + re.escape(name) + r"\s*=(?!=)\s*)([-+*/().\d\s]+?)(\s*;)"
+        r"([ \t]*//[^\n]*)?"
+    )
+
+
+def _evaluate(expression):
+    """Evaluate a JS arithmetic literal such as `45 * 4` without eval()."""
+    def visit(node):
+        if isinstance(node, ast.Expression):
+            return visit(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.left), visit(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](visit(node.operand))
+        raise ValueError(f"Unsupported expression: {expression!r}")
+
+    return visit(ast.parse(expression.strip(), mode="eval"))
+
+
+def read_values(js_path, name):
+    """Return every numeric value assigned to `name` in a JS file, in order."""
+    text = Path(js_path).read_text(encoding="utf-8")
+    return [_evaluate(m.group(2)) for m in _assignment_pattern(name).finditer(text)]
+
+
+def read_value(js_path, name, occurrence=None):
+    """
+    Return one numeric value assigned to `name`.
+
+    With occurrence=None the largest assignment wins (e.g. Projectile.js sets
+    this.width once per projectile type); otherwise the N-th assignment is used.
+    """
+    values = read_values(js_path, name)
+    if not values:
+        raise KeyError(f"No numeric assignment to '{name}' in {js_path}")
+    if occurrence is None:
+        return max(values)
+    return values[occurrence]
+
+
+def frame_timer(js_path):
+    """(interval, comparison) of the `frameTimer > this.x` check that advances frames."""
+    text = Path(js_path).read_text(encoding="utf-8")
+    match = _FRAME_TIMER.search(text)
+    if not match:
+        raise ValueError(f"No frameTimer comparison in {js_path}")
+    return read_value(js_path, match.group(2)), match.group(1)
+
+
+def ticks_per_frame(interval, comparison):
+    """Game ticks a frame is shown for, given the frameTimer interval and comparison."""
+    # `timer > n` advances on tick n + 1, `timer >= n` on tick n
+    return math.floor(interval) + 1 if comparison == ">" else math.ceil(interval)
+
+
+def format_number(value):
+    """Format a number the way the JS sources write it (1.0, 0.48, 215)."""
+    if isinstance(value, int) or float(value).is_integer() and abs(value) >= 2:
+        return str(int(value))
+    text = f"{value:.3f}".rstrip("0")
+    return text + "0" if text.endswith(".") else text
+
+
+def patch_value(js_path, name, value, occurrence=None):
+    """
+    Rewrite the assignment(s) to `name` with a new literal value.
+
+    A trailing `//` comment on a rewritten line is dropped, since it explains
+    the old value (e.g. `// 600px / 4 frames = 150px per frame`). Returns the
+    number of assignments that were changed.
+    """
+    js_path = Path(js_path)
+    text = js_path.read_text(encoding="utf-8")
+    pattern = _assignment_pattern(name)
+    literal = format_number(value)
+    changed = 0
+    index = -1
+
+    def replace(match):
+        nonlocal changed, index
+        index += 1
+        if occurrence is not None and index != occurrence:
+            return match.group(0)
+        if match.group(2).strip() == literal:
+            return match.group(0)
+        changed += 1
+        return match.group(1) + literal + match.group(3)
+
+    new_text = pattern.sub(replace, text)
+    if changed:
+        js_path.write_text(new_text, encoding="utf-8")
+    return changed
+
+
+def _block_end(text, start):
+    """Index just past the `}` closing the `{` at `start` (strings and comments skipped)."""
+    depth = 0
+    index = start
+    quote = None
+    while index < len(text):
+        char = text[index]
+        if quote:
+            if char == "\\":
+                index += 1
+            elif char == quote:
+                quote = None
+        elif text.startswith("//", index):
+            index = text.find("\n", index)
+            if index < 0:
+                break
+        elif text.startswith("/*", index):
+            index = text.find("*/", index) + 1
+        elif char in "'\"`":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+    raise ValueError("Unbalanced braces")
+
+
+def method_body(js_path, class_name, method):
+    """Source text of `class_name.method` (the whole class body if method is None)."""
+    text = Path(js_path).read_text(encoding="utf-8")
+    declaration = re.search(r"\bclass\s+" + re.escape(class_name) + r"\b[^{]*\{", text)
+    if not declaration:
+        raise KeyError(f"No class '{class_name}' in {js_path}")
+    class_text = text[declaration.end() - 1:_block_end(text, declaration.end() - 1)]
+    if method is None:
+        return class_text
+    match = re.search(r"^\s*(?:async\s+)?" + re.escape(method) + r"\s*\([^)]*\)\s*\{",
+                      class_text, re.MULTILINE)
+    if not match:
+        raise KeyError(f"No method '{class_name}.{method}' in {js_path}")
+    return class_text[match.start():_block_end(class_text, match.end() - 1)]
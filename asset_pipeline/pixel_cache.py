@@ -0,0 +1,108 @@
+"""
+Decoded-pixel cache: raw RGBA arrays in memory-mapped files.
+
+Every stage that works on RGBA pixels used to decode its PNGs itself (zlib
+inflate + unfiltering), again on every run, and intermediates only existed
+as re-encoded PNGs. Decoded sources and stage intermediates are kept here
+as raw RGBA instead, keyed by content hash:
+
+- load(path): the decoded pixels of an image, keyed by the file's SHA-1
+- derive(key, pixels, stage, params, func): func(pixels), keyed by the input
+  key, the stage name and its parameters (e.g. the build's Lanczos resize)
+
+Entries are opened with np.memmap, read-only: no decode and no copy, and
+the pages live in the OS page cache, shared by the build's worker
+processes and dropped under memory pressure. image() wraps an array as a
+Pillow image without copying, so only the final stage encodes.
+
+Files are build/.pixel-cache/<key[:2]>/<key>.rgba: a 16-byte header
+(b"RGBA", width, height, reserved) followed by the rows. prune() removes
+the least recently used entries beyond CACHE_LIMIT_MB.
+"""
+import hashlib
+import json
+import os
+import struct
+
+from asset_pipeline import build
+
+# Configuration
+CACHE_FOLDER = build.BUILD_FOLDER / ".pixel-cache"
+CACHE_LIMIT_MB = 2048
+HEADER = struct.Struct("<4sIII")
+MAGIC = b"RGBA"
+
+
+def _entry(key):
+    return CACHE_FOLDER / key[:2] / f"{key}.rgba"
+
+
+def _open(path):
+    """Read-only (H, W, 4) uint8 memmap of a cache entry"""
+    import numpy as np
+
+    with open(path, "rb") as f:
+        magic, width, height, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"Not a pixel cache entry: {path}")
+    os.utime(path)  # Recently used, for prune()
+    return np.memmap(path, np.uint8, "r", offset=HEADER.size, shape=(height, width, 4))
+
+
+def _write(path, pixels):
+    import numpy as np
+
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)  # Also takes a Pillow RGBA image
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, pixels.shape[1], pixels.shape[0], 0))
+        f.write(pixels.data)
+    os.replace(temp, path)  # Atomic: build workers may race on the same entry
+
+
+def load(path):
+    """(key, read-only RGBA pixels) of an image file, decoded at most once"""
+    key = build.file_hash(path)
+    entry = _entry(key)
+    if not entry.exists():
+        import numpy as np
+        from PIL import Image
+
+        with Image.open(path) as img:
+            _write(entry, np.asarray(img.convert("RGBA")))
+    return key, _open(entry)
+
+
+def derive(key, pixels, stage, params, func):
+    """(key, pixels) of func(pixels), computed only for new inputs/params"""
+    derived = hashlib.sha1(json.dumps([key, stage, params]).encode("utf-8")).hexdigest()
+    entry = _entry(derived)
+    if not entry.exists():
+        _write(entry, func(pixels))
+    return derived, _open(entry)
+
+
+def image(pixels):
+    """Pillow RGBA image sharing the array's memory (read-only)"""
+    from PIL import Image
+
+    height, width = pixels.shape[:2]
+    return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+
+
+def prune(limit_mb=CACHE_LIMIT_MB):
+    """Remove least recently used entries until the cache fits in limit_mb"""
+    if not CACHE_FOLDER.exists():
+        return 0
+    entries = sorted(((path.stat(), path) for path in CACHE_FOLDER.rglob("*.rgba")),
+                     key=lambda item: item[0].st_mtime_ns)
+    total = sum(stat.st_size for stat, _ in entries)
+    removed = 0
+    for stat, path in entries:
+        if total <= limit_mb * 1024 * 1024:
+            break
+        path.unlink(missing_ok=True)
+        total -= stat.st_size
+        removed += 1
+    return removed
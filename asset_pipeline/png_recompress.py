@@ -0,0 +1,270 @@
+"""
+Lossless PNG recompression search.
+
+Pillow's optimize=True picks one row filter strategy and zlib level 9. This
+re-encodes the same pixels every way worth trying and keeps the smallest
+file whose decoded pixels are bit-exact:
+
+- row filters: none, sub, up, average, paeth (one for every row) and the
+  per-row minimum-sum heuristic, computed with vectorized NumPy
+- zlib strategies (default, filtered, RLE, Huffman only) at level 9, then
+  every level and memLevel for the winning filter/strategy
+- palette images: the original order, plus entries sorted by frequency and
+  by luma (translucent entries first, so tRNS gets as short as possible);
+  unused entries are dropped
+- only the chunks needed to decode the pixels are written (metadata, text,
+  dpi and, unless --keep-color, gamma/sRGB/ICC chunks are stripped)
+
+zlib releases the GIL, so the trials of one image run on a thread pool.
+Results are cached by content hash in build/.png-cache/, so an image only
+pays for the search the first time it is seen. The original file is always
+a candidate: nothing ever gets bigger.
+
+    python -m asset_pipeline.png_recompress [paths ...]          # report
+    python -m asset_pipeline.png_recompress --apply [paths ...]  # rewrite in place
+"""
+import argparse
+import hashlib
+import io
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from asset_pipeline import profiling
+
+# Configuration
+CACHE_FOLDER = Path("build/.png-cache")
+SEARCH_VERSION = 1  # Bump when the search changes, to invalidate the cache
+WORKERS = os.cpu_count() or 1
+DEFAULT_PATHS = ["build/assets"]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COLOR_TYPES = {"L": 0, "RGB": 2, "P": 3, "LA": 4, "RGBA": 6}
+CHANNELS = {"L": 1, "RGB": 3, "P": 1, "LA": 2, "RGBA": 4}
+COLOR_CHUNKS = (b"gAMA", b"cHRM", b"sRGB", b"iCCP")
+FILTERS = ("none", "sub", "up", "average", "paeth")
+STRATEGIES = {
+    "default": zlib.Z_DEFAULT_STRATEGY,
+    "filtered": zlib.Z_FILTERED,
+    "rle": zlib.Z_RLE,
+    "huffman": zlib.Z_HUFFMAN_ONLY,
+}
+
+
+def read_chunks(data):
+    """[(type, body)] of a PNG file"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG file")
+    chunks = []
+    offset = len(PNG_SIGNATURE)
+    while offset < len(data):
+        length, kind = struct.unpack_from(">I4s", data, offset)
+        chunks.append((kind, data[offset + 8:offset + 8 + length]))
+        offset += 12 + length
+    return chunks
+
+
+def chunk(kind, body):
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def filter_rows(raw, bpp):
+    """
+    {filter: (H, 1 + stride) uint8} with the PNG filter type byte in front
+    of every row, for the five fixed filters and the per-row minimum sum.
+    """
+    import numpy as np
+
+    height, stride = raw.shape
+    a = np.zeros_like(raw)  # Left
+    a[:, bpp:] = raw[:, :-bpp]
+    b = np.zeros_like(raw)  # Up
+    b[1:] = raw[:-1]
+    c = np.zeros_like(raw)  # Up-left
+    c[1:] = a[:-1]
+
+    a16, b16, c16 = (x.astype(np.int16) for x in (a, b, c))
+    p = a16 + b16 - c16
+    pa, pb, pc = np.abs(p - a16), np.abs(p - b16), np.abs(p - c16)
+    paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+    predictors = [None, a, b, ((a16 + b16) >> 1).astype(np.uint8), paeth]
+
+    filtered = {}
+    for kind, (name, predictor) in enumerate(zip(FILTERS, predictors)):
+        rows = raw if predictor is None else raw - predictor  # uint8 wraps like PNG
+        filtered[name] = np.hstack([np.full((height, 1), kind, np.uint8), rows])
+
+    # Per-row choice by the smallest sum of absolute signed bytes
+    sums = np.stack([np.abs(filtered[name][:, 1:].view(np.int8).astype(np.int32)).sum(axis=1)
+                     for name in FILTERS])
+    choice = sums.argmin(axis=0)
+    stacked = np.stack([filtered[name] for name in FILTERS])
+    filtered["minsum"] = stacked[choice, np.arange(height)]
+    return filtered
+
+
+def palette_variants(img):
+    """[(name, indices, palette RGBA rows)] for a palette image"""
+    import numpy as np
+
+    indices = np.asarray(img, dtype=np.uint8)
+    rgb = np.array(img.getpalette("RGB") or [], dtype=np.uint8).reshape(-1, 3)
+    alpha = np.full(len(rgb), 255, np.uint8)
+    transparency = img.info.get("transparency")
+    if isinstance(transparency, int) and transparency < len(rgb):
+        alpha[transparency] = 0
+    elif isinstance(transparency, bytes):
+        alpha[:len(transparency)] = np.frombuffer(transparency, np.uint8)[:len(rgb)]
+    palette = np.hstack([rgb, alpha[:, None]])
+    variants = [("original", indices, palette)]
+
+    counts = np.bincount(indices.ravel(), minlength=len(palette))
+    used = np.nonzero(counts)[0]
+    luma = palette[:, :3].astype(np.int32) @ np.array([299, 587, 114])
+    for name, order_key in (("frequency", -counts), ("luma", luma)):
+        # Translucent entries first, then the sort key
+        order = used[np.lexsort((order_key[used], palette[used, 3] == 255))]
+        remap = np.zeros(256, np.uint8)
+        remap[order] = np.arange(len(order), dtype=np.uint8)
+        variants.append((name, remap[indices], palette[order]))
+    return variants
+
+
+def palette_chunks(palette):
+    """PLTE (and tRNS when any entry is translucent) for RGBA palette rows"""
+    chunks = [chunk(b"PLTE", palette[:, :3].tobytes())]
+    translucent = (palette[:, 3] < 255).nonzero()[0]
+    if len(translucent):
+        chunks.append(chunk(b"tRNS", palette[:translucent[-1] + 1, 3].tobytes()))
+    return chunks
+
+
+def candidates(data, img, keep_color):
+    """[(name, (H, stride) raw rows, bpp, header chunks)] to try"""
+    import numpy as np
+
+    chunks = read_chunks(data)
+    kept = [chunk(kind, body) for kind, body in chunks
+            if (keep_color and kind in COLOR_CHUNKS) or (kind == b"tRNS" and img.mode != "P")]
+    ihdr = struct.pack(">IIBBBBB", img.width, img.height, 8, COLOR_TYPES[img.mode], 0, 0, 0)
+    header = [chunk(b"IHDR", ihdr)] + kept
+
+    if img.mode == "P":
+        return [(name, indices, 1, header + palette_chunks(palette))
+                for name, indices, palette in palette_variants(img)]
+    bpp = CHANNELS[img.mode]
+    raw = np.frombuffer(img.tobytes(), np.uint8).reshape(img.height, img.width * bpp)
+    return [("pixels", raw, bpp, header)]
+
+
+def _deflate(filtered, strategy, level=9, mem_level=9):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, mem_level, STRATEGIES[strategy])
+    return compressor.compress(filtered) + compressor.flush()
+
+
+def assemble(header, idat):
+    return PNG_SIGNATURE + b"".join(header) + chunk(b"IDAT", idat) + chunk(b"IEND", b"")
+
+
+def decoded(data):
+    """RGBA bytes of a PNG, what the browser ends up with"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        return img.convert("RGBA").tobytes()
+
+
+def search(data, workers=WORKERS, keep_color=False):
+    """(smallest bit-exact PNG, description of the winning trial)"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        header = dict(read_chunks(data))[b"IHDR"]
+        if header[8] > 8 or img.mode not in COLOR_TYPES:
+            return data, "original (unsupported format)"
+        img.load()
+        reference = img.convert("RGBA").tobytes()
+        trials = []
+        for name, raw, bpp, chunks in candidates(data, img, keep_color):
+            for filter_name, rows in filter_rows(raw, bpp).items():
+                for strategy in STRATEGIES:
+                    trials.append((name, filter_name, strategy, rows.tobytes(), chunks))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        sizes = list(pool.map(lambda t: len(_deflate(t[3], t[2])), trials))
+        best = trials[sizes.index(min(sizes))]
+        variant, filter_name, strategy, filtered, chunks = best
+        settings = [(level, mem_level) for level in range(1, 10) for mem_level in (8, 9)]
+        idats = list(pool.map(lambda s: _deflate(filtered, strategy, *s), settings))
+
+    ranked = sorted(zip(idats, settings), key=lambda item: len(item[0]))
+    for idat, (level, mem_level) in ranked:
+        result = assemble(chunks, idat)
+        if len(result) >= len(data):
+            break
+        if decoded(result) == reference:
+            return result, (f"{variant} palette, " if variant != "pixels" else "") + \
+                f"{filter_name} filter, {strategy} level {level} memLevel {mem_level}"
+    return data, "original (already smallest)"
+
+
+def recompress(data, workers=WORKERS, keep_color=False):
+    """Smallest bit-exact version of a PNG, through the content-hash cache"""
+    key = hashlib.sha1(f"{SEARCH_VERSION}:{keep_color}:".encode() + data).hexdigest()
+    cached = CACHE_FOLDER / key[:2] / f"{key}.png"
+    if cached.exists():
+        return cached.read_bytes()
+    result, _ = search(data, workers, keep_color)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    temp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+    temp.write_bytes(result)
+    os.replace(temp, cached)  # Atomic: build workers may race on the same image
+    return result
+
+
+def list_pngs(paths):
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob("*.png")) if path.is_dir() else [path])
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS,
+                        help=f"PNG files or folders (default: {' '.join(DEFAULT_PATHS)})")
+    parser.add_argument("--apply", action="store_true", help="rewrite the files that got smaller")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="threads for the trials")
+    parser.add_argument("--keep-color", action="store_true",
+                        help="keep gamma/sRGB/ICC chunks")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("LOSSLESS PNG RECOMPRESSION")
+    print(f"{'='*70}\n")
+
+    total_before = total_after = 0
+    with profiling.session(args.profile, "png_recompress"):
+        for path in list_pngs(args.paths):
+            data = path.read_bytes()
+            result = recompress(data, args.workers, args.keep_color)
+            total_before += len(data)
+            total_after += len(result)
+            if len(result) < len(data):
+                print(f"{path}: {len(data) / 1024:.1f} KB → {len(result) / 1024:.1f} KB "
+                      f"(-{(1 - len(result) / len(data)):.1%})")
+                if args.apply:
+                    path.write_bytes(result)
+
+    if total_before:
+        print(f"\nTotal: {total_before / 1024:.1f} KB → {total_after / 1024:.1f} KB "
+              f"(-{(1 - total_after / total_before):.1%})")
+    if not args.apply:
+        print("\nDry run. Use --apply to rewrite the files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Priority-ordered preload manifest: critical (title screen), stage and
+deferred bundles.
+
+loadAssets() in src/core/Assets.js starts every load at once and resolves
+after all of them, so the title screen waits for enemy, explosion and coin
+frames it never draws. This reads the asset URLs from Assets.js (including
+the frame loops) plus the literal 'assets/...' URLs in the other sources,
+then assigns each asset to the first bundle whose code references it:
+
+- critical: what the title screen constructs or draws (Game constructor and
+  drawStartScreen, the Environment constructor, which reads the background
+  and ground sizes up front)
+- stage: what gameplay uses (startGame, gameplay updates, the entities)
+- deferred: everything else (e.g. the easter egg ground)
+
+Each entry has its URL, byte size (from build/ when built), decoded size
+(RGBA for images, PCM float32 for audio) and the code that references it.
+
+    python -m asset_pipeline.preload_manifest      # writes build/assets/preload-manifest.json
+"""
+import argparse
+import json
+import re
+import struct
+from pathlib import Path
+
+from asset_pipeline import build, engine, js_sources
+
+# Configuration
+ASSETS_JS = js_sources.SRC_FOLDER / "core/Assets.js"
+MANIFEST_FILE = build.BUILD_FOLDER / "assets/preload-manifest.json"
+
+# (JS file, class, method); method None = whole class. First bundle wins.
+BUNDLES = {
+    "critical": [
+        ("core/Game.js", "Game", "constructor"),
+        ("core/Game.js", "Game", "drawStartScreen"),
+        ("environment/Environment.js", "Environment", "constructor"),
+    ],
+    "stage": [
+        ("core/Game.js", "Game", "startGame"),
+        ("core/Game.js", "Game", "updatePlaying"),
+        ("core/Game.js", "Game", "checkCollisions"),
+        ("core/Game.js", "Game", "handlePlayerDeath"),
+        ("core/Game.js", "Game", "drawPlaying"),
+        ("entities/Player.js", "Player", None),
+        ("entities/Enemy.js", "Enemy", None),
+        ("entities/Projectile.js", "Projectile", None),
+        ("entities/Coin.js", "Coin", None),
+        ("entities/Explosion.js", "Explosion", None),
+    ],
+}
+DEFERRED = "deferred"
+
+SINGLE_SRC = re.compile(r"Assets\.([\w.]+)\.src\s*=\s*'([^']+)'")
+FRAME_LOOP = re.compile(r"for \(let i = (\d+); i <= (\d+); i\+\+\) \{")
+LITERAL_URL = re.compile(r"'(assets/[^']+)'")
+ASSET_REFERENCE = re.compile(r"\b[aA]ssets\.(\w+)(?:\.(\w+))?")
+
+
+def asset_urls(js_path=ASSETS_JS):
+    """[(key, url)] in the order loadAssets() starts them"""
+    text = Path(js_path).read_text(encoding="utf-8")
+    found = [(m.start(), m.group(1), m.group(2)) for m in SINGLE_SRC.finditer(text)]
+    for loop in FRAME_LOOP.finditer(text):
+        body = text[loop.end() - 1:js_sources._block_end(text, loop.end() - 1)]
+        template = re.search(r"`([^`]+)`", body)
+        target = re.search(r"Assets\.(\w+)\.push", body)
+        if not template or not target:
+            continue
+        pad = re.search(r"padStart\((\d+), '0'\)", body)
+        for i in range(int(loop.group(1)), int(loop.group(2)) + 1):
+            url = template.group(1).replace("${i}", str(i))
+            url = url.replace("${num}", str(i).zfill(int(pad.group(1)) if pad else 0))
+            found.append((loop.start() + i, f"{target.group(1)}[{i}]", url))
+    return [(key, url) for _, key, url in sorted(found)]
+
+
+def references(file, class_name, method):
+    """(keys, urls) referenced by one piece of code"""
+    body = js_sources.method_body(js_sources.SRC_FOLDER / file, class_name, method)
+    keys = set()
+    for match in ASSET_REFERENCE.finditer(body):
+        keys.add(match.group(1))
+        if match.group(2):
+            keys.add(f"{match.group(1)}.{match.group(2)}")
+    return keys, set(LITERAL_URL.findall(body))
+
+
+def ogg_info(path):
+    """(channels, sample_rate, seconds) of an Ogg Vorbis file, from its headers"""
+    data = Path(path).read_bytes()
+    header = data.find(b"\x01vorbis")
+    if header < 0:
+        return None
+    channels = data[header + 11]
+    sample_rate = struct.unpack_from("<I", data, header + 12)[0]
+    last_page = data.rfind(b"OggS")
+    granule = struct.unpack_from("<q", data, last_page + 6)[0]
+    return channels, sample_rate, max(granule, 0) / sample_rate if sample_rate else 0.0
+
+
+def describe(url):
+    """Byte size, decoded size and dimensions of one asset"""
+    source = Path(url)
+    built = build.BUILD_FOLDER / url
+    path = built if built.exists() else source
+    entry = {"url": url, "bytes": path.stat().st_size if path.exists() else None}
+    if not path.exists():
+        entry["missing"] = True
+        return entry
+    if path.suffix.lower() == ".ogg":
+        info = ogg_info(path)
+        entry["type"] = "audio"
+        if info:
+            channels, sample_rate, seconds = info
+            entry.update(channels=channels, sampleRate=sample_rate, seconds=round(seconds, 2),
+                         decodedBytes=int(seconds * sample_rate) * channels * 4)
+    else:
+        width, height, _ = engine.image_header(path)
+        entry.update(type="image", width=width, height=height, decodedBytes=width * height * 4)
+    return entry
+
+
+def build_manifest():
+    """The manifest dict: bundles in load order with per-asset details"""
+    assets = {}
+    for key, url in asset_urls():
+        assets.setdefault(url, {"keys": [], "usedBy": []})["keys"].append(key)
+    bundle_of = {}
+
+    for bundle, rules in BUNDLES.items():
+        for file, class_name, method in rules:
+            keys, urls = references(file, class_name, method)
+            where = f"{class_name}.{method}" if method else file
+            for url in urls:
+                assets.setdefault(url, {"keys": [], "usedBy": []})
+            for url, asset in assets.items():
+                asset_keys = {key.split("[")[0] for key in asset["keys"]}
+                if url in urls or asset_keys & keys:
+                    asset["usedBy"].append(where)
+                    bundle_of.setdefault(url, bundle)
+
+    bundles = {name: [] for name in list(BUNDLES) + [DEFERRED]}
+    for url, asset in assets.items():
+        entry = describe(url)
+        entry["keys"] = asset["keys"]
+        entry["usedBy"] = asset["usedBy"]
+        bundles[bundle_of.get(url, DEFERRED)].append(entry)
+
+    manifest = {"bundles": []}
+    for name, entries in bundles.items():
+        manifest["bundles"].append({
+            "name": name,
+            "bytes": sum(entry["bytes"] or 0 for entry in entries),
+            "decodedBytes": sum(entry.get("decodedBytes", 0) for entry in entries),
+            "assets": entries,
+        })
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default=str(MANIFEST_FILE), help="manifest JSON to write")
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("PRELOAD MANIFEST")
+    print(f"{'='*70}\n")
+
+    manifest = build_manifest()
+    for bundle in manifest["bundles"]:
+        print(f"{bundle['name']:<10} {len(bundle['assets']):>4} asset(s) "
+              f"{bundle['bytes'] / 1024:>9.1f} KB  decoded {bundle['decodedBytes'] / 1024 / 1024:>7.1f} MB")
+        if bundle["name"] == "critical":
+            for entry in bundle["assets"]:
+                print(f"    {entry['url']}  ({', '.join(entry['usedBy'])})")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    print(f"\nManifest: {output.absolute()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Opt-in profiling for the asset pipeline commands (--profile).
+
+With profiling on, every StageTimer stage (decode, resize, quantize,
+encode, ...) also runs under cProfile, and with `--profile memory` under
+tracemalloc too. The mode travels to the worker processes through the
+ASSET_PIPELINE_PROFILE environment variable; each job sends its raw stats
+back with its result and they are merged per stage. Commands without
+stages are profiled as one stage named after the command.
+
+Written to build/profile/:
+
+- <stage>.pstats and all.pstats: open with `python -m pstats` or snakeviz
+- <stage>.collapsed and all.collapsed: "frame;frame;frame microseconds"
+  lines for flamegraph.pl, speedscope or inferno
+- memory.json: peak traced memory per stage (memory mode only). tracemalloc
+  only sees Python allocations, not Pillow's pixel buffers; use the
+  scheduler's estimates (engine.py) for those.
+"""
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+# Configuration
+PROFILE_FOLDER = Path("build/profile")
+ENV_VAR = "ASSET_PIPELINE_PROFILE"
+MODES = ("cpu", "memory")
+MAX_DEPTH = 64  # Collapsed stacks deeper than this are cut
+TOP_FUNCTIONS = 15
+
+
+def mode():
+    """Active profiling mode in this process ("cpu", "memory" or None)"""
+    value = os.environ.get(ENV_VAR)
+    return value if value in MODES else None
+
+
+def add_argument(parser):
+    """Add the shared --profile option to a command's parser"""
+    parser.add_argument("--profile", nargs="?", const="cpu", choices=MODES,
+                        help="profile every stage with cProfile (memory: also tracemalloc); "
+                             f"output in {PROFILE_FOLDER}")
+
+
+class _RawStats:
+    """Lets pstats.Stats load a stats dict that came from another process"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+@contextmanager
+def stage_profile(profiles, name):
+    """
+    Profile a block into profiles[name] when profiling is on.
+
+    profiles[name] holds {"stats": raw pstats dict, "memory_peak": bytes}.
+    """
+    active = mode()
+    if active is None:
+        yield
+        return
+
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    if active == "memory":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        entry = profiles.setdefault(name, {"stats": {}, "memory_peak": 0})
+        stats = pstats.Stats(profiler)
+        if entry["stats"]:
+            stats.add(pstats.Stats(_RawStats(entry["stats"])))
+        entry["stats"] = stats.stats
+        if active == "memory":
+            peak = tracemalloc.get_traced_memory()[1] - base
+            entry["memory_peak"] = max(entry["memory_peak"], peak)
+
+
+def _label(func):
+    """Readable frame name for a pstats (file, line, name) key"""
+    filename, line, name = func
+    if filename == "~":
+        return name.replace(";", ":")
+    return f"{Path(filename).name}:{line}:{name}".replace(";", ":").replace(" ", "_")
+
+
+def collapsed_stacks(stats, prefix=""):
+    """
+    Approximate collapsed stacks from a pstats dict.
+
+    cProfile only records caller → callee edges, so each function's time is
+    split between its callers in proportion to the time spent under each.
+    Returns {"stack;frames": microseconds}.
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    stacks = {}
+
+    def walk(func, share, path):
+        total = stats[func][3]
+        self_time = stats[func][2] * share
+        key = ";".join(path)
+        if self_time > 0:
+            stacks[key] = stacks.get(key, 0) + self_time
+        if len(path) >= MAX_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_total = stats[callee][3]
+            if callee in on_stack or callee_total <= 0 or edge_time <= 0 or total <= 0:
+                continue
+            on_stack.add(callee)
+            walk(callee, share * edge_time / callee_total, path + [_label(callee)])
+            on_stack.discard(callee)
+
+    roots = [func for func, (_, _, _, _, callers) in stats.items() if not callers]
+    for root in roots:
+        on_stack = {root}
+        walk(root, 1.0, ([prefix] if prefix else []) + [_label(root)])
+    return {stack: round(seconds * 1e6) for stack, seconds in stacks.items()
+            if round(seconds * 1e6) > 0}
+
+
+class Session:
+    """Merges stage profiles from all jobs and writes the output files"""
+
+    def __init__(self, active, folder=PROFILE_FOLDER):
+        self.mode = active
+        self.folder = Path(folder)
+        self.profiles = {}
+
+    def add(self, profiles):
+        """Merge the profiles dict of one job (or of the main process)"""
+        if not self.mode or not profiles:
+            return
+        import pstats
+
+        for name, entry in profiles.items():
+            merged = self.profiles.setdefault(name, {"stats": None, "memory_peak": 0})
+            stats = pstats.Stats(_RawStats(entry["stats"]))
+            if merged["stats"] is not None:
+                stats.add(merged["stats"])
+            merged["stats"] = stats
+            merged["memory_peak"] = max(merged["memory_peak"], entry["memory_peak"])
+
+    def write(self):
+        """Write pstats, collapsed stacks and memory peaks; returns the combined Stats"""
+        if not self.profiles:
+            return None
+        import pstats
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        combined = None
+        all_stacks = []
+        for name, entry in sorted(self.profiles.items()):
+            stats = entry["stats"]
+            stats.dump_stats(self.folder / f"{name}.pstats")
+            stacks = collapsed_stacks(stats.stats, prefix=name)
+            lines = [f"{stack} {count}" for stack, count in sorted(stacks.items())]
+            (self.folder / f"{name}.collapsed").write_text("\n".join(lines) + "\n",
+                                                          encoding="utf-8")
+            all_stacks += lines
+            if combined is None:
+                combined = pstats.Stats(_RawStats(dict(stats.stats)))
+            else:
+                combined.add(stats)
+
+        combined.dump_stats(self.folder / "all.pstats")
+        (self.folder / "all.collapsed").write_text("\n".join(all_stacks) + "\n", encoding="utf-8")
+        if self.mode == "memory":
+            peaks = {name: entry["memory_peak"] for name, entry in sorted(self.profiles.items())}
+            (self.folder / "memory.json").write_text(json.dumps(peaks, indent=2),
+                                                     encoding="utf-8")
+        return combined
+
+    def print_summary(self, combined):
+        print(f"\nProfile written to {self.folder.absolute()}")
+        if self.mode == "memory":
+            for name, entry in sorted(self.profiles.items()):
+                print(f"  {name:<16} peak traced memory {entry['memory_peak'] / 1024 / 1024:.1f} MB")
+        print(f"\nTop {TOP_FUNCTIONS} functions by own time (all stages):")
+        rows = sorted(combined.stats.items(), key=lambda item: item[1][2], reverse=True)
+        for func, (_, calls, own, cumulative, _) in rows[:TOP_FUNCTIONS]:
+            print(f"  {own:>8.3f}s own {cumulative:>8.3f}s cum {calls:>8}  {_label(func)}")
+
+
+@contextmanager
+def session(active, stage=None):
+    """
+    Turn profiling on for this process and its workers while the block runs.
+
+    With `stage`, the whole block is also profiled as that one stage (for
+    commands that don't use StageTimer). Yields the Session that job
+    profiles are added to; the files are written on exit.
+    """
+    profile_session = Session(active)
+    if not active:
+        yield profile_session
+        return
+
+    previous = os.environ.get(ENV_VAR)
+    os.environ[ENV_VAR] = active
+    try:
+        if stage:
+            profiles = {}
+            with stage_profile(profiles, stage):
+                yield profile_session
+            profile_session.add(profiles)
+        else:
+            yield profile_session
+    finally:
+        if previous is None:
+            os.environ.pop(ENV_VAR, None)
+        else:
+            os.environ[ENV_VAR] = previous
+
+    combined = profile_session.write()
+    if combined is not None:
+        profile_session.print_summary(combined)
@@ -0,0 +1,108 @@
+"""
+Per-stage instrumentation and the JSON build report.
+
+Each job records its stages (decode, resize, quantize, encode, write, copy)
+in a StageTimer: wall and CPU time, bytes in/out and pixel counts. The
+timers travel back from the worker processes as plain dicts and are merged
+into one report, written as JSON (plus one line per build appended to a
+history file so build times can be tracked) and optionally printed as a
+summary table. With --profile, each stage is also profiled (see
+profiling.py).
+"""
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from asset_pipeline import profiling
+
+STAGE_FIELDS = ("calls", "wall", "cpu", "bytes_in", "bytes_out", "pixels")
+
+
+def empty_stage():
+    return dict.fromkeys(STAGE_FIELDS, 0)
+
+
+class StageTimer:
+    """Accumulates stage statistics inside one process"""
+
+    def __init__(self):
+        self.stages = {}
+        self.profiles = {}  # Filled only when profiling is on
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a block as stage `name`. The yielded dict can be filled with
+        bytes_in, bytes_out and pixels.
+        """
+        counters = {"bytes_in": 0, "bytes_out": 0, "pixels": 0}
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            with profiling.stage_profile(self.profiles, name):
+                yield counters
+        finally:
+            totals = self.stages.setdefault(name, empty_stage())
+            totals["calls"] += 1
+            totals["wall"] += time.perf_counter() - wall
+            totals["cpu"] += time.process_time() - cpu
+            for field, value in counters.items():
+                totals[field] += value
+
+    def as_dict(self):
+        return {name: dict(totals) for name, totals in self.stages.items()}
+
+
+def merge_stages(target, stages):
+    """Add the stage dicts of one job into `target`"""
+    for name, values in stages.items():
+        totals = target.setdefault(name, empty_stage())
+        for field in STAGE_FIELDS:
+            totals[field] += values.get(field, 0)
+    return target
+
+
+def build_report(stages, cache_hits, cache_misses, wall, cpu, jobs):
+    """Assemble the report dict written by write_report()"""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "wall": round(wall, 4),
+        "cpu": round(cpu, 4),
+        "jobs": jobs,
+        "cache": {"hits": cache_hits, "misses": cache_misses},
+        "stages": {
+            name: {field: round(value, 4) if isinstance(value, float) else value
+                   for field, value in totals.items()}
+            for name, totals in sorted(stages.items())
+        },
+    }
+
+
+def write_report(report, path, history_path=None):
+    """Write the JSON report and append it to the history (one JSON per line)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if history_path:
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+
+
+def format_summary(report):
+    """Human-readable table of a report"""
+    lines = [
+        f"{'stage':<10} {'calls':>6} {'wall s':>8} {'cpu s':>8} "
+        f"{'KB in':>10} {'KB out':>10} {'Mpixels':>8}",
+        "-" * 66,
+    ]
+    for name, totals in report["stages"].items():
+        lines.append(
+            f"{name:<10} {totals['calls']:>6} {totals['wall']:>8.3f} {totals['cpu']:>8.3f} "
+            f"{totals['bytes_in'] / 1024:>10.1f} {totals['bytes_out'] / 1024:>10.1f} "
+            f"{totals['pixels'] / 1e6:>8.2f}"
+        )
+    lines.append("-" * 66)
+    lines.append(f"total wall {report['wall']:.3f}s, cpu {report['cpu']:.3f}s, "
+                 f"{report['jobs']} job(s), cache {report['cache']['hits']} hit / "
+                 f"{report['cache']['misses']} miss")
+    return "\n".join(lines)
@@ -0,0 +1,248 @@
+"""
+Production-like local server for load-time measurements.
+
+XAMPP serves every file uncompressed with weak validators, which hides
+what caching and compression do in production. This server:
+
+- serves build/ over the repository root (index.html, style.css, src/),
+  so the game gets the built assets (run asset_pipeline.build first)
+- prefers precompressed .br/.gz siblings when the client accepts them, and
+  otherwise compresses text files once per version and keeps the result
+- sends strong ETags (content SHA-1, plus "-gzip"/"-br" for compressed
+  bodies, since each content-coding is its own representation) and
+  answers If-None-Match with 304
+- marks content-hashed file names (name.<8+ hex>.ext) as immutable for a
+  year; everything else is revalidated (no-cache)
+- supports single HTTP Range requests (seeking in the .ogg tracks)
+- answers scores_cosmic.php and leaderboard.json with score_service, so no
+  PHP is needed
+- logs method, path, status, encoding, bytes and milliseconds per request
+
+    python -m asset_pipeline.serve [--port 8080] [--db scores_cosmic.db]
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import re
+import time
+from pathlib import Path
+from urllib.parse import unquote
+
+from asset_pipeline import build
+
+# Configuration
+HOST = "127.0.0.1"
+PORT = 8080
+ROOTS = (build.BUILD_FOLDER, Path("."))  # First match wins
+# Only these are served from the repository (no databases, scripts or backups):
+# exact file names, and everything under the folders
+PUBLIC_FILES = ("index.html", "style.css")
+PUBLIC_FOLDERS = ("src/", "assets/")
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".svg", ".txt")
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = b"public, max-age=31536000, immutable"
+REVALIDATE = b"no-cache"
+SCORE_PATHS = ("/scores_cosmic.php", "/leaderboard.json")
+
+mimetypes.add_type("audio/ogg", ".ogg")
+mimetypes.add_type("text/javascript", ".js")
+mimetypes.add_type("image/webp", ".webp")
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range, None when absent or
+    not understood (serve the whole file), "invalid" when unsatisfiable.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        return "invalid"
+    return start, end
+
+
+class StaticFiles:
+    """File lookup with cached ETags and compressed variants"""
+
+    def __init__(self, roots=ROOTS):
+        self.roots = roots
+        self._cache = {}  # path → ((size, mtime_ns), content, etag, {encoding: bytes})
+
+    def resolve(self, url_path):
+        """Existing file for a URL path, or None"""
+        relative = unquote(url_path).lstrip("/") or "index.html"
+        if ".." in Path(relative).parts:
+            return None
+        if relative not in PUBLIC_FILES and not relative.startswith(PUBLIC_FOLDERS):
+            return None
+        for root in self.roots:
+            path = root / relative
+            if path.is_file():
+                return path
+        return None
+
+    def load(self, path):
+        """(content, etag, variants) for a file, re-read only when it changed"""
+        stat = path.stat()
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._cache.get(path)
+        if cached is None or cached[0] != signature:
+            content = path.read_bytes()
+            tag = '"' + hashlib.sha1(content).hexdigest() + '"'
+            cached = (signature, content, tag, {})
+            self._cache[path] = cached
+        return cached[1:]
+
+    def variant(self, path, encodings):
+        """(encoding, bytes) of the best compressed version the client accepts"""
+        content, _, variants = self.load(path)
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding not in encodings:
+                continue
+            sibling = path.with_name(path.name + suffix)
+            if sibling.is_file():
+                return encoding, sibling.read_bytes()
+            if path.suffix not in COMPRESSIBLE:
+                continue
+            if encoding not in variants:
+                if encoding == "gzip":
+                    variants[encoding] = gzip.compress(content, compresslevel=9, mtime=0)
+                else:
+                    try:
+                        import brotli
+                    except ImportError:
+                        continue
+                    variants[encoding] = brotli.compress(content)
+            return encoding, variants[encoding]
+        return None, content
+
+
+class DevServer:
+    """ASGI app: static files plus the score API"""
+
+    def __init__(self, db_file=None, files=None):
+        self.files = files or StaticFiles()
+        self.db_file = db_file
+        self.scores = None
+
+    def score_app(self):
+        if self.scores is None:
+            from score_service import server
+
+            self.scores = server.ScoreApp(self.db_file or server.DB_FILE)
+        return self.scores
+
+    def static(self, path, headers):
+        """Return (status, headers, body, encoding) for a static request"""
+        file = self.files.resolve(path)
+        if file is None:
+            return 404, [(b"content-type", b"text/plain")], b"Not found", None
+        content, tag, _ = self.files.load(file)
+        requested = parse_range(headers.get(b"range", b"").decode("latin-1"), len(content))
+        encoding, body = None, content
+        if requested is None:
+            # Ranges are served from the identity body only
+            accepted = {part.split(";")[0].strip() for part in
+                        headers.get(b"accept-encoding", b"").decode("latin-1").split(",")}
+            encoding, body = self.files.variant(file, accepted)
+            if encoding:
+                tag = f'{tag[:-1]}-{encoding}"'
+        content_type = mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+        response = [
+            (b"content-type", content_type.encode()),
+            (b"etag", tag.encode()),
+            (b"cache-control", IMMUTABLE if HASHED_NAME.search(file.name) else REVALIDATE),
+            (b"accept-ranges", b"bytes"),
+            (b"vary", b"Accept-Encoding"),
+        ]
+
+        if tag.encode() in headers.get(b"if-none-match", b"").replace(b" ", b"").split(b","):
+            return 304, response, b"", None
+
+        if requested == "invalid":
+            return 416, response + [(b"content-range", f"bytes */{len(content)}".encode())], b"", None
+        if requested is not None:
+            start, end = requested
+            response.append((b"content-range", f"bytes {start}-{end}/{len(content)}".encode()))
+            return 206, response, content[start:end + 1], None
+
+        if encoding:
+            response.append((b"content-encoding", encoding.encode()))
+        return 200, response, body, encoding
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.score_app()(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        path = scope["path"]
+        sent = {"status": 0, "bytes": 0, "encoding": None}
+
+        if path in SCORE_PATHS:
+            async def logged_send(message):
+                if message["type"] == "http.response.start":
+                    sent["status"] = message["status"]
+                    sent["encoding"] = dict(message["headers"]).get(b"content-encoding",
+                                                                     b"").decode() or None
+                else:
+                    sent["bytes"] += len(message.get("body", b""))
+                await send(message)
+
+            await self.score_app()(scope, receive, logged_send)
+        else:
+            more = True
+            while more:
+                more = (await receive()).get("more_body", False)
+            status, headers, body, encoding = self.static(path, dict(scope.get("headers") or []))
+            headers.append((b"content-length", str(len(body)).encode()))
+            if scope["method"] == "HEAD":
+                body = b""
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            sent.update(status=status, bytes=len(body), encoding=encoding)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{scope['method']:<5} {path:<48} {sent['status']} "
+              f"{sent['encoding'] or '-':<5} {sent['bytes']:>9} B {elapsed:>8.2f} ms")
+
+
+async def _run(app, host, port):
+    from score_service import server
+
+    await app.score_app().get_store()
+    await server.serve(app, host, port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", help="SQLite database for the score API (default scores_cosmic.db)")
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("COSMIC PARASITE - LOCAL PERFORMANCE SERVER")
+    print(f"{'='*70}\n")
+    if not build.BUILD_FOLDER.exists():
+        print("WARNING: build/ not found, serving the source assets. "
+              "Run `python -m asset_pipeline build` first.")
+    print(f"Game on http://{args.host}:{args.port}/")
+    try:
+        asyncio.run(_run(DevServer(args.db), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Pre-render the Starfield layers into seamlessly tileable textures.
+
+Starfield draws every star of its three layers as its own arc() + fill()
+each frame and re-rolls Math.random on wraparound. This renders each layer
+once, with the densities, radii and alphas read from Starfield.js
+(constructor and init()), into a canvas-sized texture whose stars wrap
+around both edges, so the game scrolls it with two drawImage calls per
+layer. Stars are rasterized at SUPERSAMPLE x resolution and box-filtered
+down, which matches the canvas' anti-aliased arcs.
+
+The placement comes from a fixed seed (--seed), so a rerun reproduces the
+same sky; it is recorded in starfield.json next to the textures.
+
+    python -m asset_pipeline.starfield            # show the layers
+    python -m asset_pipeline.starfield --apply    # write the textures
+"""
+import argparse
+import json
+import random
+import re
+from pathlib import Path
+
+from asset_pipeline import js_sources, profiling
+
+# Configuration
+IMAGES_FOLDER = Path("assets/images")
+METADATA_FILE = IMAGES_FOLDER / "starfield.json"
+STARFIELD_JS = js_sources.SRC_FOLDER / "environment/Starfield.js"
+CONSTANTS_JS = js_sources.SRC_FOLDER / "utils/Constants.js"
+OUTPUT_NAME = "starfield_layer{index}.png"
+SEED = 1337
+SUPERSAMPLE = 8
+
+LAYER = re.compile(r"\{\s*speed:\s*([\d.]+),\s*stars:\s*\[\],\s*color:\s*'rgba\(([^)]*)\)'")
+COUNT = re.compile(r"const count = (\d+) \+ \(index \* (\d+)\)")
+SIZE = re.compile(r"size: \(index \+ 1\) \* ([\d.]+) \+ Math\.random\(\) \* ([\d.]+)")
+
+
+def read_layers(js_path=STARFIELD_JS):
+    """[{"speed", "alpha", "count", "radius": (min, max)}] as Starfield.init() builds them"""
+    text = Path(js_path).read_text(encoding="utf-8")
+    count, size = COUNT.search(text), SIZE.search(text)
+    if not count or not size:
+        raise ValueError(f"Star count/size formulas not found in {js_path}")
+    layers = []
+    for index, match in enumerate(LAYER.finditer(text)):
+        alpha = float(match.group(2).split(",")[3])
+        base = (index + 1) * float(size.group(1))
+        layers.append({
+            "speed": float(match.group(1)),
+            "alpha": alpha,
+            "count": int(count.group(1)) + index * int(count.group(2)),
+            "radius": (base, base + float(size.group(2))),
+        })
+    if not layers:
+        raise ValueError(f"No Starfield layers found in {js_path}")
+    return layers
+
+
+def canvas_size():
+    """(CANVAS_WIDTH, CANVAS_HEIGHT) from Constants.js"""
+    return (int(js_sources.read_value(CONSTANTS_JS, "CANVAS_WIDTH")),
+            int(js_sources.read_value(CONSTANTS_JS, "CANVAS_HEIGHT")))
+
+
+def place_stars(layer, index, size, seed=SEED):
+    """[(x, y, radius)] of one layer; the same seed always gives the same stars"""
+    rng = random.Random(f"{seed}:{index}")
+    width, height = size
+    low, high = layer["radius"]
+    return [(rng.random() * width, rng.random() * height, low + rng.random() * (high - low))
+            for _ in range(layer["count"])]
+
+
+def render_layer(layer, stars, size):
+    """White stars at the layer alpha on transparency, wrapped around every edge"""
+    from PIL import Image, ImageDraw
+
+    width, height = size
+    mask = Image.new("L", (width * SUPERSAMPLE, height * SUPERSAMPLE))
+    draw = ImageDraw.Draw(mask)
+    for x, y, radius in stars:
+        for dx in (-width, 0, width):
+            for dy in (-height, 0, height):
+                cx, cy = (x + dx) * SUPERSAMPLE, (y + dy) * SUPERSAMPLE
+                r = radius * SUPERSAMPLE
+                draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=255)
+    coverage = mask.resize(size, Image.Resampling.BOX)
+    alpha = coverage.point(lambda a: round(a * layer["alpha"]))
+    texture = Image.new("RGBA", size, (255, 255, 255, 0))
+    texture.putalpha(alpha)
+    return texture
+
+
+def apply_starfield(seed=SEED):
+    """Render every layer and write starfield.json"""
+    size = canvas_size()
+    metadata = {"seed": seed, "size": list(size), "layers": []}
+    for index, layer in enumerate(read_layers()):
+        stars = place_stars(layer, index, size, seed)
+        name = OUTPUT_NAME.format(index=index)
+        render_layer(layer, stars, size).save(IMAGES_FOLDER / name, "PNG", optimize=True)
+        print(f"Wrote {IMAGES_FOLDER / name} ({len(stars)} stars, "
+              f"{(IMAGES_FOLDER / name).stat().st_size / 1024:.1f} KB)")
+        metadata["layers"].append({"file": name, "speed": layer["speed"], "alpha": layer["alpha"],
+                                   "count": layer["count"], "radius": list(layer["radius"])})
+    METADATA_FILE.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    print(f"Metadata: {METADATA_FILE}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="write the layer textures")
+    parser.add_argument("--seed", type=int, default=SEED, help=f"star placement seed (default {SEED})")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("PRE-RENDER STARFIELD LAYERS")
+    print(f"{'='*70}\n")
+
+    with profiling.session(args.profile, "starfield"):
+        width, height = canvas_size()
+        for index, layer in enumerate(read_layers()):
+            low, high = layer["radius"]
+            print(f"Layer {index}: {layer['count']} stars, radius {low:g}-{high:g}px, "
+                  f"alpha {layer['alpha']:g}, speed {layer['speed']:g} → "
+                  f"{OUTPUT_NAME.format(index=index)} {width}x{height}")
+
+        if args.apply:
+            print()
+            apply_starfield(args.seed)
+        else:
+            print("\nDry run. Use --apply to write the textures.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Find the smallest repeat period of scrolling textures and crop to one tile.
+
+Environment.js scrolls mist_texture.png, ground_v4.png and the cave
+backgrounds and repeats them horizontally. If a texture already contains its
+own content more than once, one period is enough: the game's tiling rebuilds
+the rest and the decoded texture gets smaller.
+
+The period is found with a circular autocorrelation computed via FFT, which
+gives the wrap-around error of every shift at once:
+
+    mean((x - roll(x, p))**2) == 2 * (R[0] - R[p]) / N
+
+Only periods that divide the texture size are candidates, so the cropped tile
+repeats into exactly the same pixels as the original.
+
+    python -m asset_pipeline.texture_period            # report only
+    python -m asset_pipeline.texture_period --apply    # crop + backup
+"""
+import argparse
+import shutil
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from asset_pipeline import pixel_cache, profiling
+
+# Configuration
+IMAGES_FOLDER = Path("assets/images")
+BACKUP_FOLDER = Path("assets/images_BACKUP_TEXTURE_PERIOD")
+MAX_RMSE = 2.0  # Allowed wrap-around error (0-255 scale) for a period to count
+
+# Textures scrolled by Environment.js and the axes the game repeats them on.
+# Only the repeated axes are cropped; the others are reported for reference.
+TEXTURES = {
+    "mist_texture.png": ("x",),
+    "ground_v4.png": ("x",),
+    "cave_bg_v2.png": ("x",),
+    "cave_bg_huge.png": ("x",),
+}
+
+AXES = {"y": 0, "x": 1}
+
+
+def load_pixels(path):
+    """Decode an image to a float32 (H, W, 4) RGBA array"""
+    return np.asarray(pixel_cache.load(path)[1], dtype=np.float32)
+
+
+def period_errors(pixels, axis):
+    """
+    RMSE between the texture and itself shifted by every lag along `axis`.
+
+    Returns an array indexed by lag (errors[0] == 0).
+    """
+    spectrum = np.fft.rfft(pixels, axis=axis)
+    power = (spectrum * np.conj(spectrum)).real
+    autocorrelation = np.fft.irfft(power, n=pixels.shape[axis], axis=axis)
+    other_axes = tuple(a for a in range(pixels.ndim) if a != axis)
+    autocorrelation = autocorrelation.sum(axis=other_axes)
+    mse = 2.0 * (autocorrelation[0] - autocorrelation) / pixels.size
+    return np.sqrt(np.maximum(mse, 0.0))
+
+
+def find_period(pixels, axis, max_rmse=MAX_RMSE):
+    """
+    Smallest period along `axis` whose wrap-around error is within max_rmse.
+
+    Returns (period, rmse); period equals the full size when nothing repeats.
+    """
+    size = pixels.shape[axis]
+    errors = period_errors(pixels, axis)
+    for period in range(1, size):
+        if size % period == 0 and errors[period] <= max_rmse:
+            return period, float(errors[period])
+    return size, 0.0
+
+
+def analyze_texture(path, max_rmse=MAX_RMSE):
+    """Return {"x": (period, rmse), "y": (period, rmse), "size": (w, h)}"""
+    pixels = load_pixels(path)
+    result = {axis: find_period(pixels, index, max_rmse) for axis, index in AXES.items()}
+    result["size"] = (pixels.shape[1], pixels.shape[0])
+    return result
+
+
+def crop_to_period(path, width, height):
+    """Crop a texture to its top-left width x height tile, keeping a backup"""
+    if not BACKUP_FOLDER.exists():
+        BACKUP_FOLDER.mkdir(parents=True)
+    backup_path = BACKUP_FOLDER / path.name
+    if not backup_path.exists():
+        shutil.copy2(path, backup_path)
+
+    with Image.open(path) as img:
+        tile = img.crop((0, 0, width, height))
+        tile.save(path, "PNG", optimize=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true",
+                        help="crop textures to one period along their tiled axes")
+    parser.add_argument("--max-rmse", type=float, default=MAX_RMSE,
+                        help=f"allowed wrap-around error (default {MAX_RMSE})")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("TEXTURE REPEAT PERIOD ANALYSIS")
+    print(f"{'='*70}\n")
+
+    with profiling.session(args.profile, "texture_period"):
+        total_pixels = 0
+        total_tile_pixels = 0
+
+        for filename, tiled_axes in TEXTURES.items():
+            path = IMAGES_FOLDER / filename
+            if not path.exists():
+                print(f"WARNING: {filename} not found, skipping...")
+                continue
+
+            result = analyze_texture(path, args.max_rmse)
+            width, height = result["size"]
+            tile_w = result["x"][0] if "x" in tiled_axes else width
+            tile_h = result["y"][0] if "y" in tiled_axes else height
+            total_pixels += width * height
+            total_tile_pixels += tile_w * tile_h
+
+            periods = ", ".join(
+                f"{axis}={period} (rmse {rmse:.2f})" if period < size else f"{axis}=none"
+                for axis, size in (("x", width), ("y", height))
+                for period, rmse in [result[axis]])
+            print(f"{filename}: {width}x{height} | period {periods} | tile {tile_w}x{tile_h}")
+
+            if args.apply and (tile_w, tile_h) != (width, height):
+                crop_to_period(path, tile_w, tile_h)
+                print(f"  Cropped to {tile_w}x{tile_h}")
+
+        if total_pixels:
+            print(f"\nDecoded texture pixels: {total_pixels:,} → {total_tile_pixels:,} "
+                  f"({100 - total_tile_pixels / total_pixels * 100:.1f}% smaller)")
+        if args.apply:
+            print(f"Backup location: {BACKUP_FOLDER.absolute()}")
+
+
+if __name__ == "__main__":
+    main()
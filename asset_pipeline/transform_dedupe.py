@@ -0,0 +1,275 @@
+"""
+Find sprites that are flipped or rotated copies of other sprites.
+
+An asset that equals another one under a flip or a 90-degree rotation does
+not need its own download and decode: the renderer can draw the other
+bitmap with ctx.scale(-1, 1) (or the matching rotate/transform). This
+compares every image under the 8 flip/rotate transforms, on premultiplied
+RGBA so fully transparent pixels don't count:
+
+- each image is transformed at full size, then thumbnailed with its aspect
+  ratio kept (longer side THUMBNAIL px), so an exact copy has exactly the
+  same thumbnail; thumbnails are compared against every image of the
+  transformed size with vectorized diffs
+- spritesheets (the "frame" cells of draw_size.DRAW_SIZES) are also
+  transformed frame by frame: a mirrored sheet keeps its frame order, which
+  flipping the whole sheet would reverse
+- candidates are then checked at full resolution; a match is exact when
+  every channel is equal, near when the mean absolute difference over the
+  visible pixels (alpha > 0 in either image) is within MAX_ERROR (0-255), so
+  mostly transparent sprites don't match just by sharing empty space. An
+  untransformed match must also be within NONE_MAX_ERROR on every channel:
+  neighbouring animation frames are near-identical, not copies
+- files are resolved in path order, each to the earliest file it is a copy
+  of; a file that is itself a copy is never used as a source
+
+Matches are written to assets/images/transforms.json ("frame" is the cell
+the transform applies to, for per-frame matches):
+
+    {"helicoptero_left_alpha.png": {"source": "helicoptero_alpha.png",
+        "transform": "flipX", "canvas": "scale(-1, 1)", "frame": [150, 112],
+        "exact": false, "meanError": 0.4, "maxError": 3, "bytes": 51234}}
+
+--apply also deletes the redundant files that no JS source loads; files
+the game loads are kept until their draw call applies the transform.
+
+    python -m asset_pipeline.transform_dedupe            # report
+    python -m asset_pipeline.transform_dedupe --apply    # manifest + delete
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from asset_pipeline import build, draw_size, js_sources, pixel_cache, profiling
+
+# Configuration
+IMAGES_FOLDER = Path("assets/images")
+MANIFEST_FILE = IMAGES_FOLDER / "transforms.json"
+MAX_ERROR = 1.0  # Mean abs. difference (0-255) still counted as a copy
+NONE_MAX_ERROR = 2  # Largest channel difference of an untransformed copy
+THUMBNAIL = 16
+CANDIDATE_ERROR = 8.0  # Thumbnail mean abs. difference worth a full comparison
+NEAR_MISSES = 5  # Closest non-matching pairs to report
+
+# Transform → (array op, canvas op that undoes it when drawing the source)
+TRANSFORMS = {
+    "none": (lambda a: a, None),
+    "flipX": (lambda a: a[:, ::-1], "scale(-1, 1)"),
+    "flipY": (lambda a: a[::-1], "scale(1, -1)"),
+    "rotate180": (lambda a: a[::-1, ::-1], "rotate(Math.PI)"),
+    "rotate90": (lambda a: np.rot90(a, -1), "rotate(Math.PI / 2)"),
+    "rotate270": (lambda a: np.rot90(a, 1), "rotate(-Math.PI / 2)"),
+    "transpose": (lambda a: a.transpose(1, 0, 2), "transform(0, 1, 1, 0, 0, 0)"),
+    "transverse": (lambda a: a[::-1, ::-1].transpose(1, 0, 2), "transform(0, -1, -1, 0, 0, 0)"),
+}
+
+
+def premultiplied(pixels):
+    """Premultiplied float32 copy of (H, W, 4) RGBA pixels"""
+    pixels = np.array(pixels, dtype=np.float32)
+    pixels[..., :3] *= pixels[..., 3:] / 255.0
+    return pixels
+
+
+def thumbnail(pixels):
+    """Premultiplied thumbnail of RGBA pixels, aspect ratio kept"""
+    height, width = pixels.shape[:2]
+    scale = THUMBNAIL / max(width, height)
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    img = Image.fromarray(np.ascontiguousarray(pixels), "RGBA")
+    return premultiplied(img.resize(size, Image.Resampling.BOX))
+
+
+def transformed(pixels, transform, cell=None):
+    """transform(pixels), or applied to each (w, h) cell of a spritesheet in place"""
+    op = TRANSFORMS[transform][0]
+    if cell is None:
+        return op(pixels)
+    width, height = cell
+    rows, cols = pixels.shape[0] // height, pixels.shape[1] // width
+    frames = pixels.reshape(rows, height, cols, width, -1).swapaxes(1, 2)
+    frames = np.stack([[op(frame) for frame in row] for row in frames])
+    return frames.swapaxes(1, 2).reshape(rows * frames.shape[2], cols * frames.shape[3], -1)
+
+
+def variants(size, cell=None):
+    """[(transform, cell)] to try: whole-image, plus per-frame for a spritesheet"""
+    result = [(name, None) for name in TRANSFORMS]
+    if cell and cell != size and size[0] % cell[0] == 0 and size[1] % cell[1] == 0:
+        result += [(name, cell) for name in TRANSFORMS if name != "none"]
+    return result
+
+
+def sheet_cells():
+    """{path: (w, h)} spritesheet cells, from the draw_size "frame" settings"""
+    cells = {}
+    for config in draw_size.DRAW_SIZES.values():
+        if "frame" in config:
+            js_path, width_name, height_name = config["frame"]
+            cell = (round(js_sources.read_value(js_path, width_name)),
+                    round(js_sources.read_value(js_path, height_name)))
+            for path in draw_size.list_files(config):
+                cells[path] = cell
+    return cells
+
+
+def load_image(path):
+    """Premultiplied float32 (H, W, 4) array"""
+    return premultiplied(pixel_cache.load(path)[1])
+
+
+def list_images():
+    """PNG sources that go into the build"""
+    return [path for path in build.list_sources()
+            if path.suffix.lower() == ".png" and IMAGES_FOLDER in path.parents]
+
+
+def visible_error(a, b):
+    """Mean absolute difference over the pixels visible in a or b (..., H, W, 4)"""
+    difference = np.abs(a - b).sum(axis=(-3, -2, -1))
+    visible = ((a[..., 3] > 0) | (b[..., 3] > 0)).sum(axis=(-2, -1))
+    return difference / np.maximum(visible * 4, 1)
+
+
+def candidate_pairs(paths, cells):
+    """
+    {copy: {source: [(transform, cell)]}} for pairs whose thumbnails match
+    (copy == transform(source)), with the source always the earlier path.
+    """
+    images = [pixel_cache.load(path)[1] for path in paths]
+    by_size = {}
+    for index, pixels in enumerate(images):
+        by_size.setdefault(pixels.shape[1::-1], []).append(index)
+    groups = {size: (indexes, np.stack([thumbnail(images[i]) for i in indexes]))
+              for size, indexes in by_size.items()}
+
+    candidates = {}
+    for source, pixels in enumerate(images):
+        for transform, cell in variants(pixels.shape[1::-1], cells.get(paths[source])):
+            result = transformed(pixels, transform, cell)
+            group = groups.get(result.shape[1::-1])
+            if group is None:
+                continue
+            errors = visible_error(group[1], thumbnail(result))
+            for copy, error in zip(group[0], errors):
+                if copy > source and error <= CANDIDATE_ERROR:
+                    candidates.setdefault(copy, {}).setdefault(source, []).append((transform, cell))
+    return candidates
+
+
+def compare(source, copy, transform, cell=None):
+    """(mean, max) absolute difference between transform(source) and copy"""
+    result = transformed(source, transform, cell)
+    return float(visible_error(result, copy)), float(np.abs(result - copy).max())
+
+
+def find_copies(paths, max_error=MAX_ERROR, cells=None):
+    """
+    ({redundant path: entry}, near misses). Files are resolved in path
+    order, each to the earliest source it matches; copies are never sources.
+    """
+    if cells is None:
+        cells = sheet_cells()
+    full = {}
+
+    def pixels(index):
+        if index not in full:
+            full[index] = load_image(paths[index])
+        return full[index]
+
+    matches = {}
+    misses = []
+    for copy, sources in sorted(candidate_pairs(paths, cells).items()):
+        for source in sorted(sources):
+            if paths[source] in matches:
+                continue
+            results = []
+            for transform, cell in sources[source]:
+                mean, worst = compare(pixels(source), pixels(copy), transform, cell)
+                results.append((mean, worst, transform, cell))
+            accepted = [result for result in results if result[0] <= max_error
+                        and (result[2] != "none" or result[1] <= NONE_MAX_ERROR)]
+            if not accepted:
+                mean, _, transform, cell = min(results, key=lambda result: result[0])
+                misses.append((mean, paths[source], paths[copy], transform))
+                continue
+            mean, worst, transform, cell = min(accepted, key=lambda result: result[0])
+            entry = {
+                "source": paths[source].relative_to(IMAGES_FOLDER).as_posix(),
+                "transform": transform,
+                "canvas": TRANSFORMS[transform][1],
+                "exact": worst == 0,
+                "meanError": round(mean, 3),
+                "maxError": round(worst),
+                "bytes": paths[copy].stat().st_size,
+            }
+            if cell:
+                entry["frame"] = list(cell)
+            matches[paths[copy]] = entry
+            break
+    return matches, sorted(misses, key=lambda miss: miss[0])[:NEAR_MISSES]
+
+
+def loaded_by_js(path):
+    """Whether a JS source loads this file (literal URL or a frame loop folder)"""
+    relative = path.as_posix()
+    for js_path in js_sources.SRC_FOLDER.rglob("*.js"):
+        text = js_path.read_text(encoding="utf-8")
+        if relative in text or f"{path.parent.as_posix()}/" in text:
+            return True
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true",
+                        help="write transforms.json and delete redundant files the JS doesn't load")
+    parser.add_argument("--max-error", type=float, default=MAX_ERROR,
+                        help=f"mean abs. difference (0-255) still counted as a copy (default {MAX_ERROR})")
+    profiling.add_argument(parser)
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("FLIP/ROTATE DUPLICATE SPRITES")
+    print(f"{'='*70}\n")
+
+    with profiling.session(args.profile, "transform_dedupe"):
+        paths = list_images()
+        matches, misses = find_copies(paths, args.max_error)
+        print(f"Compared {len(paths)} image(s) under {len(TRANSFORMS)} transforms\n")
+
+        for path, entry in matches.items():
+            kind = "exact" if entry["exact"] else f"mean error {entry['meanError']}"
+            if "frame" in entry:
+                kind += ", per {}x{} frame".format(*entry["frame"])
+            print(f"{path.relative_to(IMAGES_FOLDER)} = {entry['transform']}({entry['source']}) "
+                  f"[{kind}], {entry['bytes'] / 1024:.1f} KB")
+        if not matches:
+            print("No flipped/rotated copies within the tolerance.")
+        if misses:
+            print("\nClosest pairs above the tolerance:")
+            for mean, source, copy, transform in misses:
+                print(f"    {copy.relative_to(IMAGES_FOLDER)} vs {transform}"
+                      f"({source.relative_to(IMAGES_FOLDER)}): mean error {mean:.2f}")
+
+        if not args.apply:
+            print("\nDry run. Use --apply to write the manifest and delete unused copies.")
+            return
+
+        manifest = {path.relative_to(IMAGES_FOLDER).as_posix(): entry
+                    for path, entry in matches.items()}
+        MANIFEST_FILE.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        print(f"\nManifest: {MANIFEST_FILE}")
+        for path in matches:
+            if loaded_by_js(path):
+                print(f"Kept {path} (loaded by the JS; point it at the source, drawn with the transform, first)")
+            else:
+                path.unlink()
+                print(f"Deleted {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Watch assets/ and src/ and rebuild only what a change affects.
+
+Changes are picked up with inotify on Linux (through ctypes, no extra
+dependency) or by polling file sizes and mtimes elsewhere, and debounced so
+an export that writes a file in several steps, or a folder of new frames,
+triggers one rebuild. Changed paths are mapped through the build graph:
+
+- an asset file → its build/ output (deleted sources remove the output)
+- a frame of an animation sequence → that sequence's key-pose folder and
+  frames.json, if frame_resample output already exists for it
+- a JS source → every image whose draw size it may change (build.py's
+  JS fingerprint makes the next plan re-check all images)
+
+The lossless recompression search is skipped (it takes seconds per large
+image), so an edit reloads in well under a second; outputs it already
+recompressed stay valid. --recompress runs it anyway, and the next full
+build recompresses whatever watch rebuilt.
+
+    python -m asset_pipeline.watch [--poll] [--debounce 0.2] [--workers N] [--recompress]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from asset_pipeline import build, engine
+
+# Configuration
+WATCH_FOLDERS = (build.ASSETS_FOLDER, Path("src"))
+DEBOUNCE = 0.2  # Seconds without events before rebuilding
+POLL_INTERVAL = 0.5
+
+# inotify(7) constants
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_skipped(path):
+    """Backup, unused and generated folders never trigger a rebuild"""
+    return any(skip in part for part in Path(path).parts for skip in build.SKIP_FOLDERS)
+
+
+class InotifyWatcher:
+    """Recursive inotify watch on Linux"""
+
+    def __init__(self, folders):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folders = {}  # watch descriptor → folder
+        for folder in folders:
+            self._add_tree(Path(folder))
+
+    def _add_tree(self, folder):
+        for root, dirs, _ in os.walk(folder):
+            dirs[:] = [d for d in dirs if not is_skipped(d)]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if wd >= 0:
+                self.folders[wd] = Path(root)
+
+    def changes(self, timeout):
+        """Paths changed within `timeout` seconds (None if there were none)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return None
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return None
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                changed.add(None)  # Lost events: check everything
+                continue
+            folder = self.folders.get(wd)
+            if folder is None or not name:
+                continue
+            path = folder / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not is_skipped(path):
+                    self._add_tree(path)
+                    changed.update(p for p in path.rglob("*") if p.is_file())
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback comparing file sizes and mtimes"""
+
+    def __init__(self, folders):
+        self.folders = [Path(folder) for folder in folders]
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        files = {}
+        for folder in self.folders:
+            for path in folder.rglob("*"):
+                if path.is_file() and not is_skipped(path):
+                    stat = path.stat()
+                    files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def changes(self, timeout):
+        time.sleep(min(timeout, POLL_INTERVAL) if timeout is not None else POLL_INTERVAL)
+        snapshot = self._scan()
+        changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                   if snapshot.get(path) != self.snapshot.get(path)}
+        self.snapshot = snapshot
+        return changed or None
+
+    def close(self):
+        pass
+
+
+def open_watcher(folders=WATCH_FOLDERS, poll=False):
+    if not poll:
+        try:
+            return InotifyWatcher(folders)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), polling every {POLL_INTERVAL}s")
+    return PollingWatcher(folders)
+
+
+def affected(changed):
+    """
+    Map changed paths through the build graph.
+
+    Returns (sources, sequences): the asset sources to re-check (None for
+    all of them) and the frame sequences whose key poses must be redone.
+    """
+    from asset_pipeline import frame_resample
+
+    sources = set()
+    sequences = set()
+    for path in changed:
+        if path is None or path.suffix == ".js":
+            sources = None
+            continue
+        if is_skipped(path) or build.ASSETS_FOLDER not in path.parents:
+            continue
+        if sources is not None:
+            sources.add(path)
+        for name, config in frame_resample.SEQUENCES.items():
+            if (path.parent == frame_resample.IMAGES_FOLDER / config["folder"]
+                    and (frame_resample.OUTPUT_FOLDER / name).exists()):
+                sequences.add(name)
+    return sources, sequences
+
+
+def rebuild(changed, workers, recompress=False):
+    """Rebuild what `changed` affects and print how long it took"""
+    from asset_pipeline import frame_resample
+
+    start = time.perf_counter()
+    sources, sequences = affected(changed)
+    if sources is not None and not sources and not sequences:
+        return
+    shown = sorted(str(path) for path in changed if path is not None)
+    print(f"\nChanged: {', '.join(shown[:5])}{' …' if len(shown) > 5 else ''}")
+
+    build.build(workers, only=sources, recompress=recompress)
+    for name in sorted(sequences):
+        source, kept, _ = frame_resample.resample_sequence(name, frame_resample.SEQUENCES[name])
+        print(f"Key poses of {name}: {source} → {kept} frames")
+    print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def watch(workers=engine.WORKERS, debounce=DEBOUNCE, poll=False, recompress=False):
+    """Build once, then rebuild on every change until interrupted"""
+    build.build(workers, recompress=recompress)
+    watcher = open_watcher(poll=poll)
+    print(f"\nWatching {', '.join(str(folder) for folder in WATCH_FOLDERS)} (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = watcher.changes(None)
+            if not changed:
+                continue
+            while True:
+                more = watcher.changes(debounce)
+                if not more:
+                    break
+                changed |= more
+            rebuild(changed, workers, recompress)
+    finally:
+        watcher.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=engine.WORKERS)
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE,
+                        help=f"quiet seconds before a rebuild (default {DEBOUNCE})")
+    parser.add_argument("--poll", action="store_true", help="poll instead of using inotify")
+    parser.add_argument("--recompress", action="store_true",
+                        help="run the lossless PNG recompression search on rebuilt images")
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("COSMIC PARASITE - ASSET WATCH")
+    print(f"{'='*70}\n")
+    try:
+        watch(args.workers, args.debounce, args.poll, args.recompress)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,7 @@ from pathlib import Path
 try:
     from PIL import Image
 except ImportError:
-    import subprocess
-    subprocess.check_call(['pip', 'install', 'pillow'])
-    from PIL import Image
+    raise SystemExit("ERROR: PIL/Pillow not found. Install it with: pip install pillow")
 
 # Configuration
 ASSETS_DIR = Path("assets/images")
@@ -8,10 +8,7 @@ from pathlib import Path
 try:
     from PIL import Image
 except ImportError:
-    print("ERROR: PIL/Pillow not found. Installing...")
-    import subprocess
-    subprocess.check_call(['pip', 'install', 'pillow'])
-    from PIL import Image
+    raise SystemExit("ERROR: PIL/Pillow not found. Install it with: pip install pillow")
 
 # Configuration
 IMAGES_FOLDER = Path("assets/images")
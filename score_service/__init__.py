@@ -0,0 +1,7 @@
+"""
+Python high-score service for COSMIC_PARASITE.
+
+A drop-in replacement for scores_cosmic.php: same getTopScores/saveScore
+actions and JSON responses used by src/core/ScoreManager.js, backed by the
+same scores_cosmic.db, plus getRank/getAround answered from memory.
+"""
@@ -0,0 +1,150 @@
+"""
+Write-behind batched score ingestion.
+
+scores_cosmic.php runs a SELECT and then an UPDATE/INSERT as separate
+autocommit statements, so every game-over is its own fsync'd transaction.
+Here submissions are queued in memory and applied in one transaction per
+batch with a single upsert:
+
+    INSERT INTO high_scores (name, score) VALUES (?, ?)
+    ON CONFLICT(name) DO UPDATE SET score = excluded.score, timestamp = CURRENT_TIMESTAMP
+    WHERE excluded.score > high_scores.score
+
+Names missing from high_scores are looked up in high_scores_archive (rows
+maintenance.py moved out below its retention rank) and the archived row is
+restored before the upsert, so a returning player keeps their best score.
+
+A batch is flushed when it reaches BATCH_SIZE or BATCH_DELAY after its first
+submission. Callers are only answered once their batch has committed (the
+writer connection uses synchronous=FULL), so an acknowledged score is
+durable; the fsync cost is shared by the whole batch.
+"""
+import asyncio
+
+# Configuration
+BATCH_SIZE = 64
+BATCH_DELAY = 0.005  # Seconds a submission may wait for others to join its batch
+
+UPSERT_SCORE = """INSERT INTO high_scores (name, score) VALUES (?, ?)
+                  ON CONFLICT(name) DO UPDATE
+                  SET score = excluded.score, timestamp = CURRENT_TIMESTAMP
+                  WHERE excluded.score > high_scores.score
+                  RETURNING id"""
+ARCHIVE_EXISTS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'high_scores_archive'"
+# Best archived row per name (the archive can hold several from older runs)
+RESTORE_ARCHIVED = """INSERT INTO high_scores (id, name, score, timestamp)
+                      SELECT id, name, score, timestamp FROM (
+                          SELECT *, ROW_NUMBER() OVER (
+                              PARTITION BY name ORDER BY score DESC, timestamp ASC, id ASC
+                          ) AS place FROM high_scores_archive WHERE name IN ({placeholders})
+                      ) WHERE place = 1
+                      RETURNING id, name, score"""
+DELETE_ARCHIVED = "DELETE FROM high_scores_archive WHERE name IN ({placeholders})"
+
+
+def restore_archived(connection, names):
+    """Move the archived rows of `names` back into high_scores; returns {name: (id, score)}"""
+    if not connection.execute(ARCHIVE_EXISTS).fetchone():
+        return {}
+    placeholders = ",".join("?" * len(names))
+    restored = {row[1]: (row[0], row[2]) for row in
+                connection.execute(RESTORE_ARCHIVED.format(placeholders=placeholders), names)}
+    if restored:
+        connection.execute(DELETE_ARCHIVED.format(placeholders=placeholders), list(restored))
+    return restored
+
+
+def apply_batch(connection, submissions):
+    """
+    Apply [(name, score), ...] in one transaction.
+
+    Returns one PHP-compatible response per submission, in order.
+    """
+    names = sorted({name for name, _ in submissions})
+    results = []
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        placeholders = ",".join("?" * len(names))
+        current = {
+            row[1]: (row[0], row[2])
+            for row in connection.execute(
+                f"SELECT id, name, score FROM high_scores WHERE name IN ({placeholders})", names)
+        }
+        missing = [name for name in names if name not in current]
+        if missing:
+            current.update(restore_archived(connection, missing))
+        for name, score in submissions:
+            if name in current and score <= current[name][1]:
+                results.append({"success": True, "message": "Score not high enough to update",
+                                "updated": False, "current_score": current[name][1]})
+                continue
+            row = connection.execute(UPSERT_SCORE, (name, score)).fetchone()
+            if name in current:
+                current[name] = (current[name][0], score)
+                results.append({"success": True, "message": "Score updated successfully",
+                                "updated": True, "id": current[name][0]})
+            else:
+                current[name] = (row[0], score)
+                results.append({"success": True, "message": "Score saved successfully",
+                                "updated": False, "id": row[0]})
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    return results
+
+
+class BatchWriter:
+    """Queues submissions and flushes them through apply_batch on `executor`"""
+
+    def __init__(self, connection, executor, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        self.connection = connection
+        self.executor = executor
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._queue = []
+        self._timer = None
+        self._flushes = set()
+
+    async def submit(self, name, score):
+        """Queue one submission and wait until its batch has committed"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((name, score, future))
+        if len(self._queue) >= self.batch_size:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_delay, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queue:
+            return
+        batch, self._queue = self._queue, []
+        task = asyncio.get_running_loop().create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, apply_batch, self.connection,
+                [(name, score) for name, score, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def drain(self):
+        """Flush everything queued and wait for it to commit"""
+        self._flush_now()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
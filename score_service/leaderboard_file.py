@@ -0,0 +1,60 @@
+"""
+Static leaderboard JSON, regenerated only when the top 20 changes.
+
+The file has the same shape as the getTopScores response, so ScoreManager
+can read it as a plain static file with conditional GETs and no database
+work on the read path. A gzip sibling is written next to it for servers that
+serve precompressed files, and both are replaced atomically (write to a temp
+file in the same folder, then os.replace) so readers never see half a file.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Configuration
+LEADERBOARD_FILE = Path("leaderboard.json")
+
+
+def render(scores):
+    """Leaderboard bytes, compact like PHP's json_encode"""
+    return json.dumps({"success": True, "scores": scores}, separators=(",", ":")).encode("utf-8")
+
+
+def etag(content):
+    """Strong ETag for a leaderboard body"""
+    return '"' + hashlib.sha1(content).hexdigest()[:20] + '"'
+
+
+def _replace(path, data):
+    """Atomically replace `path` with `data`"""
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def publish(scores, path=LEADERBOARD_FILE):
+    """
+    Write the leaderboard and its .gz sibling if the content changed
+    (nothing is written when path is None).
+
+    Returns (content, gzipped, etag) for serving from memory.
+    """
+    content = render(scores)
+    gzipped = gzip.compress(content, compresslevel=9, mtime=0)
+    if path is None:
+        return content, gzipped, etag(content)
+    path = Path(path)
+    if not path.exists() or path.read_bytes() != content:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _replace(path.with_name(path.name + ".gz"), gzipped)
+        _replace(path, content)
+    return content, gzipped, etag(content)
@@ -0,0 +1,288 @@
+"""
+Load generator and latency benchmark for the score API.
+
+Replays a mix of getTopScores and saveScore requests from many concurrent
+simulated players over keep-alive HTTP/1.1 connections, then reports
+throughput, p50/p95/p99 latency per action and every error, counting
+"database is locked" responses separately as lock contention.
+
+Works against anything speaking the scores_cosmic.php contract on
+localhost: the PHP script under `php -S`, or the Python service. With
+--spawn, a throwaway score_service instance (temporary database) is started
+in-process on a free port.
+
+    python -m score_service.loadtest --spawn --players 50 --duration 10
+    python -m score_service.loadtest --url http://127.0.0.1:8000/scores_cosmic.php
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import random
+import socket
+import string
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Configuration
+URL = "http://127.0.0.1:8081/scores_cosmic.php"
+PLAYERS = 20
+DURATION = 10.0
+WRITE_RATIO = 0.2
+NAMES = 500
+SCORE_MEAN = 5000
+THINK_TIME = 0.0  # Seconds a player waits between requests
+TIMEOUT = 10.0
+LOCK_ERROR = "database is locked"
+
+
+def check_local(url):
+    """Only benchmark loopback hosts"""
+    host = urlsplit(url).hostname or ""
+    if host == "localhost":
+        return
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return
+    except ValueError:
+        pass
+    raise SystemExit(f"Refusing to load-test non-local host {host!r}")
+
+
+def make_names(count, seed=None):
+    """`count` distinct names following the game's A-Z0-9, 6-char rule"""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add("".join(rng.choices(string.ascii_uppercase + string.digits,
+                                      k=rng.randint(3, 6))))
+    return sorted(names)
+
+
+def score_sampler(distribution, mean, rng):
+    """Function returning one random score"""
+    if distribution == "uniform":
+        return lambda: rng.randint(0, 2 * mean)
+    if distribution == "exponential":
+        # Most runs end early; a few players go far
+        return lambda: int(rng.expovariate(1 / mean))
+    return lambda: max(0, int(rng.gauss(mean, mean / 3)))
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(fraction * len(values)) - 1))]
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, target, body=b""):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = (f"{method} {target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode("latin-1") + body)
+        await self.writer.drain()
+
+        lines = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        if "content-length" in headers:
+            content = await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            content = b""
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                content += chunk[:-2]
+        else:
+            content = await self.reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, content
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def player(url, deadline, names, next_score, write_ratio, think_time, rng, samples):
+    """Keep sending requests until `deadline`, recording (action, seconds, error)"""
+    parts = urlsplit(url)
+    connection = Connection(parts.hostname, parts.port or 80)
+    path = parts.path or "/"
+    try:
+        while time.perf_counter() < deadline:
+            if rng.random() < write_ratio:
+                action = "saveScore"
+                body = json.dumps({"name": rng.choice(names), "score": next_score()}).encode()
+                method = "POST"
+            else:
+                action, body, method = "getTopScores", b"", "GET"
+
+            start = time.perf_counter()
+            error = None
+            try:
+                status, content = await asyncio.wait_for(
+                    connection.request(method, f"{path}?action={action}", body), TIMEOUT)
+                if status != 200:
+                    error = f"HTTP {status}"
+                else:
+                    payload = json.loads(content)
+                    if not payload.get("success"):
+                        error = payload.get("error") or "success=false"
+            except (asyncio.TimeoutError, OSError, asyncio.IncompleteReadError, ValueError) as e:
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                connection.close()
+            samples.append((action, time.perf_counter() - start, error))
+
+            if think_time:
+                await asyncio.sleep(rng.expovariate(1 / think_time))
+    finally:
+        connection.close()
+
+
+async def run_load(url, players=PLAYERS, duration=DURATION, write_ratio=WRITE_RATIO,
+                   names=NAMES, distribution="exponential", score_mean=SCORE_MEAN,
+                   think_time=THINK_TIME, seed=None):
+    """Run the load and return (samples, elapsed seconds)"""
+    rng = random.Random(seed)
+    name_list = make_names(names, seed)
+    samples = []
+    start = time.perf_counter()
+    deadline = start + duration
+    tasks = []
+    for _ in range(players):
+        player_rng = random.Random(rng.random())
+        tasks.append(player(url, deadline, name_list,
+                            score_sampler(distribution, score_mean, player_rng),
+                            write_ratio, think_time, player_rng, samples))
+    await asyncio.gather(*tasks)
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, elapsed):
+    """Per-action throughput and latency percentiles (milliseconds)"""
+    report = {"elapsed": elapsed, "requests": len(samples),
+              "throughput": len(samples) / elapsed if elapsed else 0.0,
+              "lock_errors": sum(1 for _, _, error in samples
+                                 if error and LOCK_ERROR in error.lower()),
+              "actions": {}, "errors": {}}
+    for action in sorted({action for action, _, _ in samples}) + ["all"]:
+        latencies = sorted(seconds * 1000 for name, seconds, _ in samples
+                           if action in ("all", name))
+        failed = sum(1 for name, _, error in samples if error and action in ("all", name))
+        report["actions"][action] = {
+            "requests": len(latencies), "errors": failed,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "p50": percentile(latencies, 0.50), "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99), "max": latencies[-1] if latencies else 0.0,
+        }
+    for _, _, error in samples:
+        if error:
+            report["errors"][error] = report["errors"].get(error, 0) + 1
+    return report
+
+
+def print_report(report):
+    print(f"{'='*70}")
+    print("SCORE API LOAD TEST")
+    print(f"{'='*70}\n")
+    print(f"Requests: {report['requests']} in {report['elapsed']:.2f}s "
+          f"({report['throughput']:.0f} req/s)\n")
+    print(f"{'Action':<14} {'Requests':>9} {'Errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for action, stats in report["actions"].items():
+        print(f"{action:<14} {stats['requests']:>9} {stats['errors']:>7} "
+              f"{stats['throughput']:>8.0f} {stats['p50']:>8.2f} {stats['p95']:>8.2f} "
+              f"{stats['p99']:>8.2f} {stats['max']:>8.2f}")
+
+    print(f"\nLock contention ({LOCK_ERROR!r}): {report['lock_errors']}")
+    if report["errors"]:
+        print("Errors:")
+        for error, count in sorted(report["errors"].items(), key=lambda item: -item[1]):
+            print(f"  {count:>6}  {error}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _spawned(args, folder):
+    """Run the load against a throwaway in-process score service"""
+    from score_service import server
+
+    port = free_port()
+    score_app = server.ScoreApp(Path(folder) / "scores_cosmic.db", None)
+    await score_app.get_store()
+    serving = asyncio.get_running_loop().create_task(
+        server.serve(score_app, "127.0.0.1", port))
+    await asyncio.sleep(0.1)
+    try:
+        return await _load(args, f"http://127.0.0.1:{port}/scores_cosmic.php")
+    finally:
+        serving.cancel()
+        await score_app.store.flush()
+        score_app.store.close()
+
+
+async def _load(args, url):
+    return await run_load(url, args.players, args.duration, args.write_ratio, args.names,
+                          args.distribution, args.score_mean, args.think_time, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the score API on localhost")
+    parser.add_argument("--url", default=URL, help=f"score endpoint (default {URL})")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start a throwaway score_service with a temporary database")
+    parser.add_argument("--players", type=int, default=PLAYERS, help="concurrent connections")
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds to run")
+    parser.add_argument("--write-ratio", type=float, default=WRITE_RATIO,
+                        help=f"fraction of saveScore requests (default {WRITE_RATIO})")
+    parser.add_argument("--names", type=int, default=NAMES, help="distinct player names")
+    parser.add_argument("--distribution", choices=("exponential", "normal", "uniform"),
+                        default="exponential", help="score distribution")
+    parser.add_argument("--score-mean", type=int, default=SCORE_MEAN)
+    parser.add_argument("--think-time", type=float, default=THINK_TIME,
+                        help="mean seconds between a player's requests")
+    parser.add_argument("--seed", type=int, help="random seed for a repeatable mix")
+    parser.add_argument("--json", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.spawn:
+        with tempfile.TemporaryDirectory() as folder:
+            samples, elapsed = asyncio.run(_spawned(args, folder))
+    else:
+        check_local(args.url)
+        samples, elapsed = asyncio.run(_load(args, args.url))
+
+    report = summarize(samples, elapsed)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
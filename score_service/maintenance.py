@@ -0,0 +1,143 @@
+"""
+Schema migration and retention maintenance for scores_cosmic.db.
+
+- Merges duplicate names (keeping each player's best row) and adds a unique
+  index on name, so saveScore's lookup by name is an index seek.
+- Adds a covering (score DESC, timestamp, name) index, so getTopScores reads
+  the first 20 index entries instead of sorting the whole table.
+- Switches the database to WAL and incremental auto-vacuum.
+- Archives (or prunes) rows ranked below KEEP_RANKS. Scores only ever go up
+  and rows are never removed by the game, so the score at any rank can only
+  rise: a row below it can only come back through a new saveScore for that
+  name, and saveScore (service and PHP) first moves the archived row back,
+  so the player's best score is kept. --prune deletes the rows instead, and
+  a pruned player starts over.
+- Runs incremental VACUUM and ANALYZE.
+
+    python -m score_service.maintenance [--db scores_cosmic.db] [--keep 1000] [--prune]
+"""
+import argparse
+import sqlite3
+
+from score_service.store import (CREATE_TABLE, DB_FILE, NAME_INDEX, SELECT_PLAYER, SELECT_TOP,
+                                 TOP_LIMIT, merge_duplicates)
+
+# Configuration
+KEEP_RANKS = 1000
+
+LEADERBOARD_INDEX = """CREATE INDEX IF NOT EXISTS idx_high_scores_leaderboard
+                       ON high_scores (score DESC, timestamp ASC, name)"""
+CREATE_ARCHIVE = """CREATE TABLE IF NOT EXISTS high_scores_archive (
+        id INTEGER PRIMARY KEY,
+        name VARCHAR(6) NOT NULL,
+        score INTEGER NOT NULL,
+        timestamp DATETIME,
+        archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )"""
+# saveScore looks archived players up by name
+ARCHIVE_NAME_INDEX = """CREATE INDEX IF NOT EXISTS idx_high_scores_archive_name
+                        ON high_scores_archive (name)"""
+# Rows ranked below :keep, using the same order as getTopScores
+BELOW_KEEP = """SELECT id FROM high_scores
+                ORDER BY score DESC, timestamp ASC
+                LIMIT -1 OFFSET ?"""
+
+
+def migrate(db):
+    """Indexes, WAL and incremental auto-vacuum; returns merged duplicate count"""
+    db.execute(CREATE_TABLE)
+    # One write transaction: no save can add a duplicate name between the
+    # merge and the unique index
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        merged = merge_duplicates(db)
+        db.execute(NAME_INDEX)
+        db.execute(LEADERBOARD_INDEX)
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+
+    if db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # Changing auto_vacuum on an existing database needs one full VACUUM
+        db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        db.execute("VACUUM")
+    db.execute("PRAGMA journal_mode = WAL")
+    return merged
+
+
+def retain(db, keep=KEEP_RANKS, prune=False):
+    """Archive (or delete) rows ranked below `keep`; returns the row count"""
+    keep = max(keep, TOP_LIMIT)
+    # One write transaction, and the ids are selected once: a save between
+    # the archive and the delete could otherwise push another row below
+    # `keep` and have it deleted without being archived
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [(row[0],) for row in db.execute(BELOW_KEEP, (keep,))]
+        if not prune:
+            db.execute(CREATE_ARCHIVE)
+            db.execute(ARCHIVE_NAME_INDEX)
+            db.executemany("""INSERT OR REPLACE INTO high_scores_archive (id, name, score, timestamp)
+                              SELECT id, name, score, timestamp FROM high_scores WHERE id = ?""",
+                           ids)
+        db.executemany("DELETE FROM high_scores WHERE id = ?", ids)
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    return len(ids)
+
+
+def optimize(db):
+    """Give freed pages back to the file system and refresh planner statistics"""
+    db.execute("PRAGMA incremental_vacuum")
+    db.execute("ANALYZE")
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def query_plans(db):
+    """EXPLAIN QUERY PLAN of the two queries the game runs"""
+    return {
+        "getTopScores": [row[-1] for row in db.execute("EXPLAIN QUERY PLAN " + SELECT_TOP,
+                                                       (TOP_LIMIT,))],
+        "saveScore lookup": [row[-1] for row in db.execute("EXPLAIN QUERY PLAN " + SELECT_PLAYER,
+                                                           ("PLAYER",))],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="scores_cosmic.db maintenance")
+    parser.add_argument("--db", default=str(DB_FILE), help="SQLite database file")
+    parser.add_argument("--keep", type=int, default=KEEP_RANKS,
+                        help=f"ranks kept in high_scores (default {KEEP_RANKS})")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete rows below --keep instead of archiving them")
+    args = parser.parse_args(argv)
+
+    print(f"{'='*70}")
+    print("SCORE DATABASE MAINTENANCE")
+    print(f"{'='*70}\n")
+
+    db = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        before = db.execute("SELECT COUNT(*) FROM high_scores").fetchone()[0] \
+            if db.execute("SELECT 1 FROM sqlite_master WHERE name = 'high_scores'").fetchone() else 0
+        merged = migrate(db)
+        moved = retain(db, args.keep, args.prune)
+        optimize(db)
+        after = db.execute("SELECT COUNT(*) FROM high_scores").fetchone()[0]
+
+        print(f"Rows: {before} → {after}")
+        print(f"Duplicate names merged: {merged}")
+        print(f"Rows below rank {max(args.keep, TOP_LIMIT)} "
+              f"{'pruned' if args.prune else 'archived'}: {moved}")
+        print(f"Journal mode: {db.execute('PRAGMA journal_mode').fetchone()[0]}")
+        for query, plan in query_plans(db).items():
+            print(f"{query}: {'; '.join(plan)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+In-memory order-statistics index of the leaderboard.
+
+"You are #1,234 of 50,000" would otherwise need a COUNT(*) WHERE score > ?
+over high_scores for every query. The index keeps each player's best score
+in memory, in the getTopScores order (score DESC, timestamp ASC), and
+answers rank and k-th-entry queries without touching the database:
+
+- scores fall into BUCKETS value buckets of width 2**shift, chosen so the
+  highest score fits; a new high score past the last bucket doubles the
+  width (a rebuild, so at most a few dozen over the life of the board)
+- a Fenwick tree over the buckets (best bucket first) counts the players
+  ahead of any bucket in O(log BUCKETS)
+- each bucket keeps its players sorted, so the position inside a bucket is
+  a bisect
+
+rank(name) and at(position) are O(log BUCKETS) plus a bisect; add() is the
+same plus the list insert of the bucket. The index is loaded from the
+database when the store opens and updated after every committed save, so it
+only sees rows of the live table (restart the service after an archiving
+maintenance run).
+"""
+import bisect
+import time
+
+# Configuration
+BUCKETS = 1 << 16
+
+
+def timestamp():
+    """CURRENT_TIMESTAMP as SQLite writes it (UTC, to the second)"""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+
+class RankIndex:
+    """Players in leaderboard order, with O(log n) rank and select"""
+
+    def __init__(self, rows=()):
+        self.players = {}  # name → (-score, timestamp, name)
+        self.shift = 0
+        self._rebuild([(-row["score"], row["timestamp"] or "", row["name"]) for row in rows])
+
+    def __len__(self):
+        return len(self.players)
+
+    def _slot(self, score):
+        """
+        Fenwick slot of a score's bucket (1-based, best bucket first).
+        Negative scores (rows the PHP/Python validation never wrote, but the
+        table allows) share the last bucket with 0; the bucket keeps them in
+        order.
+        """
+        return BUCKETS - (max(score, 0) >> self.shift)
+
+    def _rebuild(self, keys):
+        """Re-bucket every key; the width grows until the highest score fits"""
+        top = max((-key[0] for key in keys), default=0)
+        while top >> self.shift >= BUCKETS:
+            self.shift += 1
+        self.buckets = {}
+        for key in sorted(keys):
+            self.buckets.setdefault(self._slot(-key[0]), []).append(key)
+        self.players = {key[2]: key for key in keys}
+        # Linear-time Fenwick construction from the bucket sizes
+        self.tree = [0] * (BUCKETS + 1)
+        for slot, bucket in self.buckets.items():
+            self.tree[slot] += len(bucket)
+        for slot in range(1, BUCKETS + 1):
+            parent = slot + (slot & -slot)
+            if parent <= BUCKETS:
+                self.tree[parent] += self.tree[slot]
+
+    def _change(self, slot, delta):
+        while slot <= BUCKETS:
+            self.tree[slot] += delta
+            slot += slot & -slot
+
+    def _ahead(self, slot):
+        """Players in the buckets before `slot`"""
+        total = 0
+        slot -= 1
+        while slot > 0:
+            total += self.tree[slot]
+            slot -= slot & -slot
+        return total
+
+    def add(self, name, score, when=None):
+        """Record a player's score (only kept if it beats the stored one)"""
+        current = self.players.get(name)
+        if current is not None and -current[0] >= score:
+            return False
+        if score >> self.shift >= BUCKETS:
+            keys = [key for key in self.players.values() if key[2] != name]
+            self._rebuild(keys + [(-score, when or timestamp(), name)])
+            return True
+        if current is not None:
+            slot = self._slot(-current[0])
+            bucket = self.buckets[slot]
+            del bucket[bisect.bisect_left(bucket, current)]
+            self._change(slot, -1)
+        key = (-score, when or timestamp(), name)
+        slot = self._slot(score)
+        bisect.insort(self.buckets.setdefault(slot, []), key)
+        self._change(slot, 1)
+        self.players[name] = key
+        return True
+
+    def rank(self, name):
+        """1-based leaderboard position of a player, or None"""
+        key = self.players.get(name)
+        if key is None:
+            return None
+        slot = self._slot(-key[0])
+        return self._ahead(slot) + bisect.bisect_left(self.buckets[slot], key) + 1
+
+    def at(self, position):
+        """{"rank", "name", "score", "timestamp"} at a 1-based position, or None"""
+        if not 1 <= position <= len(self.players):
+            return None
+        # Binary lifting: the last slot with fewer than `position` players up to it
+        slot = 0
+        remaining = position
+        step = BUCKETS
+        while step:
+            if slot + step <= BUCKETS and self.tree[slot + step] < remaining:
+                slot += step
+                remaining -= self.tree[slot]
+            step >>= 1
+        score, when, name = self.buckets[slot + 1][remaining - 1]
+        return {"rank": position, "name": name, "score": -score, "timestamp": when}
+
+    def around(self, name, count):
+        """Entries from `count` places above a player to `count` below, or None"""
+        rank = self.rank(name)
+        if rank is None:
+            return None
+        first = max(1, rank - count)
+        last = min(len(self.players), rank + count)
+        return rank, [self.at(position) for position in range(first, last + 1)]
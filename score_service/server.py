@@ -0,0 +1,228 @@
+"""
+ASGI app and standalone asyncio server for the score service.
+
+Exposes the scores_cosmic.php contract used by src/core/ScoreManager.js:
+
+    GET  /scores_cosmic.php?action=getTopScores
+    POST /scores_cosmic.php?action=saveScore   {"name": "...", "score": 123}
+    GET  /scores_cosmic.php?action=getRank&name=...           (position of a player)
+    GET  /scores_cosmic.php?action=getAround&name=...&count=5 (neighbors of a player)
+    GET  /leaderboard.json                     (static top 20, ETag + gzip)
+
+`app` can be served by any ASGI server (e.g. `uvicorn score_service.server:app`);
+`python -m score_service.server` runs it on a small built-in asyncio HTTP/1.1
+server with no extra dependencies.
+"""
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+from score_service import leaderboard_file
+from score_service.store import AROUND, DB_FILE, ScoreStore
+
+# Configuration
+HOST = "127.0.0.1"
+PORT = 8081
+MAX_BODY = 64 * 1024
+
+CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+    (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+    (b"access-control-allow-headers", b"Content-Type"),
+]
+
+
+def parse_body(body):
+    """JSON body, falling back to form data like the PHP script"""
+    try:
+        data = json.loads(body or b"null")
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        form = parse_qs(body.decode("utf-8", "replace")) if body else {}
+        data = {key: values[-1] for key, values in form.items()}
+    return data
+
+
+class ScoreApp:
+    """ASGI application for getTopScores/saveScore/getRank/getAround"""
+
+    def __init__(self, db_file=DB_FILE, static_file=leaderboard_file.LEADERBOARD_FILE):
+        self.db_file = db_file
+        self.static_file = static_file
+        self.store = None
+
+    async def get_store(self):
+        if self.store is None:
+            self.store = ScoreStore(self.db_file, static_file=self.static_file)
+            await self.store.publish()
+        return self.store
+
+    async def leaderboard(self, headers):
+        """
+        Serve the materialized leaderboard: 304 on a matching If-None-Match,
+        the precompressed body when the client accepts gzip (with its own
+        ETag, since it is a different representation).
+        Returns (status, extra_headers, content).
+        """
+        store = await self.get_store()
+        content, gzipped, tag = store.published
+        compressed = b"gzip" in headers.get(b"accept-encoding", b"")
+        if compressed:
+            tag = tag[:-1] + '-gzip"'
+        extra = [(b"etag", tag.encode()), (b"cache-control", b"no-cache"),
+                 (b"vary", b"Accept-Encoding")]
+        if tag.encode() in headers.get(b"if-none-match", b"").replace(b" ", b"").split(b","):
+            return 304, extra, b""
+        if compressed:
+            return 200, extra + [(b"content-encoding", b"gzip")], gzipped
+        return 200, extra, content
+
+    async def handle(self, method, query, body):
+        """Return (status, payload or None) for one request"""
+        if method == "OPTIONS":
+            return 204, None
+
+        await self.get_store()
+
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        action = params.get("action", "")
+        if action == "getTopScores":
+            return 200, {"success": True, "scores": await self.store.top_scores()}
+        if action == "saveScore":
+            data = parse_body(body)
+            return 200, await self.store.save_score(data.get("name", ""), data.get("score", 0))
+        if action == "getRank":
+            return 200, self.store.player_rank(params.get("name", ""))
+        if action == "getAround":
+            return 200, self.store.around_player(params.get("name", ""),
+                                                 params.get("count", AROUND))
+        return 200, {"success": False, "error": "Invalid action"}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await self.get_store()  # Writes the static leaderboard up front
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    if self.store:
+                        await self.store.flush()
+                        self.store.close()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        body = b""
+        more = True
+        while more:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+
+        extra = []
+        try:
+            if scope["method"] in ("GET", "HEAD") and scope["path"].endswith("leaderboard.json"):
+                status, extra, content = await self.leaderboard(dict(scope.get("headers") or []))
+            else:
+                status, payload = await self.handle(
+                    scope["method"], scope.get("query_string", b"").decode("latin-1"), body)
+                content = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        except Exception as e:
+            status = 200
+            content = json.dumps({"success": False, "error": f"Database error: {e}"}).encode("utf-8")
+
+        response_headers = [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(content)).encode())] + extra + CORS_HEADERS
+        if scope["method"] == "HEAD":
+            content = b""
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": content})
+
+
+app = ScoreApp()
+
+
+async def _serve_connection(asgi_app, reader, writer):
+    """Minimal HTTP/1.1 keep-alive loop translating requests to ASGI calls"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+            headers = []
+            for line in lines[1:]:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    headers.append((key.strip().lower().encode("latin-1"),
+                                    value.strip().encode("latin-1")))
+            header_map = dict(headers)
+            length = min(int(header_map.get(b"content-length", b"0") or 0), MAX_BODY)
+            body = await reader.readexactly(length) if length else b""
+
+            path, _, query = target.partition("?")
+            scope = {"type": "http", "method": method.upper(), "path": path,
+                     "query_string": query.encode("latin-1"), "headers": headers,
+                     "http_version": version[5:]}
+            response = []
+
+            async def receive():
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send(message):
+                response.append(message)
+
+            await asgi_app(scope, receive, send)
+
+            start = response[0]
+            content = b"".join(m.get("body", b"") for m in response[1:])
+            keep_alive = header_map.get(b"connection", b"").lower() != b"close"
+            status = HTTPStatus(start["status"])
+            out = [f"HTTP/1.1 {status.value} {status.phrase}\r\n".encode()]
+            out += [name + b": " + value + b"\r\n" for name, value in start["headers"]]
+            out.append(b"connection: keep-alive\r\n\r\n" if keep_alive
+                       else b"connection: close\r\n\r\n")
+            writer.write(b"".join(out) + content)
+            await writer.drain()
+            if not keep_alive:
+                return
+    finally:
+        writer.close()
+
+
+async def serve(asgi_app=app, host=HOST, port=PORT):
+    """Run an ASGI app on the built-in asyncio server until cancelled"""
+    server = await asyncio.start_server(
+        lambda r, w: _serve_connection(asgi_app, r, w), host, port)
+    print(f"Score service on http://{host}:{port}/scores_cosmic.php")
+    async with server:
+        await server.serve_forever()
+
+
+async def _run(score_app, host, port):
+    await score_app.get_store()
+    await serve(score_app, host, port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="COSMIC PARASITE score service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", default=str(DB_FILE), help="SQLite database file")
+    parser.add_argument("--leaderboard", default=str(leaderboard_file.LEADERBOARD_FILE),
+                        help="static leaderboard JSON to keep up to date")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_run(ScoreApp(args.db, args.leaderboard), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
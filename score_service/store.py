@@ -0,0 +1,233 @@
+"""
+SQLite access for the score service.
+
+Unlike scores_cosmic.php, which opens a new PDO connection and runs
+CREATE TABLE IF NOT EXISTS on every request, the store keeps long-lived
+WAL-mode connections: one writer, running on its own thread so writes are
+serialized, and a small pool of reader threads with one connection each.
+Statements are fixed strings, so sqlite3's statement cache keeps them
+prepared. Saves go through the write-behind batcher in ingest.py.
+
+The top-20 leaderboard is cached in memory and only invalidated when a save
+actually changes it; at that point the static leaderboard file is rewritten
+too (see leaderboard_file.py). Ranks come from an in-memory order-statistics
+index (rank_index.py), loaded when the store opens and updated after each
+committed save, so rank queries never touch the database.
+"""
+import asyncio
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from score_service import ingest, leaderboard_file, rank_index
+
+# Configuration
+DB_FILE = Path("scores_cosmic.db")
+TOP_LIMIT = 20
+AROUND = 5  # Default and maximum neighbors on each side for getAround
+READERS = 4
+BUSY_TIMEOUT_MS = 5000
+
+CREATE_TABLE = """CREATE TABLE IF NOT EXISTS high_scores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR(6) NOT NULL,
+        score INTEGER NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )"""
+SELECT_TOP = """SELECT name, score, timestamp
+                FROM high_scores
+                ORDER BY score DESC, timestamp ASC
+                LIMIT ?"""
+SELECT_PLAYER = "SELECT id, score FROM high_scores WHERE name = ? LIMIT 1"
+SELECT_ALL = "SELECT name, score, timestamp FROM high_scores"
+SELECT_ENTRY = SELECT_ALL + " WHERE name = ?"
+# Needed by the upsert's ON CONFLICT(name)
+NAME_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_high_scores_name ON high_scores (name)"
+
+
+def normalize_name(name):
+    """Same rules as scores_cosmic.php: A-Z0-9 only, 1-6 chars, PLAYER if empty"""
+    name = re.sub(r"[^A-Z0-9]", "", str(name or "").strip().upper())
+    return name[:6] if name else "PLAYER"
+
+
+def parse_score(value):
+    """PHP intval(): leading integer of a string, truncated floats, 0 otherwise"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.match(r"\s*[-+]?\d+", str(value or ""))
+    return int(match.group(0)) if match else 0
+
+
+def merge_duplicates(db):
+    """Keep only the best row per name (highest score, then oldest)"""
+    cursor = db.execute("""DELETE FROM high_scores WHERE id NOT IN (
+                               SELECT id FROM (
+                                   SELECT id, ROW_NUMBER() OVER (
+                                       PARTITION BY name ORDER BY score DESC, timestamp ASC, id ASC
+                                   ) AS place FROM high_scores
+                               ) WHERE place = 1
+                           )""")
+    return cursor.rowcount
+
+
+def connect(db_file):
+    """Open a connection with the settings every service connection uses"""
+    connection = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_MS / 1000,
+                                 check_same_thread=False, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    return connection
+
+
+class ScoreStore:
+    """Long-lived connections plus the cached leaderboard"""
+
+    def __init__(self, db_file=DB_FILE, readers=READERS,
+                 static_file=leaderboard_file.LEADERBOARD_FILE):
+        self.db_file = str(db_file)
+        self.static_file = static_file
+        self.published = None  # (content, gzipped, etag) of the static leaderboard
+        self.writer = connect(self.db_file)
+        self.writer.execute("PRAGMA journal_mode = WAL")
+        self.writer.execute("PRAGMA synchronous = FULL")  # Each batch commit is durable
+        self.writer.execute(CREATE_TABLE)
+        if not self.writer.execute("SELECT 1 FROM sqlite_master WHERE name = "
+                                   "'idx_high_scores_name'").fetchone():
+            with self.writer:
+                self.writer.execute("BEGIN IMMEDIATE")
+                merge_duplicates(self.writer)
+                self.writer.execute(NAME_INDEX)
+        self.ranks = rank_index.RankIndex(self.writer.execute(SELECT_ALL))
+
+        self._local = threading.local()
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="scores-writer")
+        self._read_executor = ThreadPoolExecutor(readers, thread_name_prefix="scores-reader")
+        self.batcher = ingest.BatchWriter(self.writer, self._write_executor)
+        self._publish_task = None
+        self._publish_pending = False
+        self._top = None  # Cached leaderboard (list of dicts) or None
+        self._generation = 0  # Bumped on every invalidation
+
+    async def flush(self):
+        """Commit every queued save"""
+        await self.batcher.drain()
+
+    def close(self):
+        self._read_executor.shutdown()
+        self._write_executor.shutdown()
+        self.writer.close()
+
+    def _reader(self):
+        """Connection owned by the current reader thread"""
+        if not hasattr(self._local, "connection"):
+            self._local.connection = connect(self.db_file)
+        return self._local.connection
+
+    # Blocking parts (run on the executors)
+
+    def _load_top(self, limit=TOP_LIMIT):
+        rows = self._reader().execute(SELECT_TOP, (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def _load_entry(self, name):
+        return self._reader().execute(SELECT_ENTRY, (name,)).fetchone()
+
+    # Async API
+
+    async def top_scores(self):
+        """Top 20, served from memory unless a save changed it"""
+        top = self._top
+        if top is None:
+            generation = self._generation
+            loop = asyncio.get_running_loop()
+            top = await loop.run_in_executor(self._read_executor, self._load_top)
+            if generation == self._generation:
+                # Don't cache a board that a save made stale while loading
+                self._top = top
+        return top
+
+    async def save_score(self, name, score):
+        """Validate and save a score; returns the PHP-compatible response"""
+        name = normalize_name(name)
+        score = parse_score(score)
+        if score < 0:
+            return {"success": False, "error": "Invalid score"}
+
+        result = await self.batcher.submit(name, score)
+        if result.get("id") is not None:
+            self.ranks.add(name, score)
+            if self.changes_leaderboard(name, score):
+                self.invalidate()
+                await self._schedule_publish()
+        elif result.get("success") and name not in self.ranks.players:
+            # Restored from the archive without a new best: index the old row
+            loop = asyncio.get_running_loop()
+            row = await loop.run_in_executor(self._read_executor, self._load_entry, name)
+            if row is not None:
+                self.ranks.add(row["name"], row["score"], row["timestamp"])
+        return result
+
+    def player_rank(self, name):
+        """A player's leaderboard position (getRank), from the rank index"""
+        name = normalize_name(name)
+        rank = self.ranks.rank(name)
+        if rank is None:
+            return {"success": False, "error": "Player not found"}
+        entry = self.ranks.at(rank)
+        return {"success": True, "name": name, "score": entry["score"], "rank": rank,
+                "total": len(self.ranks)}
+
+    def around_player(self, name, count=AROUND):
+        """Up to `count` entries above and below a player (getAround)"""
+        name = normalize_name(name)
+        count = min(max(parse_score(count), 0), AROUND)
+        found = self.ranks.around(name, count)
+        if found is None:
+            return {"success": False, "error": "Player not found"}
+        rank, scores = found
+        return {"success": True, "name": name, "rank": rank, "total": len(self.ranks),
+                "scores": scores}
+
+    async def _schedule_publish(self):
+        """Coalesce the republishes of one batch into as few as possible"""
+        self._publish_pending = True
+        if self._publish_task is None or self._publish_task.done():
+            self._publish_task = asyncio.get_running_loop().create_task(self._publish_loop())
+        await asyncio.shield(self._publish_task)
+
+    async def _publish_loop(self):
+        while self._publish_pending:
+            self._publish_pending = False
+            await self.publish()
+
+    async def publish(self):
+        """Regenerate the static leaderboard (and its file) from the current top 20"""
+        top = await self.top_scores()
+        loop = asyncio.get_running_loop()
+        self.published = await loop.run_in_executor(
+            self._write_executor, leaderboard_file.publish, top, self.static_file)
+        return self.published
+
+    def invalidate(self):
+        self._top = None
+        self._generation += 1
+
+    def changes_leaderboard(self, name, score):
+        """
+        Whether a stored (name, score) can change the cached top 20.
+
+        A new row only enters a full board with a score above its last entry
+        (ties go to the older timestamp), or if the player is already on it.
+        """
+        top = self._top
+        if top is None or len(top) < TOP_LIMIT:
+            return True
+        if any(entry["name"] == name for entry in top):
+            return True
+        return score > top[-1]["score"]
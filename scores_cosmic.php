@@ -7,6 +7,80 @@ header('Access-Control-Allow-Headers: Content-Type');
 // Database file path
 $dbFile = __DIR__ . '/scores_cosmic.db';
 
+// Static leaderboard (same JSON as getTopScores), served as a plain file
+$leaderboardFile = __DIR__ . '/leaderboard.json';
+
+function topScores($db) {
+    $stmt = $db->query("SELECT name, score, timestamp 
+                       FROM high_scores 
+                       ORDER BY score DESC, timestamp ASC 
+                       LIMIT 20");
+    return $stmt->fetchAll(PDO::FETCH_ASSOC);
+}
+
+// Whether a stored score can change the published top 20: the board is not
+// full yet, the player is already on it, or the score beats its last entry
+// (ties go to the older timestamp). Checked against leaderboard.json, so a
+// save that can't reach the board costs no extra query.
+function changesLeaderboard($file, $name, $score) {
+    $board = is_file($file) ? json_decode(file_get_contents($file), true) : null;
+    if (!is_array($board) || !isset($board['scores']) || count($board['scores']) < 20) {
+        return true;
+    }
+    foreach ($board['scores'] as $entry) {
+        if ($entry['name'] === $name) {
+            return true;
+        }
+    }
+    return $score > end($board['scores'])['score'];
+}
+
+// Rows ranked below the retention limit are moved to high_scores_archive by
+// score_service/maintenance.py. Move a returning player's best archived row
+// back, so a lower score can't replace it. Returns the row like the name
+// lookup below, or false.
+function restoreArchived($db, $name) {
+    $archive = $db->query("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'high_scores_archive'");
+    if (!$archive->fetch()) {
+        return false;
+    }
+    $stmt = $db->prepare("SELECT id, score, timestamp FROM high_scores_archive
+                          WHERE name = :name ORDER BY score DESC, timestamp ASC, id ASC LIMIT 1");
+    $stmt->bindParam(':name', $name, PDO::PARAM_STR);
+    $stmt->execute();
+    $row = $stmt->fetch(PDO::FETCH_ASSOC);
+    if (!$row) {
+        return false;
+    }
+
+    $db->beginTransaction();
+    $insert = $db->prepare("INSERT INTO high_scores (id, name, score, timestamp) VALUES (:id, :name, :score, :timestamp)");
+    $insert->execute([':id' => $row['id'], ':name' => $name, ':score' => $row['score'], ':timestamp' => $row['timestamp']]);
+    $delete = $db->prepare("DELETE FROM high_scores_archive WHERE name = :name");
+    $delete->execute([':name' => $name]);
+    $db->commit();
+    return ['id' => $row['id'], 'score' => $row['score']];
+}
+
+// Rewrite leaderboard.json (+ .gz) from the current top 20.
+// Written to a temp file and renamed, so readers never see a partial file.
+function publishLeaderboard($scores, $file) {
+    $json = json_encode([
+        'success' => true,
+        'scores' => $scores
+    ]);
+
+    if (is_file($file) && file_get_contents($file) === $json) {
+        return;
+    }
+
+    $tmp = $file . '.' . getmypid() . '.tmp';
+    file_put_contents($tmp, gzencode($json, 9));
+    rename($tmp, $file . '.gz');
+    file_put_contents($tmp, $json);
+    rename($tmp, $file);
+}
+
 try {
     // Create/Open SQLite database
     $db = new PDO('sqlite:' . $dbFile);
@@ -24,12 +98,13 @@ try {
     $action = isset($_GET['action']) ? $_GET['action'] : '';
 
     if ($action === 'getTopScores') {
-        // Get top 10 scores
-        $stmt = $db->query("SELECT name, score, timestamp 
-                           FROM high_scores 
-                           ORDER BY score DESC, timestamp ASC 
-                           LIMIT 20");
-        $scores = $stmt->fetchAll(PDO::FETCH_ASSOC);
+        // Get top 20 scores
+        $scores = topScores($db);
+
+        // First read after deploy: materialize the static file
+        if (!is_file($leaderboardFile)) {
+            publishLeaderboard($scores, $leaderboardFile);
+        }
 
         echo json_encode([
             'success' => true,
@@ -72,6 +147,9 @@ try {
         $checkStmt->bindParam(':name', $name, PDO::PARAM_STR);
         $checkStmt->execute();
         $existingPlayer = $checkStmt->fetch(PDO::FETCH_ASSOC);
+        if (!$existingPlayer) {
+            $existingPlayer = restoreArchived($db, $name);
+        }
 
         if ($existingPlayer) {
             // Player exists - only update if new score is higher
@@ -80,6 +158,9 @@ try {
                 $updateStmt->bindParam(':score', $score, PDO::PARAM_INT);
                 $updateStmt->bindParam(':id', $existingPlayer['id'], PDO::PARAM_INT);
                 $updateStmt->execute();
+                if (changesLeaderboard($leaderboardFile, $name, $score)) {
+                    publishLeaderboard(topScores($db), $leaderboardFile);
+                }
 
                 echo json_encode([
                     'success' => true,
@@ -102,12 +183,16 @@ try {
             $stmt->bindParam(':name', $name, PDO::PARAM_STR);
             $stmt->bindParam(':score', $score, PDO::PARAM_INT);
             $stmt->execute();
+            $newId = $db->lastInsertId();
+            if (changesLeaderboard($leaderboardFile, $name, $score)) {
+                publishLeaderboard(topScores($db), $leaderboardFile);
+            }
 
             echo json_encode([
                 'success' => true,
                 'message' => 'Score saved successfully',
                 'updated' => false,
-                'id' => $db->lastInsertId()
+                'id' => $newId
             ]);
         }
 
@@ -53,7 +53,7 @@ export function loadAssets(onProgress) {
         Assets.ground.src = 'assets/images/ground_v4.png';
         Assets.ground.onload = onLoad;
 
-        Assets.mist.src = 'assets/images/mist_texture.png';
+        Assets.mist.src = 'assets/images/mist_texture_a30.png'; // Opacity baked in (asset_pipeline/effects.py)
         Assets.mist.onload = onLoad;
 
         Assets.alien_spit.src = 'assets/images/alien-spit.png';
@@ -66,7 +66,7 @@ export function loadAssets(onProgress) {
         Assets.groundEaster.src = 'assets/images/ground_easter.png';
         Assets.groundEaster.onload = onLoad;
 
-        Assets.logo.src = 'assets/images/logo_v5.png';
+        Assets.logo.src = 'assets/images/logo_v5_glow.png'; // Glow baked in (asset_pipeline/effects.py)
         Assets.logo.onload = onLoad;
 
         // Load Turn Frames (01.png to 05.png)
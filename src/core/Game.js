@@ -295,18 +295,17 @@ export class Game {
         // Player is hidden
 
         // Draw Logo
+        // Glow (was shadowBlur 6, '#00ff00') is baked into logo_v5_glow.png by asset_pipeline/effects.py
         const logo = Assets.logo;
         const logoScale = 1.32; // Adjusted from 0.66 for 50% optimized logo (926→463px)
-        const logoW = logo.width * logoScale;
-        const logoH = logo.height * logoScale;
+        const logoGlowPad = 7; // Glow margin around the logo in the image
+        const logoW = (logo.width - 2 * logoGlowPad) * logoScale;
+        const logoH = (logo.height - 2 * logoGlowPad) * logoScale;
         const logoX = (CANVAS_WIDTH - logoW) / 2;
         const logoY = 50;
 
-        this.ctx.save();
-        this.ctx.shadowBlur = 6; // Reduced from 20
-        this.ctx.shadowColor = '#00ff00';
-        this.ctx.drawImage(logo, logoX, logoY, logoW, logoH);
-        this.ctx.restore();
+        this.ctx.drawImage(logo, logoX - logoGlowPad * logoScale, logoY - logoGlowPad * logoScale,
+            logo.width * logoScale, logo.height * logoScale);
 
         // Draw Blinking Text
         this.blinkTimer++;
@@ -13,6 +13,20 @@ export class ScoreManager {
 
 
     async loadHighScores() {
+        // Static leaderboard first: a plain file hit (304 when unchanged)
+        try {
+            const response = await fetch(`${this.getBaseUrl()}/leaderboard.json`, { cache: 'no-cache' });
+            if (response.ok) {
+                const data = await response.json();
+                if (data.success && data.scores) {
+                    this.highScores = data.scores;
+                    return this.highScores;
+                }
+            }
+        } catch (error) {
+            // Not generated yet, fall back to the API
+        }
+
         try {
             const url = `${this.getBaseUrl()}/scores_cosmic.php?action=getTopScores`;
             const response = await fetch(url);
@@ -329,10 +329,7 @@ export class Environment {
 
         // Draw Mist (Start or Play? User implies game scene)
         if (this.currentBg === this.bgPlay && this.mistLayer) {
-            ctx.save();
-            ctx.globalAlpha = 0.3; // Semi-transparent
-            this.mistLayer.draw(ctx);
-            ctx.restore();
+            this.mistLayer.draw(ctx); // 30% opacity is baked into mist_texture_a30.png
         }
 
         if (this.hasGroundStarted) {
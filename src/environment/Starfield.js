@@ -9,6 +9,7 @@ export class Starfield {
         ];
         this.baseSpeed = 1;
         this.init();
+        this.loadTextures();
     }
 
     init() {
@@ -24,8 +25,22 @@ export class Starfield {
         });
     }
 
+    // Tileable pre-rendered layers (asset_pipeline/starfield.py). Loaded here rather
+    // than in loadAssets() because the starfield runs during the preloader; the
+    // individual stars are drawn until a texture is ready.
+    loadTextures() {
+        this.layers.forEach((layer, index) => {
+            layer.offset = 0;
+            layer.texture = new Image();
+            layer.texture.onload = () => { layer.ready = true; };
+            layer.texture.src = `assets/images/starfield_layer${index}.png`;
+        });
+    }
+
     update() {
         this.layers.forEach(layer => {
+            layer.offset = (layer.offset + layer.speed * this.baseSpeed) % CANVAS_WIDTH;
+            if (layer.ready) return;
             layer.stars.forEach(star => {
                 star.x -= layer.speed * this.baseSpeed;
                 if (star.x < 0) {
@@ -38,6 +53,12 @@ export class Starfield {
 
     draw(ctx) {
         this.layers.forEach(layer => {
+            if (layer.ready) {
+                const x = -layer.offset;
+                ctx.drawImage(layer.texture, x, 0);
+                ctx.drawImage(layer.texture, x + CANVAS_WIDTH, 0);
+                return;
+            }
             ctx.fillStyle = layer.color;
             layer.stars.forEach(star => {
                 ctx.beginPath();
@@ -0,0 +1,43 @@
+"""Animated-image output: the separate-frames baseline."""
+import json
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+np = pytest.importorskip("numpy")
+
+from asset_pipeline import animated, build  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty folder (the build and pixel cache use relative paths)"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build, "draw_targets", dict)  # No JS sources here
+    return tmp_path
+
+
+def test_separate_baseline_is_the_built_key_pose_sources(workdir):
+    folder = workdir / animated.IMAGES_FOLDER / "spin"
+    folder.mkdir(parents=True)
+    rng = np.random.default_rng(0)
+    for n in range(4):
+        pixels = rng.integers(0, 8, (24, 24, 4), dtype=np.uint8) * 32
+        Image.fromarray(pixels, "RGBA").save(folder / f"{n:06d}.png", compress_level=0)
+    keyframes = workdir / animated.KEYFRAMES_FOLDER / "spin"
+    keyframes.mkdir(parents=True)
+    frames = [{"file": "000000.png", "source": "000000.png", "duration": 3},
+              {"file": "000001.png", "source": "000003.png", "duration": 1}]
+    (keyframes / "frames.json").write_text(json.dumps({"frames": frames}), encoding="utf-8")
+    config = {"folder": "spin", "timer": workdir / "Spin.js", "loop": True}
+    config["timer"].write_text("this.frameTimer >= this.frameSpeed;\nthis.frameSpeed = 2;\n")
+
+    paths, durations, sources = animated.load_frames("spin", config)
+    size = animated.separate_size("spin", sources, recompress=False)
+
+    assert durations == [6, 2]
+    assert [source.name for source in sources] == ["000000.png", "000003.png"]
+    built = sorted((animated.OUTPUT_FOLDER / "spin").iterdir())
+    assert [path.name for path in built] == ["000000.png", "000003.png"]
+    assert size == sum(path.stat().st_size for path in built)
+    assert size < sum(source.stat().st_size for source in sources)  # Not the raw sources
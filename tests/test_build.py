@@ -0,0 +1,104 @@
+"""Asset build: per-image processing."""
+import json
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+np = pytest.importorskip("numpy")
+
+from asset_pipeline import build  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty folder (the build and pixel cache use relative paths)"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "assets").mkdir()
+    return tmp_path
+
+
+def bands(mode, size=(48, 32)):
+    """8 gray levels across, 4 alpha levels down: few enough colours to quantize exactly"""
+    x = np.arange(size[0]) * 8 // size[0] * 32
+    luma = np.tile(x.astype(np.uint8), (size[1], 1))
+    if mode == "L":
+        return Image.fromarray(luma, "L")
+    y = 255 - np.arange(size[1]) * 4 // size[1] * 64
+    alpha = np.tile(y.astype(np.uint8)[:, None], (1, size[0]))
+    return Image.fromarray(np.dstack([luma, alpha]), "LA")
+
+
+@pytest.mark.parametrize("mode, target", [("LA", None), ("LA", (24, 16)), ("L", (24, 16))])
+def test_quantizes_grayscale_sources(workdir, mode, target):
+    source = workdir / "assets/gray.png"
+    output = workdir / "build/assets/gray.png"
+    bands(mode).save(source)
+
+    result = build.process_image(source, output, target, quantize=True)
+
+    with Image.open(output) as img:
+        assert img.mode == "P"
+        assert img.size == (target or (48, 32))
+        built = np.asarray(img.convert("RGBA"), dtype=np.int32)
+    with Image.open(source) as img:
+        expected = img.convert("RGBA")
+        if target:
+            expected = expected.resize(target, Image.Resampling.LANCZOS)
+        expected = np.asarray(expected, dtype=np.int32)
+    # Premultiplied, so the colour of fully transparent pixels doesn't count
+    built[..., :3] = built[..., :3] * built[..., 3:] // 255
+    expected[..., :3] = expected[..., :3] * expected[..., 3:] // 255
+    assert np.abs(built - expected).mean() < 4
+    assert "quantize" in result["stages"]
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "RGB"])
+def test_few_colours_keep_their_exact_palette(workdir, mode):
+    source = workdir / "assets/stars.png"
+    output = workdir / "build/assets/stars.png"
+    # Anti-aliased stars: white at 40 alpha (or gray) levels, like the starfield layers
+    pixels = np.zeros((32, 48, 4), np.uint8)
+    pixels[::2, ::2, :3] = 255
+    pixels[::2, ::2, 3] = np.arange(16 * 24).reshape(16, 24) % 40 * 6 + 15
+    if mode == "RGB":
+        pixels = np.ascontiguousarray(pixels[..., :3] * (pixels[..., 3:] / 255)).astype(np.uint8)
+    Image.fromarray(pixels, mode).save(source)
+
+    build.process_image(source, output, quantize=True)
+
+    with Image.open(output) as img:
+        assert img.mode == "P"
+        assert np.array_equal(np.asarray(img.convert(mode)), pixels)
+
+
+def test_keeps_truecolour_when_the_palette_is_out_of_tolerance(workdir):
+    source = workdir / "assets/noise.png"
+    output = workdir / "build/assets/noise.png"
+    pixels = np.random.default_rng(0).integers(0, 256, (32, 48, 4), dtype=np.uint8)
+    Image.fromarray(pixels, "RGBA").save(source)
+
+    build.process_image(source, output, quantize=True)
+
+    with Image.open(output) as img:
+        assert img.mode == "RGBA"
+        assert np.array_equal(np.asarray(img), pixels)
+
+
+def test_build_without_recompress_reuses_recompressed_outputs(workdir, monkeypatch):
+    monkeypatch.setattr(build, "draw_targets", dict)  # No JS sources here
+    for name in ("a.png", "b.png"):
+        bands("LA").save(workdir / "assets" / name)
+    build.build(workers=1, recompress=True)
+
+    # Recompression is lossless: watch mode (no recompress) keeps those outputs
+    jobs, _, hits = build.plan_jobs(recompress=False)
+    assert (jobs, hits) == ([], 2)
+
+    bands("LA", (40, 32)).save(workdir / "assets/a.png")
+    jobs, cache, _ = build.plan_jobs(recompress=False)
+    assert [(job.name, job.args[4]) for job in jobs] == [(str(build.ASSETS_FOLDER / "a.png"), False)]
+
+    # The next full build recompresses what was built without it, and only that
+    build.CACHE_FILE.write_text(json.dumps(cache), encoding="utf-8")
+    jobs, _, _ = build.plan_jobs(recompress=True)
+    assert [job.name for job in jobs] == [str(build.ASSETS_FOLDER / "a.png")]
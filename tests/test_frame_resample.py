@@ -0,0 +1,52 @@
+"""Key-pose duration tables."""
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from asset_pipeline import frame_resample, js_sources  # noqa: E402
+
+ENTITY = """class Sprite {{
+    constructor() {{
+        this.frameTimer = 0;
+        this.frameInterval = {interval};
+    }}
+    update() {{
+        this.frameTimer += 1;
+        if (this.frameTimer {comparison} this.frameInterval) {{
+            this.frameTimer = 0;
+        }}
+    }}
+}}
+"""
+
+
+def simulate(interval, comparison, frames=4):
+    """Ticks each frame is shown by the update() loop above"""
+    ticks, timer, shown = [], 0, 0
+    while len(ticks) < frames:
+        shown += 1
+        timer += 1
+        if timer > interval if comparison == ">" else timer >= interval:
+            ticks.append(shown)
+            timer = shown = 0
+    return ticks
+
+
+@pytest.mark.parametrize("interval, comparison", [(2, ">"), (1, ">"), (2, ">="), (1.5, ">=")])
+def test_ticks_follow_the_frame_timer_comparison(tmp_path, interval, comparison):
+    js_path = tmp_path / "Sprite.js"
+    js_path.write_text(ENTITY.format(interval=interval, comparison=comparison), encoding="utf-8")
+
+    assert js_sources.frame_timer(js_path) == (interval, comparison)
+    ticks = js_sources.ticks_per_frame(interval, comparison)
+    assert simulate(interval, comparison) == [ticks] * 4
+
+
+def test_duration_table_counts_held_frames():
+    paths = [Path(f"{n:06d}.png") for n in range(6)]
+    table = frame_resample.duration_table(paths, [0, 1, 4], ticks=3)
+
+    assert [(entry["source"], entry["duration"], entry["ticks"]) for entry in table] == \
+        [("000000.png", 1, 3), ("000001.png", 3, 9), ("000004.png", 2, 6)]
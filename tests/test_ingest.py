@@ -0,0 +1,105 @@
+"""Batched score ingestion: archived players coming back, acknowledgement after commit."""
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from score_service import ingest, maintenance
+from score_service.store import CREATE_TABLE, NAME_INDEX
+
+
+def archived_db(tmp_path):
+    """25 players, the 5 lowest (P20-P24, scores 100-60) archived"""
+    db = sqlite3.connect(tmp_path / "scores.db", isolation_level=None)
+    db.execute(CREATE_TABLE)
+    db.execute(NAME_INDEX)
+    db.executemany("INSERT INTO high_scores (name, score) VALUES (?, ?)",
+                   [(f"P{i}", 500 - i * 20) for i in range(25)])
+    assert maintenance.retain(db, keep=20) == 5
+    return db
+
+
+def test_lower_score_restores_archived_best(tmp_path):
+    db = archived_db(tmp_path)
+    result, = ingest.apply_batch(db, [("P22", 5)])
+
+    assert result == {"success": True, "message": "Score not high enough to update",
+                      "updated": False, "current_score": 60}
+    assert db.execute("SELECT score FROM high_scores WHERE name = 'P22'").fetchall() == [(60,)]
+    assert not db.execute("SELECT 1 FROM high_scores_archive WHERE name = 'P22'").fetchone()
+
+
+def test_higher_score_updates_archived_row(tmp_path):
+    db = archived_db(tmp_path)
+    archived_id, = db.execute("SELECT id FROM high_scores_archive WHERE name = 'P21'").fetchone()
+    first, second = ingest.apply_batch(db, [("P21", 900), ("P21", 10)])
+
+    assert first["updated"] is True and first["id"] == archived_id
+    assert second["current_score"] == 900
+    assert db.execute("SELECT id, score FROM high_scores WHERE name = 'P21'").fetchall() \
+        == [(archived_id, 900)]
+
+
+def test_new_player_without_archive(tmp_path):
+    db = sqlite3.connect(tmp_path / "scores.db", isolation_level=None)
+    db.execute(CREATE_TABLE)
+    db.execute(NAME_INDEX)
+    result, = ingest.apply_batch(db, [("NEW", 10)])
+    assert result["message"] == "Score saved successfully"
+
+
+def batch_writer_db(tmp_path):
+    """Empty database the writer's executor thread can use"""
+    db = sqlite3.connect(tmp_path / "scores.db", isolation_level=None, check_same_thread=False)
+    db.execute(CREATE_TABLE)
+    db.execute(NAME_INDEX)
+    return db
+
+
+def test_batch_writer_acknowledges_after_commit(tmp_path, monkeypatch):
+    db = batch_writer_db(tmp_path)
+    reader = sqlite3.connect(tmp_path / "scores.db")
+    events = []
+
+    def recording_apply(connection, submissions):
+        results = commit(connection, submissions)
+        events.append(("commit", [name for name, _ in submissions]))
+        return results
+
+    commit = ingest.apply_batch
+    monkeypatch.setattr(ingest, "apply_batch", recording_apply)
+
+    async def save(writer, name, score):
+        result = await writer.submit(name, score)
+        events.append(("ack", name))
+        # Visible to another connection: committed, not just queued
+        stored = reader.execute("SELECT score FROM high_scores WHERE name = ?", (name,)).fetchone()
+        return result, stored
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            writer = ingest.BatchWriter(db, executor, batch_size=3, batch_delay=0.05)
+            return await asyncio.gather(*(save(writer, f"P{i}", i * 10) for i in range(5)))
+
+    results = asyncio.run(run())
+
+    assert [(result["success"], stored) for result, stored in results] == \
+        [(True, (i * 10,)) for i in range(5)]
+    # Full batch first, the rest after the delay; every ack follows its commit
+    assert events == [("commit", ["P0", "P1", "P2"]), ("ack", "P0"), ("ack", "P1"), ("ack", "P2"),
+                      ("commit", ["P3", "P4"]), ("ack", "P3"), ("ack", "P4")]
+
+
+def test_batch_writer_failed_batch_rejects_every_caller(tmp_path):
+    db = batch_writer_db(tmp_path)
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            writer = ingest.BatchWriter(db, executor, batch_size=2, batch_delay=0.05)
+            return await asyncio.gather(writer.submit("OK", 10), writer.submit("BAD", None),
+                                        return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, sqlite3.IntegrityError) for result in results)
+    assert db.execute("SELECT COUNT(*) FROM high_scores").fetchone() == (0,)
+    assert not db.in_transaction
@@ -0,0 +1,73 @@
+"""Migration and retention of scores_cosmic.db."""
+import sqlite3
+
+import pytest
+
+from score_service import ingest, maintenance
+from score_service.store import CREATE_TABLE, NAME_INDEX
+
+
+def scores_db(tmp_path, scores):
+    """Database with one player per score (P0, P1, ...), all at the same timestamp"""
+    db = sqlite3.connect(tmp_path / "scores.db", isolation_level=None)
+    db.execute(CREATE_TABLE)
+    db.execute(NAME_INDEX)
+    db.executemany("INSERT INTO high_scores (name, score, timestamp) VALUES (?, ?, ?)",
+                   [(f"P{i}", score, "2024-01-01 00:00:00") for i, score in enumerate(scores)])
+    return db
+
+
+def test_every_deleted_row_is_archived(tmp_path):
+    # Ties around the cut-off rank too
+    db = scores_db(tmp_path, [1000 - i // 3 * 10 for i in range(60)])
+    before = set(db.execute("SELECT id, name, score FROM high_scores"))
+
+    assert maintenance.retain(db, keep=25) == 35
+
+    kept = set(db.execute("SELECT id, name, score FROM high_scores"))
+    archived = set(db.execute("SELECT id, name, score FROM high_scores_archive"))
+    assert len(kept) == 25
+    assert kept.isdisjoint(archived)
+    assert kept | archived == before
+    assert min(score for _, _, score in kept) >= max(score for _, _, score in archived)
+
+
+def test_prune_deletes_without_archive(tmp_path):
+    db = scores_db(tmp_path, range(30))
+
+    assert maintenance.retain(db, keep=20, prune=True) == 10
+
+    assert db.execute("SELECT COUNT(*) FROM high_scores").fetchone() == (20,)
+    assert not db.execute("SELECT 1 FROM sqlite_master WHERE name = 'high_scores_archive'").fetchone()
+
+
+def test_retain_archive_restore_round_trip(tmp_path):
+    db = scores_db(tmp_path, [500 - i * 10 for i in range(30)])
+    maintenance.retain(db, keep=20)
+    archived_id, = db.execute("SELECT id FROM high_scores_archive WHERE name = 'P25'").fetchone()
+
+    # The player comes back with a lower score: the archived best is restored
+    result, = ingest.apply_batch(db, [("P25", 1)])
+    assert result["current_score"] == 250
+    assert db.execute("SELECT id, score FROM high_scores WHERE name = 'P25'").fetchall() \
+        == [(archived_id, 250)]
+    assert not db.execute("SELECT 1 FROM high_scores_archive WHERE name = 'P25'").fetchone()
+
+    # The next run archives it again, unchanged
+    assert maintenance.retain(db, keep=20) == 1
+    assert db.execute("SELECT id, score FROM high_scores_archive WHERE name = 'P25'").fetchall() \
+        == [(archived_id, 250)]
+    assert db.execute("SELECT COUNT(*) FROM high_scores_archive").fetchone() == (10,)
+
+
+def test_migrate_rolls_back_on_failure(tmp_path, monkeypatch):
+    db = scores_db(tmp_path, [10, 20])
+    db.execute("DROP INDEX idx_high_scores_name")
+    db.execute("INSERT INTO high_scores (name, score) VALUES ('P0', 30)")  # Duplicate name
+    monkeypatch.setattr(maintenance, "LEADERBOARD_INDEX", "CREATE INDEX broken ON missing (x)")
+
+    with pytest.raises(sqlite3.OperationalError):
+        maintenance.migrate(db)
+
+    assert not db.in_transaction
+    assert db.execute("SELECT COUNT(*) FROM high_scores").fetchone() == (3,)
@@ -0,0 +1,57 @@
+"""Lossless PNG recompression: the output must decode to the same pixels."""
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+np = pytest.importorskip("numpy")
+
+from asset_pipeline import png_recompress  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty folder (the result cache is under build/)"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def sample(mode):
+    """Gradient plus noise, so every filter and palette order makes a difference"""
+    rng = np.random.default_rng(1)
+    y, x = np.mgrid[0:40, 0:56]
+    rgba = np.stack([x * 4, y * 6, (x + y) * 2, 255 - y * 5], axis=-1)
+    rgba = (rgba + rng.integers(0, 12, rgba.shape)).clip(0, 255).astype(np.uint8)
+    rgba[:8, :8, 3] = 0  # Fully transparent corner with leftover colour
+    img = Image.fromarray(rgba, "RGBA")
+    if mode == "P":
+        return img.quantize(colors=64, method=Image.Quantize.FASTOCTREE)
+    return img.convert(mode)
+
+
+def png_bytes(img):
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG", dpi=(72, 72))  # Plus a chunk the search drops
+    return buffer.getvalue()
+
+
+def pixels(data):
+    with Image.open(io.BytesIO(data)) as img:
+        return img.mode, np.asarray(img.convert("RGBA"))
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "RGB", "LA", "L", "P"])
+def test_recompressed_png_decodes_to_the_same_pixels(workdir, mode):
+    data = png_bytes(sample(mode))
+
+    result = png_recompress.recompress(data, workers=2)
+    cached = png_recompress.recompress(data, workers=2)
+
+    assert result == cached
+    assert len(result) <= len(data)
+    original_mode, original = pixels(data)
+    result_mode, decoded = pixels(result)
+    assert result_mode == original_mode
+    # Bit-exact, including the colour of fully transparent pixels; palette
+    # images may reorder entries, so they are compared as RGBA
+    assert np.array_equal(original, decoded)
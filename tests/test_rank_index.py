@@ -0,0 +1,37 @@
+"""In-memory rank index against the getTopScores order."""
+import random
+
+from score_service import rank_index
+
+
+def expected(rows):
+    """Names in getTopScores order (score DESC, timestamp ASC; the index breaks ties by name)"""
+    return [row["name"] for row in
+            sorted(rows, key=lambda row: (-row["score"], row["timestamp"], row["name"]))]
+
+
+def test_negative_scores_rank_last():
+    rows = [{"name": "LOW", "score": -5, "timestamp": "2024-01-01 00:00:00"},
+            {"name": "ZERO", "score": 0, "timestamp": "2024-01-01 00:00:01"},
+            {"name": "TOP", "score": 10, "timestamp": "2024-01-01 00:00:02"}]
+    index = rank_index.RankIndex(rows)
+
+    assert [index.at(position)["name"] for position in range(1, 4)] == ["TOP", "ZERO", "LOW"]
+    assert index.rank("LOW") == 3
+    assert index.add("NEG", -1, "2024-01-02 00:00:00")
+    assert index.rank("NEG") == 3
+    assert index.rank("LOW") == 4
+
+
+def test_matches_sorted_order():
+    rng = random.Random(7)
+    rows = [{"name": f"P{i}", "score": rng.randint(-50, 1 << 20),
+             "timestamp": f"2024-01-01 00:00:{rng.randint(0, 59):02}"} for i in range(300)]
+    index = rank_index.RankIndex(rows)
+    # Past the last bucket: forces a rebuild with wider buckets
+    rows.append({"name": "HIGH", "score": 1 << 40, "timestamp": "2024-01-02 00:00:00"})
+    index.add("HIGH", 1 << 40, "2024-01-02 00:00:00")
+
+    order = expected(rows)
+    assert [index.at(position)["name"] for position in range(1, len(rows) + 1)] == order
+    assert all(index.rank(name) == position for position, name in enumerate(order, 1))
@@ -0,0 +1,51 @@
+"""Local performance server: what is served, and its validators."""
+import gzip
+
+import pytest
+
+from asset_pipeline.serve import DevServer, StaticFiles
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src/game.js").write_text("console.log('cosmic');\n" * 50)
+    (tmp_path / "index.html").write_text("<html></html>")
+    (tmp_path / "index.html.bak").write_text("old")
+    (tmp_path / "style.css.orig").write_text("old")
+    (tmp_path / "scores_cosmic.db").write_bytes(b"SQLite format 3\0")
+    return DevServer(files=StaticFiles((tmp_path / "build", tmp_path)))
+
+
+@pytest.mark.parametrize("path, status", [
+    ("/", 200), ("/index.html", 200), ("/src/game.js", 200),
+    ("/index.html.bak", 404), ("/style.css.orig", 404), ("/scores_cosmic.db", 404),
+    ("/src/../scores_cosmic.db", 404),
+])
+def test_only_public_files_are_served(server, path, status):
+    assert server.static(path, {})[0] == status
+
+
+def test_each_encoding_has_its_own_etag(server):
+    plain = dict(server.static("/src/game.js", {})[1])
+    status, headers, body, encoding = server.static("/src/game.js", {b"accept-encoding": b"gzip"})
+    zipped = dict(headers)
+
+    assert encoding == "gzip" and gzip.decompress(body).startswith(b"console.log")
+    assert plain[b"etag"] != zipped[b"etag"]
+    assert zipped[b"etag"] == plain[b"etag"][:-1] + b'-gzip"'
+    assert zipped[b"vary"] == b"Accept-Encoding"
+
+    # A validator only matches the representation it came from
+    gzip_request = {b"accept-encoding": b"gzip", b"if-none-match": plain[b"etag"]}
+    assert server.static("/src/game.js", gzip_request)[0] == 200
+    gzip_request[b"if-none-match"] = zipped[b"etag"]
+    assert server.static("/src/game.js", gzip_request)[0] == 304
+    assert server.static("/src/game.js", {b"if-none-match": zipped[b"etag"]})[0] == 200
+
+
+def test_range_is_served_from_the_identity_body(server):
+    status, headers, body, encoding = server.static(
+        "/src/game.js", {b"range": b"bytes=0-6", b"accept-encoding": b"gzip"})
+    assert (status, body, encoding) == (206, b"console", None)
+    assert not dict(headers)[b"etag"].endswith(b'-gzip"')
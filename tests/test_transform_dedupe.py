@@ -0,0 +1,78 @@
+"""Flip/rotate duplicate detection."""
+from pathlib import Path
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+np = pytest.importorskip("numpy")
+
+from asset_pipeline import transform_dedupe  # noqa: E402
+
+FOLDER = Path("assets/images")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty folder (the pixel cache and image paths are relative)"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / FOLDER).mkdir(parents=True)
+    return tmp_path
+
+
+def noise(size, seed=0):
+    """Opaque RGBA noise of (w, h): no two transforms of it look alike"""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, (size[1], size[0], 4), dtype=np.uint8)
+    pixels[..., 3] = 255
+    return pixels
+
+
+def save(name, pixels):
+    path = FOLDER / name
+    Image.fromarray(np.ascontiguousarray(pixels), "RGBA").save(path)
+    return path
+
+
+def found(matches):
+    return {path.name: (entry["source"], entry["transform"], entry.get("frame"))
+            for path, entry in matches.items()}
+
+
+def test_finds_non_square_rotations_and_flips(workdir):
+    a = noise((60, 40))
+    paths = [save("a.png", a),
+             save("b.png", np.rot90(a, -1)),
+             save("c.png", a[:, ::-1]),
+             save("z.png", np.rot90(a, 1))]
+
+    matches, _ = transform_dedupe.find_copies(paths, cells={})
+
+    # Each copy points at the earliest file, not at another copy
+    assert found(matches) == {"b.png": ("a.png", "rotate90", None),
+                              "c.png": ("a.png", "flipX", None),
+                              "z.png": ("a.png", "rotate270", None)}
+    assert all(entry["exact"] for entry in matches.values())
+
+
+def test_near_identical_frames_are_not_copies(workdir):
+    a = noise((32, 32))
+    b = a.copy()
+    b[:4, :4, :3] ^= 0x40  # A small part of the sprite moved
+    paths = [save("frame1.png", a), save("frame2.png", b)]
+
+    matches, misses = transform_dedupe.find_copies(paths, cells={})
+
+    assert matches == {}
+    assert [(miss[1].name, miss[2].name, miss[3]) for miss in misses] == \
+        [("frame1.png", "frame2.png", "none")]
+
+
+def test_mirrored_spritesheet_keeps_frame_order(workdir):
+    frames = [noise((20, 10), seed) for seed in range(4)]
+    right = np.concatenate(frames, axis=1)
+    left = np.concatenate([frame[:, ::-1] for frame in frames], axis=1)
+    paths = [save("right.png", right), save("left.png", left)]
+
+    matches, _ = transform_dedupe.find_copies(paths, cells={paths[0]: (20, 10)})
+
+    assert found(matches) == {"left.png": ("right.png", "flipX", [20, 10])}